@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Compare the time of each keystroke in the fuzzy file opener using the
+regex over the relative paths (the old behaviour) against the
+FilesIndex, typing the queries one char at a time like the user does.
+
+Usage: python benchmarks/file_opener.py [--files N] [--limit N]
+"""
+
+from __future__ import print_function
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from ninja_ide.tools.locator import files_index  # noqa
+
+PROJECT = os.path.join(os.sep, 'home', 'user', 'project')
+QUERIES = ('editor', 'gui main', 'widgetpy', 'xyz')
+WORDS = ('gui', 'core', 'editor', 'tools', 'main', 'panel', 'widget',
+         'project', 'file', 'tests', 'utils', 'data', 'models', 'views')
+
+
+def _fake_paths(amount):
+    rand = random.Random(0)
+    paths = []
+    for i in range(amount):
+        folders = [rand.choice(WORDS) for _ in range(rand.randint(1, 4))]
+        name = '%s_%d.py' % ('_'.join(rand.sample(WORDS, 2)), i)
+        paths.append(os.path.join(PROJECT, *(folders + [name])))
+    return paths
+
+
+def _regex(paths, search):
+    search = '.+'.join(re.escape(search).split('\\ '))
+    pattern = re.compile(search, re.IGNORECASE)
+    model = []
+    base_project = os.path.basename(PROJECT)
+    for file_path in paths:
+        file_path = os.path.join(
+            base_project, os.path.relpath(file_path, PROJECT))
+        if pattern.search(file_path):
+            model.append([os.path.basename(file_path), file_path, PROJECT])
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=100000)
+    parser.add_argument('--limit', type=int, default=100)
+    args = parser.parse_args()
+    paths = _fake_paths(args.files)
+    index = files_index.FilesIndex()
+    start = time.time()
+    index.set_project_files(PROJECT, paths)
+    index.search('')
+    print('%d files, index built in %.3fs' % (
+        args.files, time.time() - start))
+    print('%-10s %12s %12s' % ('query', 'regex', 'index'))
+    for query in QUERIES:
+        regex = indexed = 0
+        for i in range(1, len(query) + 1):
+            start = time.time()
+            _regex(paths, query[:i])
+            regex = max(regex, time.time() - start)
+            start = time.time()
+            index.search(query[:i], args.limit)
+            indexed = max(indexed, time.time() - start)
+        print('%-10s %10.1fms %10.1fms' % (
+            query, regex * 1000, indexed * 1000))
+    print('(worst keystroke of each query)')
+
+
+if __name__ == '__main__':
+    main()
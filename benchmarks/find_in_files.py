@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Compare Find in Files using the old worker (QDir walk, QTextStream
+read line by line and QRegExp) against the FileSearch engine, and a
+repeated search using the trigram ContentIndex.
+
+Usage: python benchmarks/find_in_files.py [--path DIR] [--files N]
+                                          [--pattern REGEX]
+
+Without --path a tree of N generated files is searched.
+"""
+
+from __future__ import print_function
+
+import os
+import re
+import sys
+import time
+import queue
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from PyQt5.QtCore import QDir, QFile, QTextStream, QRegExp, Qt  # noqa
+
+from ninja_ide.tools import file_search  # noqa
+from ninja_ide.tools import content_index  # noqa
+
+
+def _legacy_search(root, filters, pattern):
+    """The FindInFilesWorker as it was, returning the results"""
+    results = []
+    pending = queue.Queue()
+    pending.put(root)
+    file_filter = QDir.Files | QDir.NoDotAndDotDot | QDir.Readable
+    dir_filter = QDir.Dirs | QDir.NoDotAndDotDot | QDir.Readable
+    while not pending.empty():
+        current_dir = QDir(pending.get())
+        if not current_dir.isReadable():
+            continue
+        for one_dir in current_dir.entryInfoList(dir_filter):
+            pending.put(one_dir.absoluteFilePath())
+        for one_file in current_dir.entryInfoList(filters, file_filter):
+            file_obj = QFile(one_file.absoluteFilePath())
+            if not file_obj.open(QFile.ReadOnly):
+                continue
+            stream = QTextStream(file_obj)
+            lines = []
+            line_index = 0
+            line = stream.readLine()
+            while not stream.atEnd():
+                if pattern.indexIn(line) != -1:
+                    lines.append((line_index, line))
+                line = stream.readLine()
+                line_index += 1
+            if lines:
+                results.append((one_file.absoluteFilePath(), lines))
+    return results
+
+
+def _create_tree(root, amount):
+    line = "    value = compute_something(argument, other_argument)\n"
+    for i in range(amount):
+        folder = os.path.join(root, 'package_%d' % (i % 40))
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        with open(os.path.join(folder, 'module_%d.py' % i), 'w') as f:
+            f.write('def function_%d():\n' % i)
+            f.write(line * 200)
+            f.write('    value = NEEDLE_%d\n' % (i % 7))
+            f.write(line * 200)
+            f.write('    return value\n')
+
+
+def _timed_search(engine, root, pattern, filters, index=None):
+    start = time.time()
+    first = None
+    results = []
+    for result in engine.search(root, pattern, filters, index=index):
+        if first is None:
+            first = time.time() - start
+        results.append(result)
+    return results, first or 0, time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--path')
+    parser.add_argument('--files', type=int, default=3000)
+    parser.add_argument('--pattern', default=r'NEEDLE_[13]')
+    args = parser.parse_args()
+    root = args.path
+    if root is None:
+        root = tempfile.mkdtemp()
+        _create_tree(root, args.files)
+    filters = ['*.py']
+    try:
+        start = time.time()
+        legacy = _legacy_search(root, filters, QRegExp(args.pattern,
+                                                       Qt.CaseSensitive))
+        legacy_time = time.time() - start
+        pattern = re.compile(args.pattern, re.MULTILINE)
+        engine = file_search.FileSearch()
+        rows = [('FileSearch',) + _timed_search(
+            engine, root, pattern, filters)]
+        index = content_index.ContentIndex(os.path.join(
+            tempfile.mkdtemp(), 'content.db'))
+        start = time.time()
+        _timed_search(engine, root, pattern, filters, index)
+        index_time = time.time() - start
+        rows.append(('Indexed',) + _timed_search(
+            engine, root, pattern, filters, index))
+        engine.shutdown()
+        index.close()
+    finally:
+        if args.path is None:
+            shutil.rmtree(root)
+    print('%-10s %8s %12s %12s' % ('', 'files', 'first', 'total'))
+    print('%-10s %8d %12s %11.3fs' % ('QDir', len(legacy), '-', legacy_time))
+    for name, results, first, total in rows:
+        print('%-10s %8d %11.3fs %11.3fs' % (name, len(results), first,
+                                             total))
+    print('(first search building the index: %.3fs)' % index_time)
+
+
+if __name__ == '__main__':
+    main()
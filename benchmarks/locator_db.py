@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Compare the cold and warm index times of locator.db using one commit
+per file (the old behaviour) against the batched KnowledgeDB.
+
+Usage: python benchmarks/locator_db.py [--files N]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import pickle
+import sqlite3
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from ninja_ide.tools.locator import knowledge_db  # noqa
+
+
+def _fake_symbols(index):
+    return [('>', 'function_%d_%d()' % (index, i), i) for i in range(20)]
+
+
+def _paths(amount):
+    return ['/project/package_%d/module_%d.py' % (i % 100, i)
+            for i in range(amount)]
+
+
+def per_row_cold(db_path, paths):
+    connection = sqlite3.connect(db_path)
+    connection.execute("create table if not exists "
+                       "locator(path text PRIMARY KEY, stat integer, "
+                       "data blob)")
+    connection.commit()
+    for i, path in enumerate(paths):
+        cur = connection.cursor()
+        cur.execute("SELECT * FROM locator WHERE path=:path", {'path': path})
+        cur.fetchone()
+        data = pickle.dumps(_fake_symbols(i), pickle.HIGHEST_PROTOCOL)
+        cur.execute("INSERT OR REPLACE INTO locator values (?, ?, ?)",
+                    (path, 1, sqlite3.Binary(data)))
+        connection.commit()
+    connection.close()
+
+
+def per_row_warm(db_path, paths):
+    connection = sqlite3.connect(db_path)
+    for path in paths:
+        cur = connection.cursor()
+        cur.execute("SELECT * FROM locator WHERE path=:path", {'path': path})
+        row = cur.fetchone()
+        pickle.loads(row[2])
+    connection.close()
+
+
+def batched_cold(db_path, paths):
+    knowledge = knowledge_db.KnowledgeDB(db_path)
+    stats = knowledge.load_stats()
+    for i, path in enumerate(paths):
+        stats.get(path)
+        data = pickle.dumps(_fake_symbols(i), pickle.HIGHEST_PROTOCOL)
+        knowledge.save(path, 1, data)
+    knowledge.close()
+
+
+def batched_warm(db_path, paths):
+    knowledge = knowledge_db.KnowledgeDB(db_path)
+    stats = knowledge.load_stats()
+    cached = [path for path in paths if stats.get(path) == 1]
+    for data in knowledge.get_data_many(cached).values():
+        pickle.loads(data)
+    knowledge.close()
+
+
+def _measure(function, *args):
+    start = time.time()
+    function(*args)
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=5000)
+    args = parser.parse_args()
+    paths = _paths(args.files)
+    folder = tempfile.mkdtemp()
+    per_row_db = os.path.join(folder, 'per_row.db')
+    batched_db = os.path.join(folder, 'batched.db')
+    results = (
+        ('cold index', _measure(per_row_cold, per_row_db, paths),
+         _measure(batched_cold, batched_db, paths)),
+        ('warm index', _measure(per_row_warm, per_row_db, paths),
+         _measure(batched_warm, batched_db, paths)),
+    )
+    print('%d files' % args.files)
+    print('%-12s %12s %12s %8s' % ('', 'per row', 'batched', 'speedup'))
+    for name, per_row, batched in results:
+        print('%-12s %11.3fs %11.3fs %7.1fx' % (
+            name, per_row, batched, per_row / max(batched, 1e-9)))
+    for db_path in (per_row_db, batched_db):
+        knowledge_db.remove_db(db_path)
+    os.rmdir(folder)
+
+
+if __name__ == '__main__':
+    main()
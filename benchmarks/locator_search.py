@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Compare the time to show the first page of Locator results using the
+linear substring filter (the old behaviour) against the SymbolsIndex,
+typing the queries one char at a time like the user does.
+
+Usage: python benchmarks/locator_search.py [--symbols N] [--page N]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import random
+import argparse
+from collections import namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from ninja_ide.tools.locator import search_index  # noqa
+
+Item = namedtuple('Item', 'type name comparison')
+
+QUERIES = ('editor', 'getfile', 'xyz', 'init')
+WORDS = ('get', 'set', 'editor', 'file', 'project', 'tab', 'init', 'load',
+         'save', 'path', 'widget', 'current', 'name', 'data', 'main')
+
+
+def _fake_items(amount):
+    rand = random.Random(0)
+    items = []
+    for i in range(amount):
+        name = '_'.join(rand.choice(WORDS) for _ in range(rand.randint(1, 3)))
+        name = '%s%d' % (name, i % 97)
+        items.append(Item(rand.choice('<>-'), name, name))
+    return sorted(items, key=lambda item: item.name)
+
+
+def _linear(items, query, page):
+    return [x for x in items
+            if x.comparison.lower().find(query) > -1][:page]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=200000)
+    parser.add_argument('--page', type=int, default=10)
+    args = parser.parse_args()
+    items = _fake_items(args.symbols)
+    start = time.time()
+    index = search_index.SymbolsIndex(items)
+    print('%d symbols, index built in %.3fs' % (
+        args.symbols, time.time() - start))
+    print('%-10s %12s %12s' % ('query', 'linear', 'index'))
+    for query in QUERIES:
+        linear = indexed = 0
+        for i in range(1, len(query) + 1):
+            start = time.time()
+            _linear(items, query[:i], args.page)
+            linear = max(linear, time.time() - start)
+            start = time.time()
+            index.search(query[:i])[0:args.page]
+            indexed = max(indexed, time.time() - start)
+        print('%-10s %10.1fms %10.1fms' % (
+            query, linear * 1000, indexed * 1000))
+    print('(worst keystroke of each query)')
+
+
+if __name__ == '__main__':
+    main()
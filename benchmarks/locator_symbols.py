@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Compare the size, load time and memory of mapping_symbols when the
+symbols are stored as pickled ResultItems (the old format) against the
+columnar symbols_codec format.
+
+Usage: python benchmarks/locator_symbols.py [--files N] [--symbols N]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import pickle
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication  # noqa
+
+app = QApplication([])
+
+from ninja_ide.tools.locator import locator  # noqa
+from ninja_ide.tools.locator import symbols_codec  # noqa
+
+
+class LegacyResultItem(object):
+    """ResultItem as it was pickled before (without __slots__)."""
+
+    def __init__(self, symbol_type='', name='', path='', lineno=-1):
+        self.type = symbol_type
+        self.name = name
+        self.path = path
+        self.lineno = lineno
+        self.comparison = self.name
+        index = self.name.find('(')
+        if index != -1:
+            self.comparison = self.name[:index]
+
+
+def _fake_symbols(file_index, amount):
+    symbols = []
+    for i in range(amount):
+        if i % 10 == 0:
+            symbols.append(('<', 'Class%d(object)' % i, i))
+        elif i % 3 == 0:
+            symbols.append(('-', 'attribute_%d' % (i % 7), i))
+        else:
+            # Names repeated across files, like the real ones
+            symbols.append(('>', 'method_%d(self, value)' % (i % 25), i))
+    return symbols
+
+
+def _legacy_blobs(files):
+    return {path: pickle.dumps(
+        [LegacyResultItem(t, n, path, l) for t, n, l in symbols],
+        pickle.HIGHEST_PROTOCOL) for path, symbols in files.items()}
+
+
+def _codec_blobs(files):
+    return {path: symbols_codec.dumps(symbols)
+            for path, symbols in files.items()}
+
+
+def _load_legacy(blobs):
+    return {path: pickle.loads(data) for path, data in blobs.items()}
+
+
+def _load_codec(blobs):
+    mapping = {}
+    for path, data in blobs.items():
+        mapping[path] = [locator.ResultItem(t, n, path, l)
+                         for t, n, l in symbols_codec.loads(data)]
+    return mapping
+
+
+def _measure(load, blobs):
+    tracemalloc.start()
+    start = time.time()
+    mapping = load(blobs)
+    elapsed = time.time() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del mapping
+    return elapsed, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--symbols', type=int, default=50)
+    args = parser.parse_args()
+    files = {'/project/package_%d/module_%d.py' % (i % 50, i):
+             _fake_symbols(i, args.symbols) for i in range(args.files)}
+    print('%d files, %d symbols per file' % (args.files, args.symbols))
+    print('%-8s %12s %12s %12s' % ('', 'blobs', 'load', 'memory'))
+    for name, dump, load in (('pickle', _legacy_blobs, _load_legacy),
+                             ('columns', _codec_blobs, _load_codec)):
+        blobs = dump(files)
+        size = sum(len(data) for data in blobs.values())
+        elapsed, memory = _measure(load, blobs)
+        print('%-8s %10.1fMB %11.3fs %10.1fMB' % (
+            name, size / 1048576., elapsed, memory / 1048576.))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure the time from the start of the process to the first painted
+editor, opening one file in a new NINJA-IDE home.
+
+Usage: python benchmarks/startup.py [--path FILE] [--runs N]
+                                    [--resources {rcc,py}]
+
+Each run starts NINJA-IDE in a new process (like ninja-ide.py) and
+reports the time to import the GUI modules and to the first paint of the
+editor of FILE (by default ninja_ide/gui/editor/editor.py). With
+--resources py the images are loaded from the generated nresources
+module instead of the binary resources file.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import json
+import shutil
+import signal
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _child(path, resources_kind, start, output):
+    """Start the IDE like setup_and_run does, write the times as json"""
+    sys.path.insert(0, ROOT)
+    from PyQt5.QtWidgets import QApplication
+    from ninja_ide import resources
+
+    if resources_kind == 'rcc':
+        resources.load_resources()
+    else:
+        from ninja_ide import nresources  # noqa
+    resources.create_home_dir_structure()
+    from ninja_ide.core import settings
+    from ninja_ide.utils import theme
+    settings.load_settings()
+    app = QApplication(sys.argv)
+    theme.load_theme(settings.NINJA_SKIN)
+    gui_start = time.time()
+    from ninja_ide import gui
+    gui_import = time.time() - gui_start
+    from ninja_ide.gui.ide import IDE
+
+    def painted():
+        first_paint = time.time() - start
+        with open(output, 'w') as f:
+            json.dump({'gui_import': gui_import,
+                       'first_paint': first_paint}, f)
+        os._exit(0)
+
+    gui.start_ide(app, [path], [], [], [])
+    IDE.get_service('main_container').get_current_editor().painted.connect(
+        painted)
+    app.exec_()
+
+
+def _run(path, resources_kind):
+    home = tempfile.mkdtemp(prefix='ninja_startup_')
+    env = dict(os.environ, HOME=home)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    # The start page (QML) can't get an OpenGL context offscreen
+    env.setdefault('QT_QUICK_BACKEND', 'software')
+    output = os.path.join(home, 'times.json')
+    try:
+        process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--child',
+             '--path', path, '--resources', resources_kind,
+             '--start', repr(time.time()), '--output', output],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True)
+        try:
+            process.wait(timeout=120)
+        finally:
+            # The worker processes forked by the IDE outlive it
+            os.killpg(process.pid, signal.SIGKILL)
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--path', default=os.path.join(
+        ROOT, 'ninja_ide', 'gui', 'editor', 'editor.py'))
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--resources', choices=('rcc', 'py'),
+                        default='rcc')
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--start', type=float, help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.path, args.resources, args.start, args.output)
+        return
+    results = [_run(args.path, args.resources) for _ in range(args.runs)]
+    print('%-12s %12s %12s' % ('', 'gui import', 'first paint'))
+    for number, result in enumerate(results, 1):
+        print('%-12s %11.3fs %11.3fs' % (
+            'Run %d' % number, result['gui_import'], result['first_paint']))
+    for name, function in (('Best', min), ('Median', _median)):
+        print('%-12s %11.3fs %11.3fs' % (
+            name, function([r['gui_import'] for r in results]),
+            function([r['first_paint'] for r in results])))
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Compare the time to open a big python file in the editor highlighting
+all the blocks at once (the old behaviour) against the highlighter that
+formats the visible blocks first and the rest in idle time.
+
+Usage: python benchmarks/syntax_highlight.py [--path FILE] [--lines N]
+
+Without --path the sources of ninja_ide are joined until N lines.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication  # noqa
+
+app = QApplication(sys.argv)
+
+from ninja_ide.gui.editor import neditable  # noqa
+from ninja_ide.gui.editor import editor  # noqa
+from ninja_ide.gui.editor import syntaxhighlighter  # noqa
+from ninja_ide.core.file_handling import nfile  # noqa
+from ninja_ide.tools import json_manager  # noqa
+
+
+def _sample(lines):
+    root = os.path.join(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))), 'ninja_ide')
+    chunks = []
+    total = 0
+    while total < lines:
+        for folder, _, files in sorted(os.walk(root)):
+            for name in sorted(files):
+                if not name.endswith('.py'):
+                    continue
+                with open(os.path.join(folder, name)) as f:
+                    text = f.read()
+                chunks.append(text)
+                total += text.count('\n')
+                if total >= lines:
+                    return ''.join(chunks)
+    return ''.join(chunks)
+
+
+def _open(text, sync_time):
+    syntaxhighlighter.SyntaxHighlighter.SYNC_TIME = sync_time
+    neditor = editor.create_editor(
+        neditable.NEditable(nfile.NFile()))
+    neditor.set_language('python')
+    neditor.resize(800, 600)
+    neditor.show()
+    start = time.time()
+    neditor.text = text
+    app.processEvents()
+    first = time.time() - start
+    highlighter = neditor._highlighter
+    while highlighter.has_pending_blocks():
+        app.processEvents()
+    return first, time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--path')
+    parser.add_argument('--lines', type=int, default=50000)
+    args = parser.parse_args()
+    json_manager.load_syntax()
+    if args.path:
+        with open(args.path) as f:
+            text = f.read()
+    else:
+        text = _sample(args.lines)
+    sync_time = syntaxhighlighter.SyntaxHighlighter.SYNC_TIME
+    print('%d lines' % (text.count('\n') + 1))
+    print('%-12s %12s %12s' % ('', 'first page', 'all blocks'))
+    for name, limit in (('Synchronous', float('inf')),
+                        ('Scheduled', sync_time)):
+        first, total = _open(text, limit)
+        print('%-12s %11.3fs %11.3fs' % (name, first, total))
+
+
+if __name__ == '__main__':
+    main()
@@ -15,8 +15,16 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>. #
 import os
-from PyQt4.QtCore import QObject
-from PyQt4.QtCore import SIGNAL, QThread
+import fnmatch
+import hashlib
+from collections import OrderedDict
+
+from PyQt5.QtCore import (
+    QObject,
+    QFileSystemWatcher,
+    QTimer,
+    pyqtSignal
+)
 
 from ninja_ide.tools.logger import NinjaLogger
 logger = NinjaLogger('ninja_ide.core.file_handling.filesystem_notifications.Watcher')
@@ -28,6 +36,9 @@ DELETED = 3
 RENAME = 4
 REMOVE = 5
 
+# Never watched, whatever the ignore file says
+VCS_DIRS = ('.git', '.hg', '.svn', '.bzr')
+
 
 def do_stat(file_path):
     status = None
@@ -38,87 +49,252 @@ def do_stat(file_path):
     return status
 
 
-class SingleFileWatcher(QThread):
-    def __init__(self, callback):
-        self._watches = dict()
-        self._do_run = True
-        self._emit_call = callback
-        super(SingleFileWatcher, self).__init__()
-
-    def stop_running(self):
-        self._do_run = False
-
-    def add_watch(self, file_to_watch):
-        status = do_stat(file_to_watch)
-        #only add if the file still exists
-        if (file_to_watch not in self._watches) and status:
-            self._watches[file_to_watch] = do_stat(file_to_watch)
-        elif not status:
-            self._emit_call(DELETED, file_to_watch)
-
-    def is_empty(self):
-        return len(self._watches) == 0
-
-    def del_watch(self, file_to_unwatch):
-        if file_to_unwatch in self._watches:
-            self._watches.pop(file_to_unwatch)
-
-    def tick(self):
-        keys = list(self._watches.keys())
-        for each_file in keys:
-            status = do_stat(each_file)
-            if not status:
-                self._emit_call(DELETED, each_file)
-                self.del_watch(each_file)
-            if status.st_mtime > self._watches[each_file].st_mtime:
-                self._emit_call(MODIFIED, each_file)
-                self._watches[each_file] = status
-
-    def run(self):
-        while self._do_run:
-            self.tick()
-            QThread.msleep(1000)
-        self.deleteLater()
+def coalesce_events(events):
+    """Reduce a list of (event, path) to one event per path, keeping the
+    order of the last change of each path. A file added and deleted in
+    the same batch is dropped."""
+    net = OrderedDict()
+    for event, path in events:
+        previous = net.pop(path, None)
+        if previous == ADDED:
+            if event == DELETED:
+                continue
+            if event == MODIFIED:
+                event = ADDED
+        elif previous == DELETED and event in (ADDED, MODIFIED):
+            event = MODIFIED
+        net[path] = event
+    return [(event, path) for path, event in net.items()]
+
+
+class IgnoreRules(object):
+    """Paths excluded from the watch, using the .gitignore syntax:
+    wildcards, '!' to include again, a leading '/' (or any '/' inside)
+    to match from the root and a trailing '/' to match only folders."""
+
+    def __init__(self, root, patterns=()):
+        self.root = root
+        self._rules = []
+        for folder in VCS_DIRS:
+            self._add(folder + '/')
+        for pattern in patterns:
+            self._add(pattern)
+
+    @classmethod
+    def for_project(cls, root, ignore_file='.gitignore'):
+        patterns = []
+        try:
+            with open(os.path.join(root, ignore_file)) as f:
+                patterns = f.read().splitlines()
+        except (IOError, OSError, UnicodeDecodeError):
+            pass
+        return cls(root, patterns)
+
+    def _add(self, pattern):
+        pattern = pattern.rstrip()
+        if not pattern or pattern.startswith('#'):
+            return
+        negated = pattern.startswith('!')
+        if negated:
+            pattern = pattern[1:]
+        dir_only = pattern.endswith('/')
+        pattern = pattern.strip('/')
+        if pattern:
+            anchored = '/' in pattern
+            self._rules.append((pattern, anchored, dir_only, negated))
+
+    def match(self, path, is_dir=False):
+        """Return True if path (inside root) is ignored."""
+        rel_path = os.path.relpath(path, self.root)
+        if rel_path.startswith(os.pardir):
+            return False
+        parts = rel_path.replace(os.sep, '/').split('/')
+        ignored = False
+        for pattern, anchored, dir_only, negated in self._rules:
+            if ignored == (not negated):
+                # This rule can't change the result
+                continue
+            # The path and the folders containing it
+            for i in range(len(parts), 0, -1):
+                if dir_only and i == len(parts) and not is_dir:
+                    continue
+                if anchored:
+                    matched = fnmatch.fnmatchcase(
+                        '/'.join(parts[:i]), pattern)
+                else:
+                    matched = fnmatch.fnmatchcase(parts[i - 1], pattern)
+                if matched:
+                    ignored = not negated
+                    break
+        return ignored
+
+
+def content_digest(content):
+    """Return the digest of content (bytes) compared by the tracker."""
+    return hashlib.sha1(content).digest()
+
+
+def file_digest(file_path):
+    """Return ((mtime, size), sha1 of the content) of file_path."""
+    stat = os.stat(file_path)
+    with open(file_path, 'rb') as f:
+        digest = content_digest(f.read())
+    return (stat.st_mtime_ns, stat.st_size), digest
+
+
+class OpenFilesTracker(QObject):
+    """Watch the open files with one QFileSystemWatcher (kernel
+    notifications) for all of them.
+
+    Each path is watched once whatever the amount of callbacks
+    registered for it. The notifications are collected for
+    BATCH_INTERVAL ms, then the files whose mtime or size changed are
+    read and only the ones with a different content are reported, with
+    one callback(event, path) per file and one filesChanged([(event,
+    path)]) for the batch.
+
+    The files are never read to watch them, the callers pass the digest
+    of the content they just read or wrote. Without it, the first change
+    of the mtime or size is reported."""
+
+    filesChanged = pyqtSignal('PyQt_PyObject')
+
+    # Milliseconds collecting notifications before checking the files
+    BATCH_INTERVAL = 200
+
+    def __init__(self, parent=None):
+        super(OpenFilesTracker, self).__init__(parent)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        # {path: [callback]}
+        self._callbacks = {}
+        # {path: ((mtime, size), digest or None)} of the last content known
+        self._stamps = {}
+        self._pending = set()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.BATCH_INTERVAL)
+        self._timer.timeout.connect(self._check_pending)
+
+    def watch(self, file_path, callback, digest=None):
+        """digest is the content_digest of the file, if known."""
+        callbacks = self._callbacks.setdefault(file_path, [])
+        if not callbacks:
+            self.update(file_path, digest)
+        callbacks.append(callback)
+
+    def unwatch(self, file_path, callback):
+        callbacks = self._callbacks.get(file_path, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self._callbacks.pop(file_path, None)
+            self._stamps.pop(file_path, None)
+            self._pending.discard(file_path)
+            self._watcher.removePath(file_path)
+
+    def is_watched(self, file_path):
+        return file_path in self._callbacks
+
+    def update(self, file_path, digest=None):
+        """Take the current content of file_path as known (ie: after the
+        IDE saves it), it's not reported as changed. digest is the
+        content_digest of what was written, if known."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self._stamps.pop(file_path, None)
+            return
+        self._stamps[file_path] = (
+            (stat.st_mtime_ns, stat.st_size), digest)
+        # A file replaced by a rename is no longer watched
+        self._watcher.removePath(file_path)
+        self._watcher.addPath(file_path)
+
+    def _on_file_changed(self, file_path):
+        if file_path in self._callbacks:
+            self._pending.add(file_path)
+            if not self._timer.isActive():
+                self._timer.start()
+
+    def _check_pending(self):
+        pending, self._pending = self._pending, set()
+        watched = set(self._watcher.files())
+        events = []
+        for file_path in sorted(pending):
+            old_stamp = self._stamps.get(file_path)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                if old_stamp is not None:
+                    del self._stamps[file_path]
+                    events.append((DELETED, file_path))
+                continue
+            if file_path not in watched:
+                self._watcher.addPath(file_path)
+            if old_stamp is not None and \
+                    old_stamp[0] == (stat.st_mtime_ns, stat.st_size):
+                continue
+            try:
+                stamp = file_digest(file_path)
+            except (IOError, OSError):
+                continue
+            self._stamps[file_path] = stamp
+            if old_stamp is None:
+                # Created again after being deleted
+                events.append((MODIFIED, file_path))
+            elif old_stamp[1] is None or stamp[1] != old_stamp[1]:
+                events.append((MODIFIED, file_path))
+        for event, file_path in events:
+            for callback in list(self._callbacks.get(file_path, ())):
+                callback(event, file_path)
+        if events:
+            self.filesChanged.emit(events)
+
+
+_tracker = None
+
+
+def get_tracker():
+    """Return the OpenFilesTracker shared by all the open files."""
+    global _tracker
+    if _tracker is None:
+        _tracker = OpenFilesTracker()
+    return _tracker
 
 
 class BaseWatcher(QObject):
 
-###############################################################################
-# SIGNALS
-#
-# fileChanged(int, QString)  [added, deleted, modified, rename, remove]
-###############################################################################
+    # (event, path) of the single files watched
+    fileChanged = pyqtSignal(int, 'QString')
+    # [(event, path)] of the folders watched, coalesced in batches
+    filesChanged = pyqtSignal('PyQt_PyObject')
 
     def __init__(self):
         super(BaseWatcher, self).__init__()
-        self._single_file_watcher = None
-        self.allow_kill = True
+        self._single_files = set()
 
     def add_file_watch(self, file_path):
-        if not self._single_file_watcher:
-            self._single_file_watcher = \
-                SingleFileWatcher(self._emit_signal_on_change)
-            self.connect(self._single_file_watcher,
-                SIGNAL("destroyed(QObject*)"), self.on_destroy)
-            self._single_file_watcher.start()
-        self._single_file_watcher.add_watch(file_path)
+        if file_path in self._single_files:
+            return
+        if do_stat(file_path) is None:
+            self._emit_signal_on_change(DELETED, file_path)
+            return
+        self._single_files.add(file_path)
+        get_tracker().watch(file_path, self._emit_signal_on_change)
 
     def remove_file_watch(self, file_path):
-        if self._single_file_watcher:
-            self._single_file_watcher.del_watch(file_path)
-            if self._single_file_watcher.is_empty() and self.allow_kill:
-                self._single_file_watcher.stop_running()
-                self._single_file_watcher.quit()
-
-    def on_destroy(self):
-        self._single_file_watcher.wait()
-        self._single_file_watcher = None
+        if file_path in self._single_files:
+            self._single_files.remove(file_path)
+            get_tracker().unwatch(file_path, self._emit_signal_on_change)
 
     def shutdown_notification(self):
-        if hasattr(self, "_single_file_watcher") and self._single_file_watcher:
-            self._single_file_watcher.stop_running()
-            self._single_file_watcher.quit()
+        for file_path in list(self._single_files):
+            self.remove_file_watch(file_path)
 
     def _emit_signal_on_change(self, event, path):
         DEBUG("About to emit the signal" + repr(event))
-        #self.emit(SIGNAL("fileChanged(int, QString)"), event, path)
+        self.fileChanged.emit(event, path)
+
+    def _emit_batch(self, events):
+        self.filesChanged.emit(events)
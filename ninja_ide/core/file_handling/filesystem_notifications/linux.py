@@ -18,10 +18,17 @@
 from __future__ import absolute_import
 
 import os
-
-from PyQt4.QtCore import QThread
+import time
+import threading
+from collections import deque
+
+from PyQt5.QtCore import (
+    QThread,
+    pyqtSignal
+)
 from pyinotify import ProcessEvent, IN_CREATE, IN_DELETE, IN_DELETE_SELF, \
-                        IN_MODIFY, WatchManager, Notifier, ExcludeFilter
+    IN_MODIFY, IN_MOVED_FROM, IN_MOVED_TO, IN_MOVE_SELF, WatchManager, \
+    Notifier
 
 from ninja_ide.tools.logger import NinjaLogger
 logger = NinjaLogger('ninja_ide.core.file_handling.filesystem_notifications.linux')
@@ -37,70 +44,161 @@ MODIFIED = base_watcher.MODIFIED
 #from ninja_ide.core.file_handling.filesystem_notifications.base_watcher import ADDED, \
 #                                            DELETED, REMOVE, RENAME, MODIFIED
 
-mask = IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MODIFY
+mask = IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MODIFY | IN_MOVED_FROM | \
+    IN_MOVED_TO | IN_MOVE_SELF
+
+# Milliseconds without events before a batch is sent
+BATCH_INTERVAL = 200
+# A batch is sent at least this often (ms) during long bursts
+MAX_LATENCY = 1000
 
 
 class NinjaProcessEvent(ProcessEvent):
 
-    def __init__(self, process_callback):
+    def __init__(self, process_callback, overflow_callback=None):
         self._process_callback = process_callback
+        self._overflow_callback = overflow_callback
         ProcessEvent.__init__(self)
 
+    def process_IN_Q_OVERFLOW(self, event):
+        if self._overflow_callback is not None:
+            self._overflow_callback()
+
     def process_IN_CREATE(self, event):
-        self._process_callback((ADDED, event.pathname))
+        self._process_callback((ADDED, event.pathname, event.dir))
 
     def process_IN_DELETE(self, event):
-        self._process_callback((DELETED, event.pathname))
+        self._process_callback((DELETED, event.pathname, event.dir))
 
     def process_IN_DELETE_SELF(self, event):
-        self._process_callback((DELETED, event.pathname))
+        self._process_callback((DELETED, event.pathname, event.dir))
 
     def process_IN_MODIFY(self, event):
-        self._process_callback((MODIFIED, event.pathname))
+        self._process_callback((MODIFIED, event.pathname, event.dir))
 
     def process_IN_MOVED_TO(self, event):
-        self._process_callback((REMOVE, event.pathname))
+        self._process_callback((REMOVE, event.pathname, event.dir))
 
     def process_IN_MOVED_FROM(self, event):
-        self._process_callback((REMOVE, event.pathname))
+        self._process_callback((REMOVE, event.pathname, event.dir))
 
     def process_IN_MOVE_SELF(self, event):
-        self._process_callback((RENAME, event.pathname))
+        self._process_callback((RENAME, event.pathname, event.dir))
+
 
+class InotifyEngine(QThread):
+    """One inotify instance watching all the folders, the events are
+    coalesced and sent in batches when they stop for BATCH_INTERVAL ms
+    (or every MAX_LATENCY ms during a long burst, ie: a git checkout).
 
-class QNotifier(QThread):
-    def __init__(self, wm, processor):
-        self.event_queue = list()
-        self._processor = processor
-        self.notifier = Notifier(wm,
-                            NinjaProcessEvent(self.event_queue.append))
-        self.notifier.coalesce_events(True)
+    If the kernel queue overflows the events are lost, then the batch
+    includes (MODIFIED, root) for every root to rescan them."""
+
+    eventsReady = pyqtSignal('PyQt_PyObject')
+
+    def __init__(self):
+        super(InotifyEngine, self).__init__()
+        self._events = deque()
+        self._watch_manager = WatchManager()
+        self._overflowed = False
+        self._notifier = Notifier(
+            self._watch_manager,
+            NinjaProcessEvent(self._events.append, self._on_overflow))
+        # The watch manager is used from the GUI thread to add watches
+        self._lock = threading.Lock()
+        # {root: (watch descriptors, IgnoreRules)}
+        self._roots = {}
         self.keep_running = True
-        QThread.__init__(self)
+
+    def watch(self, root, rules):
+        """Watch root recursively, the ignored folders aren't walked.
+        Returns False if the inotify watch limit was reached, the folders
+        already watched are kept."""
+        def exclude(path):
+            return rules.match(path, True)
+        wds = []
+        complete = True
+        for folder, folders, _ in os.walk(root):
+            folders[:] = [name for name in folders
+                          if not exclude(os.path.join(folder, name))]
+            # The new folders are added by pyinotify (auto_add)
+            with self._lock:
+                added = self._watch_manager.add_watch(
+                    folder, mask, auto_add=True, quiet=True,
+                    exclude_filter=exclude)
+            wd = added.get(folder, -1)
+            if wd >= 0:
+                wds.append(wd)
+            elif wd == -1:
+                # -2 is an excluded folder, -1 an error adding the watch
+                complete = False
+        self._roots[root] = (wds, rules)
+        return complete and bool(wds)
+
+    def unwatch(self, root):
+        wds, _ = self._roots.pop(root, ((), None))
+        with self._lock:
+            self._watch_manager.rm_watch(list(wds), quiet=True)
+
+    def _rules_for(self, path):
+        # The deepest root containing path
+        best = None
+        for root, (_, rules) in list(self._roots.items()):
+            if path == root or path.startswith(os.path.join(root, '')):
+                if best is None or len(root) > len(best.root):
+                    best = rules
+        return best
+
+    def _on_overflow(self):
+        self._overflowed = True
+        # Starts the batch timer, the roots are added by _flush
+        self._events.append((MODIFIED, None, True))
+
+    def _flush(self):
+        events = []
+        if self._overflowed:
+            logger.warning("The inotify queue overflowed, rescanning")
+            self._overflowed = False
+            events.extend((MODIFIED, root) for root in list(self._roots))
+        while self._events:
+            event, path, is_dir = self._events.popleft()
+            if path is None:
+                continue
+            rules = self._rules_for(path)
+            if rules is None or rules.match(path, is_dir):
+                continue
+            events.append((event, path))
+        events = base_watcher.coalesce_events(events)
+        if events:
+            self.eventsReady.emit(events)
 
     def run(self):
+        first_event = last_event = None
         while self.keep_running:
-            try:
-                self.notifier.process_events()
-            except OSError:
-                pass  # OSError: [Errno 2] No such file or directory happens
-            e_dict = {}
-            while len(self.event_queue):
-                e_type, e_path = self.event_queue.pop(0)
-                e_dict.setdefault(e_path, []).append(e_type)
-
-            keys = list(e_dict.keys())
-            while len(keys):
-                key = keys.pop(0)
-                event = e_dict.pop(key)
-                if (ADDED in event) and (DELETED in event):
-                    event = [e for e in event if e not in (ADDED, DELETED)]
-                for each_event in event:
-                    self._processor(each_event, key)
-            if self.notifier.check_events():
-                self.notifier.read_events()
-
-        self.notifier.stop()
+            ready = self._notifier.check_events(timeout=BATCH_INTERVAL)
+            if ready:
+                with self._lock:
+                    try:
+                        self._notifier.read_events()
+                        self._notifier.process_events()
+                    except OSError:
+                        # The file was removed before reading its event
+                        pass
+            now = time.monotonic()
+            if ready and self._events:
+                last_event = now
+                if first_event is None:
+                    first_event = now
+            if first_event is not None and (
+                    now - last_event >= BATCH_INTERVAL / 1000 or
+                    now - first_event >= MAX_LATENCY / 1000):
+                self._flush()
+                first_event = last_event = None
+        self._notifier.stop()
+
+    def stop(self):
+        self.keep_running = False
+        self.wait()
 
 
 class NinjaFileSystemWatcher(base_watcher.BaseWatcher):
@@ -108,32 +206,35 @@ class NinjaFileSystemWatcher(base_watcher.BaseWatcher):
     def __init__(self):
         self.watching_paths = {}
         super(NinjaFileSystemWatcher, self).__init__()
-        self._ignore_hidden = ('.git', '.hg', '.svn', '.bzr')
+        self._engine = None
 
     def add_watch(self, path):
-        if path not in self.watching_paths:
-            try:
-                wm = WatchManager()
-                notifier = QNotifier(wm, self._emit_signal_on_change)
-                notifier.start()
-                exclude = ExcludeFilter([os.path.join(path, folder)
-                    for folder in self._ignore_hidden])
-                wm.add_watch(path, mask, rec=True, auto_add=True,
-                    exclude_filter=exclude)
-                self.watching_paths[path] = notifier
-            except (OSError, IOError):
-                pass
-                #Shit happens, most likely temp file
+        if path in self.watching_paths:
+            return
+        if self._engine is None:
+            self._engine = InotifyEngine()
+            self._engine.eventsReady.connect(self._emit_batch)
+            self._engine.start()
+        rules = base_watcher.IgnoreRules.for_project(path)
+        try:
+            complete = self._engine.watch(path, rules)
+        except (OSError, IOError):
+            # Shit happens, most likely temp file
+            return
+        self.watching_paths[path] = complete
+        if not complete:
+            logger.warning(
+                "The inotify watch limit was reached watching %s, some "
+                "folders won't be updated (see the "
+                "fs.inotify.max_user_watches setting)" % path)
 
     def remove_watch(self, path):
-        if path in self.watching_paths:
-            notifier = self.watching_paths.pop(path)
-            notifier.keep_running = False
-            notifier.quit()
+        if self.watching_paths.pop(path, None) is not None:
+            self._engine.unwatch(path)
 
     def shutdown_notification(self):
         base_watcher.BaseWatcher.shutdown_notification(self)
-        for each_path in self.watching_paths:
-            notifier = self.watching_paths[each_path]
-            notifier.keep_running = False
-            notifier.quit()
+        self.watching_paths = {}
+        if self._engine is not None:
+            self._engine.stop()
+            self._engine = None
@@ -15,12 +15,12 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 
+import io
 import os
 import shutil
 from PyQt5.QtCore import (
     QObject,
     QFile,
-    QFileSystemWatcher,
     QIODevice,
     QTextStream,
     pyqtSignal
@@ -30,6 +30,7 @@ from ninja_ide import translations
 # FIXME: Obtain these form a getter
 from ninja_ide.core import settings
 from ninja_ide.tools.utils import SignalFlowControl
+from ninja_ide.core.file_handling.filesystem_notifications import base_watcher
 from .file_manager import NinjaIOException, NinjaNoFileNameException, \
     get_file_encoding, get_basename, get_file_extension
 
@@ -79,8 +80,9 @@ class NFile(QObject):
         """
         self._file_path = path
         self.__created = False
-        self.__watcher = None
-        self.__mtime = None
+        self.__watching = False
+        # Digest of the content last read or written, for the tracker
+        self.__digest = None
         super(NFile, self).__init__()
         if not self._exists():
             self.__created = True
@@ -119,20 +121,21 @@ class NFile(QObject):
         return self._file_path
 
     def start_watching(self):
-        """Create a file system watcher and connect its fileChanged
-        SIGNAL to our _file_changed SLOT"""
-        if self.__watcher is None:
-            self.__watcher = QFileSystemWatcher(self)
-            self.__watcher.fileChanged['const QString&'].connect(
-                self._file_changed)
-        if self._file_path is not None:
-            self.__mtime = os.path.getmtime(self._file_path)
-            self.__watcher.addPath(self._file_path)
-
-    def _file_changed(self, path):
-        current_mtime = os.path.getmtime(self._file_path)
-        if current_mtime != self.__mtime:
-            self.__mtime = current_mtime
+        """Register the file in the open files tracker, fileChanged is
+        emitted when its content is modified outside the IDE"""
+        if self._file_path is not None and not self.__watching:
+            base_watcher.get_tracker().watch(
+                self._file_path, self._file_changed, self.__digest)
+            self.__watching = True
+
+    def _stop_watching(self):
+        if self.__watching:
+            base_watcher.get_tracker().unwatch(
+                self._file_path, self._file_changed)
+            self.__watching = False
+
+    def _file_changed(self, event, path):
+        if event == base_watcher.MODIFIED:
             self.fileChanged.emit()
 
     def has_write_permission(self):
@@ -172,10 +175,9 @@ class NFile(QObject):
         .nsf = Ninja Swap File
         # FIXME: Where to locate addExtension, does not fit here
         """
-        new_path = False
         if path:
+            self._stop_watching()
             self.attach_to_path(path)
-            new_path = True
 
         save_path = self._file_path
 
@@ -184,11 +186,6 @@ class NFile(QObject):
                                            "file but no one told me where")
         swap_save_path = "%s.nsp" % save_path
 
-        # If we have a file system watcher, remove the file path
-        # from its watch list until we are done making changes.
-        if self.__watcher is not None:
-            self.__watcher.removePath(save_path)
-
         flags = QIODevice.WriteOnly | QIODevice.Truncate
         f = QFile(swap_save_path)
         if settings.use_platform_specific_eol():
@@ -206,21 +203,19 @@ class NFile(QObject):
         f.write(encoded_stream)
         f.flush()
         f.close()
+        if flags & QIODevice.Text:
+            # The end of lines written are not the ones encoded
+            self.__digest = None
+        else:
+            self.__digest = base_watcher.content_digest(bytes(encoded_stream))
         # SIGNAL: Will save (temp, definitive) to warn folder to do something
         self.willSave.emit(swap_save_path, save_path)
-        self.__mtime = os.path.getmtime(swap_save_path)
         shutil.move(swap_save_path, save_path)
         self.reset_state()
 
-        # If we have a file system watcher, add the saved path back
-        # to its watch list, otherwise create a watcher and start
-        # watching
-        if self.__watcher is not None:
-            if new_path:
-                self.__watcher.removePath(self.__watcher.files()[0])
-                self.__watcher.addPath(self._file_path)
-            else:
-                self.__watcher.addPath(save_path)
+        # Our own changes are not reported by the tracker
+        if self.__watching:
+            base_watcher.get_tracker().update(save_path, self.__digest)
         else:
             self.start_watching()
         return self
@@ -241,11 +236,13 @@ class NFile(QObject):
             raise NinjaNoFileNameException("I am asked to read a file "
                                            "but no one told me from where")
         try:
-            with open(open_path, 'r') as f:
-                content = f.read()
+            with open(open_path, 'rb') as f:
+                data = f.read()
         except IOError as reason:
             raise NinjaIOException(reason)
-        return content
+        self.__digest = base_watcher.content_digest(data)
+        # Decoded like open(open_path, 'r') does
+        return io.TextIOWrapper(io.BytesIO(data)).read()
 
     def move(self, new_path):
         """
@@ -266,11 +263,12 @@ class NFile(QObject):
                                         new_path)
                 if signal_handler.stopped():
                     return
-            if self.__watcher is not None:
-                self.__watcher.removePath(self._file_path)
+            watching = self.__watching
+            self._stop_watching()
             shutil.move(self._file_path, new_path)
-            if self.__watcher:
-                self.__watcher.addPath(new_path)
+            self._file_path = new_path
+            if watching:
+                self.start_watching()
         self._file_path = new_path
         return
 
@@ -307,8 +305,7 @@ class NFile(QObject):
             signal_handler = SignalFlowControl()
             self.willDelete.emit(signal_handler, self)
             if not signal_handler.stopped():
-                if self.__watcher is not None:
-                    self.__watcher.removePath(self._file_path)
+                self._stop_watching()
                 os.remove(self._file_path)
 
     def close(self, force_close=False):
@@ -321,5 +318,4 @@ class NFile(QObject):
         self.fileClosing.emit(self._file_path, force_close)
 
     def remove_watcher(self):
-        if self.__watcher is not None:
-            self.__watcher.removePath(self._file_path)
+        self._stop_watching()
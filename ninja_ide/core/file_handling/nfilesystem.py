@@ -23,6 +23,7 @@ from PyQt5.QtCore import (
     pyqtSignal
 )
 from ninja_ide.core.file_handling.nfile import NFile
+from ninja_ide.core.file_handling import filesystem_notifications
 from ninja_ide.tools import ui_tools
 from ninja_ide.tools.logger import NinjaLogger
 logger = NinjaLogger('ninja_ide.core.file_handling.nfilesystem')
@@ -32,6 +33,8 @@ class NVirtualFileSystem(QObject):
     # Signals
     projectOpened = pyqtSignal('QString')
     projectClosed = pyqtSignal('QString')
+    # Paths changed outside the editors in the opened projects, in batches
+    filesChanged = pyqtSignal('PyQt_PyObject')
 
     def __init__(self, *args, **kwargs):
         self.__tree = {}
@@ -40,6 +43,8 @@ class NVirtualFileSystem(QObject):
         # bc maps are cheap but my patience is not
         self.__reverse_project_map = {}
         super(NVirtualFileSystem, self).__init__(*args, **kwargs)
+        self._watcher = filesystem_notifications.NinjaFileSystemWatcher
+        self._watcher.filesChanged.connect(self._on_files_changed)
 
     def list_projects(self):
         return list(self.__projects.keys())
@@ -60,6 +65,7 @@ class NVirtualFileSystem(QObject):
             qfsm.setNameFilters(pext)
             self.__projects[project_path] = project
             self.__check_files_for(project_path)
+            self._watcher.add_watch(project_path)
             self.projectOpened.emit(project_path)
         else:
             qfsm = self.__projects[project_path]
@@ -83,8 +89,15 @@ class NVirtualFileSystem(QObject):
             # This might not be needed just being extra cautious
             del self.__projects[project_path].model
             del self.__projects[project_path]
+            self._watcher.remove_watch(project_path)
             self.projectClosed.emit(project_path)
 
+    def _on_files_changed(self, events):
+        self.filesChanged.emit([path for _, path in events])
+
+    def shutdown(self):
+        self._watcher.shutdown_notification()
+
     def __check_files_for(self, project_path):
         project = self.__projects[project_path]
         for each_file_path in list(self.__tree.keys()):
@@ -214,6 +214,13 @@ EXTENSIONS = {}
 # 2: Ignore
 RELOAD_FILE = 0
 
+# Minutes an unmodified editor can stay hidden before being hibernated,
+# 0 never hibernates them
+HIBERNATE_EDITORS_AFTER = 30
+# Megabytes of memory the IDE can use before hibernating the least
+# recently used editors, 0 means no limit
+EDITORS_MEMORY_BUDGET = 0
+
 ###############################################################################
 # CHECKERS
 ###############################################################################
@@ -430,9 +437,11 @@ def clean_locator_db(qsettings):
 
     last_clean = should_clean_locator_knowledge()
     if last_clean is not None:
+        from ninja_ide.tools.locator import knowledge_db
         file_path = os.path.join(resources.NINJA_KNOWLEDGE_PATH, 'locator.db')
-        if os.path.isfile(file_path):
-            os.remove(file_path)
+        knowledge_db.remove_db(file_path)
+        knowledge_db.remove_db(
+            os.path.join(resources.NINJA_KNOWLEDGE_PATH, 'summaries.db'))
         qsettings.setValue("ide/cleanLocator", last_clean)
 
 
@@ -507,6 +516,8 @@ def load_settings():
     global SHOW_LINE_NUMBERS
     global SHOW_TEXT_CHANGES
     global RELOAD_FILE
+    global HIBERNATE_EDITORS_AFTER
+    global EDITORS_MEMORY_BUDGET
     global CUSTOM_SCREEN_RESOLUTION
     global HDPI
     global HIGHLIGHT_CURRENT_LINE
@@ -530,6 +541,9 @@ def load_settings():
     NINJA_SKIN = qsettings.value("ide/interface/skin", "Dark", type=str)
     # sessionDict = dict(data_qsettings.value('ide/sessions', {}))
     RELOAD_FILE = qsettings.value("ide/reloadSetting", 0, type=int)
+    HIBERNATE_EDITORS_AFTER = qsettings.value(
+        "ide/hibernateAfter", 30, type=int)
+    EDITORS_MEMORY_BUDGET = qsettings.value("ide/memoryBudget", 0, type=int)
     CUSTOM_SCREEN_RESOLUTION = qsettings.value(
         "ide/interface/customScreenResolution", "", type=str)
     HDPI = qsettings.value("ide/interface/autoHdpi", False, type=bool)
@@ -44,6 +44,7 @@ resources.load_shortcuts()
 # Register Components:
 # lint:disable
 import ninja_ide.gui.main_panel.main_container  # noqa
+# Not loaded on first use: it lints the projects as they are opened
 import ninja_ide.gui.tools_dock.errors_tree  # noqa
 import ninja_ide.gui.tools_dock.tools_dock  # noqa
 import ninja_ide.gui.central_widget  # noqa
@@ -55,35 +56,22 @@ from ninja_ide.gui.syntax_registry import syntax_registry  # noqa
 # Explorer Container
 import ninja_ide.gui.explorer.explorer_container  # noqa
 from ninja_ide.gui.explorer.tabs import tree_projects_widget  # noqa
+# Not loaded on first use: it's a tab of the explorer, updated by
+# every editor
 from ninja_ide.gui.explorer.tabs import tree_symbols_widget  # noqa
 # from ninja_ide.gui.explorer.tabs import web_inspector
-# Checkers
-from ninja_ide.gui.editor.checkers import errors_checker  # noqa
-from ninja_ide.gui.editor.checkers import pep8_checker  # noqa
-# from ninja_ide.gui.editor.checkers import migration_2to3
-# Preferences
-from ninja_ide.gui.dialogs.preferences import preferences_general  # noqa
-from ninja_ide.gui.dialogs.preferences import preferences_execution  # noqa
-# from ninja_ide.gui.dialogs.preferences import preferences_shortcuts
-from ninja_ide.gui.dialogs.preferences import preferences_interface  # noqa
-from ninja_ide.gui.dialogs.preferences import preferences_editor_general  # noqa
-from ninja_ide.gui.dialogs.preferences import preferences_editor_display  # noqa
-from ninja_ide.gui.dialogs.preferences import preferences_editor_behavior  # noqa
-from ninja_ide.gui.dialogs.preferences import preferences_editor_intellisense  # noqa
-# from ninja_ide.gui.dialogs.preferences import preferences_editor_completion
-# from ninja_ide.gui.dialogs.preferences import preferences_plugins
-# from ninja_ide.gui.dialogs.preferences import preferences_theme
-# Templates
-from ninja_ide.core.template_registry import ntemplate_registry  # noqa
-from ninja_ide.core.template_registry import (
-    bundled_project_types
-)
+# Checkers and Preferences are imported on first use
+# (see editor.checkers.get_checkers_for and preferences.PAGES)
 ###########################################################################
 # Start Virtual Env that supports encapsulation of plugins
 ###########################################################################
 # from ninja_ide.core.encapsulated_env import nenvironment
 
 from ninja_ide.gui import ide  # noqa
+# Templates
+ide.IDE.register_lazy_service(
+    'template_registry',
+    'ninja_ide.core.template_registry.bundled_project_types')
 
 
 def start_ide(app, filenames, projects_path, extra_plugins, linenos):
@@ -15,6 +15,8 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 
+import importlib
+
 from PyQt5.QtWidgets import (
     QDialog,
     QWidget,
@@ -38,6 +40,17 @@ from PyQt5.QtCore import (
 )
 from ninja_ide import translations
 
+# Modules of the pages, they register themselves when imported (the first
+# time the dialog is opened)
+PAGES = (
+    'preferences_general',
+    'preferences_execution',
+    'preferences_interface',
+    'preferences_editor_general',
+    'preferences_editor_display',
+    'preferences_editor_behavior',
+    'preferences_editor_intellisense',
+)
 
 SECTIONS = {
     'GENERAL': 0,
@@ -97,6 +110,7 @@ class Preferences(QDialog):
         self.tree.selectionModel().currentRowChanged.connect(
             self._change_current)
 
+        load_pages()
         self.load_ui()
 
     @pyqtSlot()
@@ -176,6 +190,14 @@ class Preferences(QDialog):
             config['subsections'] = subconfig
             Preferences.configuration[section] = config
 
+
+def load_pages():
+    """Import the modules of PAGES not imported yet."""
+    for page in PAGES:
+        importlib.import_module(
+            'ninja_ide.gui.dialogs.preferences.' + page)
+
+
 """
 from __future__ import absolute_import
 from __future__ import unicode_literals
@@ -61,6 +61,8 @@ class GeneralConfiguration(QWidget):
             translations.TR_PREFERENCES_GENERAL_AUTOSAVE)
         group_box_modification = QGroupBox(
             translations.TR_PREFERENCES_GENERAL_EXTERNALLY_MOD)
+        group_box_memory = QGroupBox(
+            translations.TR_PREFERENCES_GENERAL_MEMORY)
 
         # Group start
         box_start = QVBoxLayout(group_box_start)
@@ -110,11 +112,32 @@ class GeneralConfiguration(QWidget):
         self._combo_mod.addItems(["Ask", "Reload", "Ignore"])
         box_mod.addWidget(self._combo_mod)
 
+        # Editors hibernation
+        grid_memory = QGridLayout(group_box_memory)
+        grid_memory.addWidget(
+            QLabel(translations.TR_PREFERENCES_GENERAL_HIBERNATE_AFTER), 0, 0)
+        self._spin_hibernate = QSpinBox()
+        self._spin_hibernate.setRange(0, 1440)
+        self._spin_hibernate.setSuffix("min")
+        self._spin_hibernate.setSpecialValueText(
+            translations.TR_PREFERENCES_GENERAL_NEVER)
+        grid_memory.addWidget(self._spin_hibernate, 0, 1)
+        grid_memory.addWidget(
+            QLabel(translations.TR_PREFERENCES_GENERAL_MEMORY_BUDGET), 1, 0)
+        self._spin_budget = QSpinBox()
+        self._spin_budget.setRange(0, 65536)
+        self._spin_budget.setSingleStep(64)
+        self._spin_budget.setSuffix("MB")
+        self._spin_budget.setSpecialValueText(
+            translations.TR_PREFERENCES_GENERAL_NO_LIMIT)
+        grid_memory.addWidget(self._spin_budget, 1, 1)
+
         # Add groups to main layout
         vbox.addWidget(group_box_start)
         vbox.addWidget(group_box_workspace)
         vbox.addWidget(group_box_autosave)
         vbox.addWidget(group_box_modification)
+        vbox.addWidget(group_box_memory)
         vbox.addWidget(group_box_reset, alignment=Qt.AlignLeft)
         vbox.addSpacerItem(
             QSpacerItem(0, 0, QSizePolicy.Expanding, QSizePolicy.Expanding))
@@ -129,6 +152,8 @@ class GeneralConfiguration(QWidget):
         qsettings.endGroup()
         self._text_workspace.setText(settings.WORKSPACE)
         self._combo_mod.setCurrentIndex(settings.RELOAD_FILE)
+        self._spin_hibernate.setValue(settings.HIBERNATE_EDITORS_AFTER)
+        self._spin_budget.setValue(settings.EDITORS_MEMORY_BUDGET)
 
         # Connections
         btn_reset.clicked.connect(self._reset_preferences)
@@ -169,6 +194,10 @@ class GeneralConfiguration(QWidget):
         qsettings.setValue("workspace", settings.WORKSPACE)
         settings.RELOAD_FILE = self._combo_mod.currentIndex()
         qsettings.setValue("reloadSetting", settings.RELOAD_FILE)
+        settings.HIBERNATE_EDITORS_AFTER = self._spin_hibernate.value()
+        qsettings.setValue("hibernateAfter", settings.HIBERNATE_EDITORS_AFTER)
+        settings.EDITORS_MEMORY_BUDGET = self._spin_budget.value()
+        qsettings.setValue("memoryBudget", settings.EDITORS_MEMORY_BUDGET)
 
         qsettings.endGroup()
 
@@ -31,7 +31,6 @@ from PyQt5.QtCore import Qt
 
 from ninja_ide import translations
 from ninja_ide.core import settings
-from ninja_ide.core.file_handling import file_manager
 
 
 class SessionsManager(QDialog):
@@ -118,7 +117,7 @@ class SessionsManager(QDialog):
             else:
                 stat_value = os.stat(path).st_mtime
             files_info.append([path,
-                               editable.editor.cursor_position, stat_value])
+                               editable.cursor_position, stat_value])
         projects_obj = ide.filesystem.get_projects()
         projects = [projects_obj[proj].path for proj in projects_obj]
         settings.SESSIONS[sessionName] = [files_info, projects]
@@ -158,13 +157,7 @@ class SessionsManager(QDialog):
         projects_explorer = self._ide.get_service('projects_explorer')
         if projects_explorer and main_container:
             projects_explorer.close_opened_projects()
-            for fileData in settings.SESSIONS[key][0]:
-                path, (line, col), stat_value = fileData
-                if file_manager.file_exists(path):
-                    mtime = os.stat(path).st_mtime
-                    ignore_checkers = (mtime == stat_value)
-                    main_container.open_file(path, line, col,
-                                             ignore_checkers=ignore_checkers)
+            main_container.restore_files(settings.SESSIONS[key][0])
             if projects_explorer:
                 projects_explorer.load_session_projects(
                     settings.SESSIONS[key][1])
@@ -15,8 +15,19 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 
+import importlib
+
 NOTIFICATIONS_CHECKERS = {}
 
+# Modules registering the bundled checkers, imported on the first call of
+# get_checkers_for
+CHECKER_MODULES = (
+    'ninja_ide.gui.editor.checkers.errors_checker',
+    'ninja_ide.gui.editor.checkers.pep8_checker',
+)
+
+_checkers_loaded = False
+
 
 def register_checker(lang='python', checker=None, color=None, priority=1):
     """Register a Checker (Like PEP8, Lint, etc) for some language.
@@ -40,5 +51,9 @@ def remove_checker(checker):
 
 def get_checkers_for(lang='python'):
     """Get a registered checker for some language."""
-    global NOTIFICATIONS_CHECKERS
+    global NOTIFICATIONS_CHECKERS, _checkers_loaded
+    if not _checkers_loaded:
+        _checkers_loaded = True
+        for module_name in CHECKER_MODULES:
+            importlib.import_module(module_name)
     return NOTIFICATIONS_CHECKERS.get(lang, [])
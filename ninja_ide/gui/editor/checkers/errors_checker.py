@@ -15,36 +15,44 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 
-import _ast
 from PyQt5.QtCore import (
-    QThread,
-    pyqtSignal,
-    QTimer
+    QObject,
+    QTimer,
+    pyqtSignal
 )
 from ninja_ide.gui.editor.checkers import (
     register_checker,
     remove_checker
 )
+from ninja_ide.gui.editor.checkers import lint_service
 from ninja_ide import resources
 from ninja_ide import translations
 from ninja_ide.core import settings
-from ninja_ide.dependencies.pyflakes_mod import checker
 from ninja_ide.tools import ui_tools
-from ninja_ide.tools.logger import NinjaLogger
 from ninja_ide.core.file_handling import file_manager
 
-logger = NinjaLogger(__file__)
 
+class ErrorsChecker(QObject):
+    """Run PyFlakes over the editor content in the lint service process.
 
-class ErrorsChecker(QThread):
+    finished is emitted once for each call to run_checks, the calls
+    made in CHECK_DELAY ms are checked together."""
 
     checkerCompleted = pyqtSignal()
+    finished = pyqtSignal()
+
+    CHECK_DELAY = 50
 
     def __init__(self, neditor):
         super().__init__()
         self._neditor = neditor
         self._path = ''
+        self._version = 0
         self.checks = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.CHECK_DELAY)
+        self._timer.timeout.connect(self._check)
 
         self.checker_icon = ui_tools.colored_icon(
             ":img/bicho",
@@ -52,41 +60,37 @@ class ErrorsChecker(QThread):
         )
 
     def run_checks(self):
-        if not self.isRunning():
-            self._path = self._neditor.file_path
-            QTimer.singleShot(50, self.start)
+        if self._timer.isActive():
+            # The call waiting is checked with this one
+            self.finished.emit()
+        self._timer.start()
 
-    def reset(self):
-        self.checks.clear()
-
-    def run(self):
+    def _check(self):
+        self._path = self._neditor.file_path
         exts = settings.SYNTAX.get('python')['extension']
         file_ext = file_manager.get_file_extension(self._path)
-        if file_ext in exts:
-            self.reset()
-            source = self._neditor.text
-            text = "[PyFlakes] %s"
-            # Compile into an AST and handle syntax errors
-            try:
-                tree = compile(source, self._path, "exec", _ast.PyCF_ONLY_AST)
-            except SyntaxError as reason:
-                if reason.text is None:
-                    logger.error("Syntax error")
-                else:
-                    self.checks[reason.lineno - 1] = (text % reason.args[0], reason.offset - 1)
-            else:
-                # Okay, now check it
-                lint_checker = checker.Checker(tree, self._path)
-                lint_checker.messages.sort(key=lambda msg: msg.lineno)
-                for message in lint_checker.messages:
-                    lineno = message.lineno - 1
-                    if lineno not in self.checks:
-                        text = [message.message % message.message_args]
-                    else:
-                        text = self.checks[lineno]
-                        text += [message.message % message.message_args]
-                    self.checks[lineno] = (text, message.col)
+        if file_ext not in exts:
+            self._on_checked(self._version, {})
+            return
+        # pyflakes and pycodestyle are imported with the first check
+        from ninja_ide.tools import lint
+        # Snapshot of the document, the results of older ones are dropped
+        self._version += 1
+        lint_service.get_service().check(
+            self, lint.pyflakes_checks, self._path, self._version,
+            self._neditor.text, self._on_checked)
+
+    def _on_checked(self, version, checks):
+        if version != self._version:
+            # Stale, the results of the last snapshot are coming
+            self.finished.emit()
+            return
+        self.checks = dict(checks)
         self.checkerCompleted.emit()
+        self.finished.emit()
+
+    def reset(self):
+        self.checks.clear()
 
     def message(self, lineno):
         if lineno in self.checks:
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Run the checks of the documents in a separate process.
+
+The checkers send versioned snapshots of their documents:
+    - if the source didn't change since the last check (same hash) the
+      cached results are returned without running anything
+    - only one check per document runs at a time, while it runs only the
+      newest snapshot is kept and the older ones are dropped
+    - the callback of every snapshot is called once, the dropped ones
+      receive the cached results (or none) and the checkers ignore the
+      results of a snapshot older than the last one they sent
+"""
+
+from collections import OrderedDict
+from concurrent import futures
+from concurrent.futures.process import BrokenProcessPool
+
+from PyQt5.QtCore import (
+    QObject,
+    pyqtSignal,
+    pyqtSlot
+)
+
+from ninja_ide.gui.ide import IDE
+from ninja_ide.tools import parse_cache
+from ninja_ide.tools.logger import NinjaLogger
+
+logger = NinjaLogger(__name__)
+
+# Results kept in memory, by file and check
+CACHE_SIZE = 64
+
+_service = None
+
+
+def get_service():
+    """Return the LintService, created on the first call."""
+    global _service
+    if _service is None:
+        _service = LintService()
+        ninjaide = IDE.get_service('ide')
+        if ninjaide is not None:
+            ninjaide.goingDown.connect(_service.shutdown)
+    return _service
+
+
+class LintService(QObject):
+
+    # Emitted from the executor threads, received in the GUI thread
+    _checkDone = pyqtSignal('PyQt_PyObject', 'PyQt_PyObject')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._executor = None
+        # {key: job} of the checks running and the snapshots waiting
+        self._running = {}
+        self._pending = {}
+        self._cache = OrderedDict()
+        self._checkDone.connect(self._on_check_done)
+
+    def check(self, key, job_type, path, version, source, callback):
+        """Run the check job_type (a function of tools.lint) over source,
+        callback receives (version, results) in the GUI thread.
+
+        key identifies the document (ie: the checker object)."""
+        cache_key = (path, job_type)
+        source_hash = parse_cache.source_hash(source)
+        cached = self._cache.get(cache_key)
+        if cached is not None and cached[0] == source_hash:
+            self._cache.move_to_end(cache_key)
+            self._drop(self._pending.pop(key, None))
+            callback(version, cached[1])
+            return
+        job = (job_type, path, version, source, source_hash, callback)
+        if key in self._running:
+            # Replaces the older snapshot waiting, if any
+            self._drop(self._pending.pop(key, None))
+            self._pending[key] = job
+        else:
+            self._submit(key, job)
+
+    def _drop(self, job):
+        """Answer a snapshot that won't be checked"""
+        if job is None:
+            return
+        job_type, path, version, _, _, callback = job
+        cached = self._cache.get((path, job_type))
+        callback(version, cached[1] if cached is not None else {})
+
+    def _submit(self, key, job):
+        job_type, path, _, source, _, _ = job
+        self._running[key] = job
+        if self._start_executor():
+            try:
+                future = self._executor.submit(job_type, source, path)
+            except RuntimeError:
+                # The executor is shutting down or broken
+                self._executor = None
+            else:
+                future.add_done_callback(
+                    lambda future: self._checkDone.emit(key, future))
+                return
+        future = futures.Future()
+        try:
+            future.set_result(job_type(source, path))
+        except Exception as reason:
+            future.set_exception(reason)
+        self._on_check_done(key, future)
+
+    @pyqtSlot('PyQt_PyObject', 'PyQt_PyObject')
+    def _on_check_done(self, key, future):
+        job = self._running.pop(key, None)
+        if job is None:
+            return
+        job_type, path, version, _, source_hash, callback = job
+        try:
+            results = future.result()
+        except BrokenProcessPool:
+            logger.error("The lint process died, restarting it")
+            self._executor = None
+            results = {}
+        except Exception as reason:
+            logger.error("Error checking %s: %r" % (path, reason))
+            results = {}
+        else:
+            self._cache[(path, job_type)] = (source_hash, results)
+            self._cache.move_to_end((path, job_type))
+            while len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        callback(version, results)
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            # The document changed while it was checked, these results
+            # are stale. Check the last snapshot (maybe already cached)
+            self.check(key, *pending[:4], callback=pending[5])
+
+    def _start_executor(self):
+        if self._executor is None:
+            try:
+                self._executor = futures.ProcessPoolExecutor(max_workers=1)
+            except (OSError, NotImplementedError):
+                # No multiprocessing support, check in this process
+                return False
+        return True
+
+    def shutdown(self):
+        self._pending.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
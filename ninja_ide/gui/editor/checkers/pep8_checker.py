@@ -16,9 +16,8 @@
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 
 from PyQt5.QtCore import (
-    QThread,
+    QObject,
     QTimer,
-    # Qt,
     pyqtSignal
 )
 from ninja_ide import resources
@@ -26,26 +25,39 @@ from ninja_ide import translations
 from ninja_ide.core import settings
 from ninja_ide.core.file_handling import file_manager
 from ninja_ide.gui.ide import IDE
-from ninja_ide.dependencies import pycodestyle
 from ninja_ide.gui.editor.checkers import (
     register_checker,
     remove_checker,
 )
+from ninja_ide.gui.editor.checkers import lint_service
 from ninja_ide.tools import ui_tools
 # from ninja_ide.gui.editor.checkers import errors_lists  # lint:ok
 
 # TODO: limit results for performance
 
 
-class Pep8Checker(QThread):
+class Pep8Checker(QObject):
+    """Run pycodestyle over the editor content in the lint service
+    process, only the lines changed since the last check are checked.
+
+    finished is emitted once for each call to run_checks, the calls
+    made in CHECK_DELAY ms are checked together."""
+
     checkerCompleted = pyqtSignal()
+    finished = pyqtSignal()
+
+    CHECK_DELAY = 500
 
     def __init__(self, editor):
         super(Pep8Checker, self).__init__()
         self._editor = editor
         self._path = ''
-        self._encoding = ''
+        self._version = 0
         self.checks = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.CHECK_DELAY)
+        self._timer.timeout.connect(self._check)
 
         self.checker_icon = ui_tools.colored_icon(
             ":img/warning", resources.get_color('Pep8Underline'))
@@ -65,35 +77,37 @@ class Pep8Checker(QThread):
         return translations.TR_PEP8_DIRTY_TEXT + str(len(self.checks))
 
     def run_checks(self):
-        if not self.isRunning():
-            self._path = self._editor.file_path
-            self._encoding = self._editor.encoding
-            QTimer.singleShot(500, self.start)
-
-    def reset(self):
-        self.checks.clear()
+        if self._timer.isActive():
+            # The call waiting is checked with this one
+            self.finished.emit()
+        self._timer.start()
 
-    def run(self):
+    def _check(self):
+        self._path = self._editor.file_path
         exts = settings.SYNTAX.get('python')['extension']
         file_ext = file_manager.get_file_extension(self._path)
-        if file_ext in exts:
-            self.reset()
-            source = self._editor.text
-            path = self._editor.file_path
-            pep8_style = pycodestyle.StyleGuide(
-                parse_argv=False,
-                config_file='',
-                checker_class=CustomChecker
-            )
-            temp_data = pep8_style.input_file(
-                path,
-                lines=source.splitlines(True)
-            )
-            for lineno, col, code, text in temp_data:
-            # for lineno, offset, code, text, doc in temp_data:
-                message = '[PEP8] %s: %s' % (code, text)
-                self.checks[lineno - 1] = (message, col)
+        if file_ext not in exts:
+            self._on_checked(self._version, {})
+            return
+        # pyflakes and pycodestyle are imported with the first check
+        from ninja_ide.tools import lint
+        # Snapshot of the document, the results of older ones are dropped
+        self._version += 1
+        lint_service.get_service().check(
+            self, lint.pep8_checks, self._path, self._version,
+            self._editor.text, self._on_checked)
+
+    def _on_checked(self, version, checks):
+        if version != self._version:
+            # Stale, the results of the last snapshot are coming
+            self.finished.emit()
+            return
+        self.checks = dict(checks)
         self.checkerCompleted.emit()
+        self.finished.emit()
+
+    def reset(self):
+        self.checks.clear()
 
     def message(self, index):
         if index in self.checks and settings.CHECK_HIGHLIGHT_LINE:
@@ -110,24 +124,6 @@ class Pep8Checker(QThread):
         """
 
 
-class CustomReport(pycodestyle.StandardReport):
-
-    def get_file_results(self):
-        data = []
-        for line_number, offset, code, text, doc in self._deferred_print:
-            # row = self.line_offset + line_number
-            col = offset + 1
-            data.append((line_number, col, code, text))
-        return data
-        # return sorted(self._deferred_print)
-
-
-class CustomChecker(pycodestyle.Checker):
-
-    def __init__(self, *args, **kw):
-        super().__init__(*args, report=CustomReport(kw.pop("options")), **kw)
-
-
 def remove_pep8_checker():
     checker = (Pep8Checker,
                resources.get_color('Pep8Underline'), 2)
@@ -49,6 +49,7 @@ from PyQt5.QtCore import (
 from ninja_ide.gui.editor import (
     syntaxhighlighter,
     scrollbar,
+    match_engine,
     # symbol_highlighter,
     # line_highlighter
 )
@@ -291,6 +292,9 @@ class NEditor(QPlainTextEdit):
         # Extra Selections
         self._extra_selections = OrderedDict()
         self.__occurrences = []
+        # Searches highlighted in the visible blocks
+        # {selection_key: (expr, case_sensitive, whole_word)}
+        self.__match_searches = OrderedDict()
         # Load indenter based on language
         self._indenter = indenter.load_indenter(self, neditable.language())
         # Set editor font before build lexer
@@ -342,6 +346,9 @@ class NEditor(QPlainTextEdit):
             else:
                 self._neditable.set_editor(self)
             self._neditable.checkersUpdated.connect(self._highlight_checkers)
+        self._match_engine = match_engine.MatchEngine(self.document(), self)
+        self._scrollbar.valueChanged.connect(self._update_match_selections)
+        self._scrollbar.valueChanged.connect(self._highlight_visible_blocks)
         # Widgets on side area
         self._line_number_area = self.add_side_widget(
             line_number_area.LineNumberArea, order=2)
@@ -526,25 +533,27 @@ class NEditor(QPlainTextEdit):
         checkers = neditable.sorted_checkers
         self.highlight_checker_updated.emit(checkers)
         selections = []
+        document = self.document()
         # FIXME: generalize it with extra_selection.ExtraSelection
         for items in checkers:
             checker, color, _ = items
-            lines = checker.checks.keys()
-            for line in lines:
-                msg, col = checker.checks[line]
+            underline = QTextCharFormat()
+            underline.setUnderlineStyle(QTextCharFormat.SingleUnderline)
+            underline.setUnderlineColor(QColor(color))
+            for line, (msg, col) in checker.checks.items():
+                # The underline is an overlay over the block, the syntax
+                # highlighter doesn't format it again
+                block = document.findBlockByNumber(line)
+                if not block.isValid():
+                    continue
+                length = len(block.text())
                 selection = QTextEdit.ExtraSelection()
-                selection.cursor = self.textCursor()
-                selection.cursor.movePosition(
-                    QTextCursor.Start, QTextCursor.MoveAnchor)
-                selection.cursor.movePosition(
-                    QTextCursor.Down, QTextCursor.MoveAnchor, line)
-                selection.cursor.movePosition(
-                    QTextCursor.Right, QTextCursor.MoveAnchor, col - 1)
-                selection.cursor.movePosition(
-                    QTextCursor.EndOfLine, QTextCursor.KeepAnchor)
-                selection.format.setUnderlineStyle(
-                    QTextCharFormat.SingleUnderline)
-                selection.format.setUnderlineColor(QColor(color))
+                selection.cursor = QTextCursor(block)
+                selection.cursor.setPosition(
+                    block.position() + min(max(col - 1, 0), length))
+                selection.cursor.setPosition(
+                    block.position() + length, QTextCursor.KeepAnchor)
+                selection.format = underline
                 selections.append(selection)
 
         self.add_extra_selections('checker', selections)
@@ -559,6 +568,7 @@ class NEditor(QPlainTextEdit):
 
     def clear_extra_selections(self, selection_key):
         """Removes a extra selection from the editor"""
+        self.__match_searches.pop(selection_key, None)
         if selection_key in self._extra_selections:
             self._extra_selections[selection_key] = []
             self.update_extra_selections()
@@ -702,6 +712,8 @@ class NEditor(QPlainTextEdit):
         QPlainTextEdit.resizeEvent(self, event)
         self.update_viewport()
         self.adjust_scrollbar_ranges()
+        self._highlight_visible_blocks()
+        self._update_match_selections()
 
     def paintEvent(self, event):
         self._update_visible_blocks()
@@ -1074,28 +1086,12 @@ class NEditor(QPlainTextEdit):
         index, results = self._get_find_index_results(search,
                                                       case_sensitive,
                                                       whole_word)
-        # TODO: obtain line numbers for highlight in scrollbar
         # TODO: cambiar el 2
-        # FIXME: clear its ok?
-        self.clear_extra_selections('searchs')
-
         if len(search) > 2:
-            ss = []
-            append = ss.append
-            results = results[:500]
-            for start, end in results:
-                s = extra_selection.ExtraSelection(
-                    self.textCursor(),
-                    start_pos=start,
-                    end_pos=end
-                )
-                s.set_full_width()
-                c = QColor('yellow')
-                c.setAlpha(40)
-                s.set_background(c)
-                s.set_outline('gray')
-                append(s)
-            self.add_extra_selections('searchs', ss)
+            self.__set_match_search(
+                'searchs', (search, case_sensitive, whole_word))
+        else:
+            self.clear_extra_selections('searchs')
 
         return index, results
 
@@ -1107,34 +1103,75 @@ class NEditor(QPlainTextEdit):
 
     def _get_find_index_results(self, expr: str,
                                 cs: bool, wo: bool) -> Tuple[int, list]:
-        text = self.text
-        has_search = len(expr) > 0
-        if not has_search:
-            return 0, 0
-
-        def find_all_iter(string, sub, flags):
-            for i in re.finditer(sub, string, flags):
-                yield i.span()
-
-        flags = re.UNICODE
-        search = expr  # for count whole words
-        if wo:
-            expr = "\\b{}\\b".format(expr)
-        if not cs:
-            text = text.lower()
-            expr = expr.lower()
-            flags |= re.IGNORECASE
-        results = list(find_all_iter(text, expr, flags))
+        if not expr:
+            return 0, []
+        results = self._match_engine.find(expr, cs, wo)
         pos = self.textCursor().position()
-        index = text[:pos].count(search)
+        index = self._match_engine.index(results, pos)
         return index, results
 
+    def _visible_block_range(self):
+        """First and last blocks in the viewport"""
+
+        first_block = self.firstVisibleBlock()
+        last_block = self.cursorForPosition(
+            self.viewport().rect().bottomLeft()).block()
+        return first_block, last_block
+
+    @pyqtSlot()
+    def _highlight_visible_blocks(self):
+        """Format the visible blocks before the others"""
+
+        if self._highlighter is not None:
+            self._highlighter.set_visible_blocks(*self._visible_block_range())
+
+    def __set_match_search(self, selection_key, search):
+        """Highlight the matches of search (expr, case_sensitive,
+        whole_word) in the visible blocks."""
+
+        self.__match_searches[selection_key] = search
+        self._update_match_selections()
+
+    @pyqtSlot()
+    def _update_match_selections(self):
+        """Build the selections of the matches in the visible blocks"""
+
+        if not self.__match_searches:
+            return
+        first_block, last_block = self._visible_block_range()
+        start = first_block.position()
+        end = last_block.position() + last_block.length()
+        for selection_key, search in self.__match_searches.items():
+            results = self._match_engine.find(*search)
+            selections = []
+            for start_pos, end_pos in self._match_engine.in_range(
+                    results, start, end):
+                selection = extra_selection.ExtraSelection(
+                    self.textCursor(),
+                    start_pos=start_pos,
+                    end_pos=end_pos
+                )
+                selection.set_full_width()
+                if selection_key == 'occurrences':
+                    # FIXME: from theme
+                    selection.set_background(
+                        resources.get_color('SearchResult'))
+                else:
+                    color = QColor('yellow')
+                    color.setAlpha(40)
+                    selection.set_background(color)
+                    selection.set_outline('gray')
+                selections.append(selection)
+            self._extra_selections[selection_key] = selections
+        self.update_extra_selections()
+
     def __clear_occurrences(self):
         """Clear extra selection occurrences from editor and scrollbar"""
 
         self.__occurrences.clear()
-        self._scrollbar.remove_marker('occurrence')
-        self.clear_extra_selections('occurrences')
+        if 'occurrences' in self.__match_searches:
+            self._scrollbar.remove_marker('occurrence')
+            self.clear_extra_selections('occurrences')
 
     def highlight_selected_word(self):
         import keyword
@@ -1146,23 +1183,17 @@ class NEditor(QPlainTextEdit):
         # Do not highlight keywords
         if text in keyword.kwlist or text == 'self':
             return
-        result = self._get_find_index_results(text, False, True)[1]
-        selections = []
-        for start, end in result:
-            selection = extra_selection.ExtraSelection(
-                self.textCursor(),
-                start_pos=start,
-                end_pos=end
-            )
-            selection.set_full_width()
-            # FIXME: from theme
-            selection.set_background(resources.get_color('SearchResult'))
-            selections.append(selection)
-            line = selection.cursor.blockNumber()
-            Marker = scrollbar.marker
-            marker = Marker(line, resources.get_color('SearchResult'), 0)
-            self._scrollbar.add_marker('occurrence', marker)
-        self.add_extra_selections('occurrences', selections)
+        search = (text, False, True)
+        results = self._match_engine.find(*search)
+        if not results:
+            return
+        Marker = scrollbar.marker
+        color = resources.get_color('SearchResult')
+        # One marker for each pixel row of the scrollbar
+        step = self._scrollbar.lines_per_row()
+        for line in self._match_engine.lines(results, step):
+            self._scrollbar.add_marker('occurrence', Marker(line, color, 0))
+        self.__set_match_search('occurrences', search)
 
     def line_from_position(self, position):
         height = self.fontMetrics().height()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Matches of the searches made in a document.
+
+The text of the document and the results of the last searches are kept
+until the document changes, so moving the cursor or scrolling doesn't
+scan the text again. Results are sorted lists of (start, end) positions,
+the editor builds selections only for the ones in the visible blocks."""
+
+import re
+import bisect
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, pyqtSlot
+
+
+class MatchEngine(QObject):
+
+    # Searches kept for the current revision of the document
+    CACHE_SIZE = 16
+
+    def __init__(self, document, parent=None):
+        super().__init__(parent)
+        self._document = document
+        self._text = None
+        self._line_starts = None
+        # {(expr, case_sensitive, whole_word): results}
+        self._results = OrderedDict()
+        # Only the changes of the text, not the ones of the formats
+        document.contentsChange.connect(self._invalidate)
+
+    @pyqtSlot(int, int, int)
+    def _invalidate(self, position, removed, added):
+        self._text = None
+        self._line_starts = None
+        self._results.clear()
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = self._document.toPlainText()
+        return self._text
+
+    def find(self, expr, case_sensitive=False, whole_word=False):
+        """Return the sorted (start, end) positions of expr (searched as
+        plain text) in the document."""
+
+        key = (expr, case_sensitive, whole_word)
+        results = self._results.pop(key, None)
+        if results is None:
+            results = self._find(expr, case_sensitive, whole_word)
+        self._results[key] = results
+        while len(self._results) > self.CACHE_SIZE:
+            self._results.popitem(last=False)
+        return results
+
+    def _find(self, expr, case_sensitive, whole_word):
+        if not expr:
+            return []
+        pattern = re.escape(expr)
+        if whole_word:
+            pattern = r'\b%s\b' % pattern
+        flags = re.UNICODE
+        if not case_sensitive:
+            flags |= re.IGNORECASE
+        return [match.span()
+                for match in re.finditer(pattern, self.text, flags)]
+
+    @staticmethod
+    def index(results, position):
+        """Number of results starting before position"""
+        return bisect.bisect_left(results, (position,))
+
+    @staticmethod
+    def in_range(results, start, end):
+        """Results overlapping the positions [start, end)"""
+        first = bisect.bisect_left(results, (start,))
+        if first > 0 and results[first - 1][1] > start:
+            first -= 1
+        last = bisect.bisect_left(results, (end,))
+        return results[first:last]
+
+    def lines(self, results, step=1):
+        """Sorted line numbers of the results, only one for each group of
+        step lines (ie: the lines in the same pixel row of a scrollbar)"""
+
+        if self._line_starts is None:
+            self._line_starts = [0] + [
+                match.end() for match in re.finditer('\n', self.text)]
+        line_starts = self._line_starts
+        lines = []
+        index = 0
+        while index < len(results):
+            lineno = bisect.bisect_right(line_starts, results[index][0]) - 1
+            lines.append(lineno)
+            # Jump to the first result of the next group
+            next_line = (lineno // step + 1) * step
+            if next_line >= len(line_starts):
+                break
+            index = bisect.bisect_left(
+                results, (line_starts[next_line],), index + 1)
+        return lines
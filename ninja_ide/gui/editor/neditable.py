@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 import collections
+import os
 
 from PyQt5.QtCore import (
     QObject,
@@ -53,6 +54,11 @@ class NEditable(QObject):
         # Checkers:
         self.registered_checkers = []
         self._checkers_executed = 0
+        # Cursor position, scroll and mtime of a file restored from a
+        # session or hibernated, kept until the editor is created
+        self._restored_cursor = None
+        self._restored_mtime = None
+        self._restored_scroll = 0
 
         # Connect signals
         if self._nfile:
@@ -89,9 +95,47 @@ class NEditable(QObject):
         clone = self.__class__(self._nfile)
         return clone
 
+    def restore(self, cursor_position, mtime=None, scroll=0):
+        """Keep the cursor position of a file restored from a session, the
+        file isn't read until the editor is set.
+
+        If the file wasn't modified since mtime the checkers don't run."""
+        self._restored_cursor = cursor_position
+        self._restored_mtime = mtime
+        self._restored_scroll = scroll
+
+    def hibernate(self):
+        """Release the editor of an unmodified file keeping only its
+        cursor and scroll position, the file is read again when a new
+        editor is set"""
+        editor = self.__editor
+        if editor is None or editor.is_modified or self._nfile.is_new_file:
+            return False
+        self.restore(editor.cursor_position,
+                     scroll=editor.verticalScrollBar().value())
+        for checker, _, _ in self.registered_checkers:
+            checker.finished.disconnect(self.show_checkers_notifications)
+        self.registered_checkers = []
+        self._has_checkers = False
+        self._checkers_executed = 0
+        # Changes on disk are picked up when the file is read again
+        self._nfile.remove_watcher()
+        self.__editor = None
+        editor.deleteLater()
+        return True
+
     def set_editor(self, editor):
         """Set the Editor (UI component) associated with this object."""
         self.__editor = editor
+        if self._restored_mtime is not None and self._nfile.file_path:
+            try:
+                mtime = os.path.getmtime(self._nfile.file_path)
+            except OSError:
+                # Deleted or renamed since the session was saved
+                mtime = None
+            self.ignore_checkers = (mtime == self._restored_mtime)
+        self._restored_cursor = self._restored_mtime = None
+        self._restored_scroll = 0
         # If we have an editor, let's include the checkers:
         self.include_checkers()
         content = ''
@@ -112,7 +156,7 @@ class NEditable(QObject):
             helpers.insert_coding_line(self.__editor)
 
     def reload_file(self):
-        if self._nfile:
+        if self._nfile and self.__editor is not None:
             content = self._nfile.read()
             self._nfile.start_watching()
             self.__editor.text = content
@@ -151,6 +195,27 @@ class NEditable(QObject):
     def editor(self):
         return self.__editor
 
+    @property
+    def is_restored(self):
+        """True if the file was restored and its editor wasn't created"""
+        return self.__editor is None and self._restored_cursor is not None
+
+    @property
+    def cursor_position(self):
+        if self.__editor is not None:
+            return self.__editor.cursor_position
+        return self._restored_cursor or (0, 0)
+
+    @property
+    def scroll_position(self):
+        if self.__editor is not None:
+            return self.__editor.verticalScrollBar().value()
+        return self._restored_scroll
+
+    @property
+    def is_modified(self):
+        return self.__editor is not None and self.__editor.is_modified
+
     @property
     def nfile(self):
         return self._nfile
@@ -173,6 +238,9 @@ class NEditable(QObject):
     def save_content(self, path=None, force=False):
         """Save the content of the UI to a file."""
 
+        if self.__editor is None:
+            # Restored, nothing to save
+            return
         if self.__editor.is_modified or force:
             content = self.__editor.text
             nfile = self._nfile.save(content, path)
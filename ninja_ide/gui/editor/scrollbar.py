@@ -42,19 +42,22 @@ class ScrollBarOverlay(QWidget):
         self._nscrollbar = nscrollbar
         self.__schedule_updated = False
         self.markers = defaultdict(list)  # {'id': list of markers}
-        self.cache = {}  # {'position': marker}
+        self.cache = {}  # {pixel row: marker}
+        self.__cache_scale = None
         self.range_offset = 0.0
         self.visible_range = 0.0
 
     def paintEvent(self, event):
         QWidget.paintEvent(self, event)
-        self.update_cache()
-        if not self.cache:
-            return
-
         rect = self._nscrollbar.overlay_rect()
         sb_range = self._nscrollbar.get_scrollbar_range()
         sb_range = max(self.visible_range, sb_range)
+        if sb_range <= 0:
+            return
+        self.update_cache(rect.height() / sb_range)
+        if not self.cache:
+            return
+
         horizontal_margin = 3
         result_width = rect.width() - 2 * horizontal_margin + 1
         result_height = min(rect.height() / sb_range + 1, 4)
@@ -65,8 +68,7 @@ class ScrollBarOverlay(QWidget):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing, False)
 
-        for lineno in self.cache.keys():
-            marker = self.cache[lineno]
+        for marker in self.cache.values():
             top = rect.top() + offset + vertical_margin + \
                 marker.position / sb_range * rect.height()
             bottom = top + result_height
@@ -77,20 +79,21 @@ class ScrollBarOverlay(QWidget):
                 bottom - top,
                 QColor(marker.color))
 
-    def update_cache(self):
-        if not self.__schedule_updated:
+    def update_cache(self, scale):
+        """Keep one marker (the one with more priority) for each pixel
+        row of the scrollbar, scale is the height of a line in pixels"""
+
+        if not self.__schedule_updated and scale == self.__cache_scale:
             return
         self.cache.clear()
-        categories = self.markers.keys()
-        for category in categories:
-            markers = self.markers[category]
+        for markers in self.markers.values():
             for marker in markers:
-                old = self.cache.get(marker.position)
-                if old is not None and old.position == marker.position:
-                    if old.priority > marker.priority:
-                        self.cache[old.position] = old
-                        continue
-                self.cache[marker.position] = marker
+                row = int(marker.position * scale)
+                old = self.cache.get(row)
+                if old is not None and old.priority > marker.priority:
+                    continue
+                self.cache[row] = marker
+        self.__cache_scale = scale
         self.__schedule_updated = False
 
     def schedule_update(self):
@@ -120,6 +123,14 @@ class NScrollBar(QScrollBar):
     def get_scrollbar_range(self):
         return self.maximum() + self.pageStep()
 
+    def lines_per_row(self):
+        """Lines of the document in each pixel row of the markers"""
+
+        height = self.overlay_rect().height()
+        if height <= 0:
+            return 1
+        return max(1, int(self.get_scrollbar_range() / height))
+
     def overlay_rect(self):
         opt = QStyleOptionSlider()
         self.initStyleOption(opt)
@@ -15,19 +15,89 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 
+"""Markers of the lines changed since the file was saved.
+
+The lines are compared only around each change of the document (using
+the positions of QTextDocument.contentsChange), each line remembers the
+text it had in the last saved version, so a whole document diff is
+never needed and the cost of an edit doesn't depend on the file size."""
+
 import difflib
 from PyQt5.QtGui import (
     QPainter,
     QColor
 )
-from PyQt5.QtCore import (
-    pyqtSlot,
-    Qt,
-    QTimer
-)
+from PyQt5.QtCore import pyqtSlot
 from ninja_ide.gui.editor.side_area import SideArea
 from ninja_ide import resources
 
+# State of each line
+UNCHANGED = 0
+UNSAVED = 1
+SAVED = 2
+
+
+class LineChanges(object):
+    """State of each line of a document compared to its saved version.
+
+    For each line it keeps the text it had when the file was saved (None
+    for the lines inserted after that) and its state: UNSAVED if it
+    differs from that text, SAVED if it was modified before the last save
+    and UNCHANGED otherwise."""
+
+    def __init__(self, lines=()):
+        self.reset(lines)
+
+    def reset(self, lines):
+        """Take lines as the saved version, without markers"""
+        self._saved_text = list(lines)
+        self._states = bytearray(len(self._saved_text))
+
+    def __len__(self):
+        return len(self._states)
+
+    def state(self, lineno):
+        if 0 <= lineno < len(self._states):
+            return self._states[lineno]
+        return UNCHANGED
+
+    def lines(self, state):
+        """Line numbers with that state"""
+        states = self._states
+        return [lineno for lineno in range(len(states))
+                if states[lineno] == state]
+
+    def replace(self, first, removed, new_lines):
+        """The lines [first, first + removed) were replaced by new_lines"""
+        end = first + removed
+        old_text = self._saved_text[first:end]
+        old_states = self._states[first:end]
+        saved_text = [None] * len(new_lines)
+        states = bytearray([UNSAVED]) * len(new_lines)
+        matcher = difflib.SequenceMatcher(None, old_text, new_lines,
+                                          autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                saved_text[j1:j2] = old_text[i1:i2]
+                for offset in range(j2 - j1):
+                    state = old_states[i1 + offset]
+                    if state == UNSAVED:
+                        # The line is again as it was saved
+                        state = UNCHANGED
+                    states[j1 + offset] = state
+            elif tag == 'replace':
+                # Lines edited in place, they remember their saved text
+                size = min(i2 - i1, j2 - j1)
+                saved_text[j1:j1 + size] = old_text[i1:i1 + size]
+        self._saved_text[first:end] = saved_text
+        self._states[first:end] = states
+
+    def save(self, lines):
+        """The document was saved with these lines"""
+        self._saved_text = list(lines)
+        self._states = self._states.replace(
+            bytes([UNSAVED]), bytes([SAVED]))
+
 
 class TextChangeArea(SideArea):
 
@@ -52,61 +122,54 @@ class TextChangeArea(SideArea):
         self.__saved_color = color
 
     @property
-    def delay(self):
-        return self.__delay
-
-    @delay.setter
-    def delay(self, ms):
-        if ms != self.__delay:
-            self.__delay = ms
-            self._timer.setInterval(self.__delay)
+    def changes(self):
+        return self.__changes
 
     def __init__(self, neditor):
         SideArea.__init__(self, neditor)
         self._neditor = neditor
-        self.__unsaved_markers = []
-        self.__saved_markers = []
-        self.__saved = False
-        self.__text = neditor.toPlainText()
-        self.__last_saved_text = neditor.toPlainText()
+        document = neditor.document()
+        self.__changes = LineChanges(self.__block_texts(document.begin()))
+        self.__block_count = document.blockCount()
         # Default properties
         self.__unsaved_color = QColor(resources.get_color('ModifiedColor'))
         self.__saved_color = QColor(resources.get_color('SavedColor'))
-        self.__delay = 300
-        # Delay Timer
-        self._timer = QTimer(self)
-        self._timer.setInterval(self.__delay)
-        self._timer.setSingleShot(True)
-        self._timer.timeout.connect(self.__on_text_changed)
-        # Connect textChanged signal to the timer
-        # the __on_text_chaned slot is executed each '__delay' milliseconds
-        self._neditor.textChanged.connect(self._timer.start)
+        document.contentsChange.connect(self.__on_contents_change)
         self._neditor.neditable.fileSaved.connect(self.__on_file_saved)
 
+    @staticmethod
+    def __block_texts(block, count=-1):
+        texts = []
+        while block.isValid() and count != 0:
+            texts.append(block.text())
+            block = block.next()
+            count -= 1
+        return texts
+
     @pyqtSlot()
     def __on_file_saved(self):
-        self.__saved = True
-        self.__last_saved_text = self._neditor.toPlainText()
-        self.__saved_markers += list(self.__unsaved_markers)
+        document = self._neditor.document()
+        self.__changes.save(self.__block_texts(document.begin()))
+        self.update()
 
-    @pyqtSlot()
-    def __on_text_changed(self):
-        if self.__saved:
-            self.__saved = False
+    @pyqtSlot(int, int, int)
+    def __on_contents_change(self, position, removed, added):
+        document = self._neditor.document()
+        block_count = document.blockCount()
+        if not document.isUndoRedoEnabled():
+            # The whole text was set (ie: the file was reloaded)
+            self.__changes.reset(self.__block_texts(document.begin()))
+            self.__block_count = block_count
             return
-        self.__unsaved_markers.clear()
-        old_text = self.__last_saved_text
-        actual_text = self._neditor.toPlainText()
-        matcher = difflib.SequenceMatcher(None,
-                                          old_text.splitlines(),
-                                          actual_text.splitlines())
-        for tag, _, _, j1, j2 in matcher.get_opcodes():
-            if tag in ('insert', 'replace'):
-                for lineno in range(j1, j2):
-                    if lineno not in self.__unsaved_markers:
-                        self.__unsaved_markers.append(lineno)
-                    if lineno in self.__saved_markers:
-                        self.__saved_markers.remove(lineno)
+        first = document.findBlock(position)
+        last = document.findBlock(position + added)
+        if not last.isValid():
+            last = document.lastBlock()
+        new_count = last.blockNumber() - first.blockNumber() + 1
+        old_count = new_count - (block_count - self.__block_count)
+        self.__block_count = block_count
+        self.__changes.replace(first.blockNumber(), old_count,
+                               self.__block_texts(first, new_count))
 
     def width(self):
         return 4
@@ -115,12 +178,11 @@ class TextChangeArea(SideArea):
         super().paintEvent(event)
         painter = QPainter(self)
         height = self._neditor.fontMetrics().height()
+        colors = {
+            UNSAVED: self.__unsaved_color,
+            SAVED: self.__saved_color
+        }
         for top, block_number, _ in self._neditor.visible_blocks:
-            for lineno in self.__unsaved_markers:
-                if block_number == lineno:
-                    painter.fillRect(2, top, self.width(),
-                                     height + 1, self.__unsaved_color)
-            for lineno in self.__saved_markers:
-                if block_number == lineno:
-                    painter.fillRect(2, top, self.width(), height + 1,
-                                     self.__saved_color)
+            color = colors.get(self.__changes.state(block_number))
+            if color is not None:
+                painter.fillRect(2, top, self.width(), height + 1, color)
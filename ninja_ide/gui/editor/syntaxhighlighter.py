@@ -1,5 +1,8 @@
 import re
+import time
+import functools
 from collections import namedtuple
+from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import (
     QSyntaxHighlighter,
     QColor,
@@ -23,6 +26,11 @@ class BlockUserData(QTextBlockUserData):
         super().__init__()
         self.indentation = None
         self.string_info = []
+        # (highlighter, hash of the text) of the spans cached
+        self.highlight_key = None
+        # {state of the previous block: ([(start, length, format)],
+        # state at the end of the block)}
+        self.highlight_cache = {}
 
     def add_string_info(self, start, end):
         self.string_info.append((start, end - 1))
@@ -64,6 +72,17 @@ class HighlighterError(Exception):
     pass
 
 
+# Added to the state of the blocks whose formats are not applied yet
+PENDING = 1 << 16
+
+
+@functools.lru_cache(maxsize=64)
+def _compile(pattern, flags=0):
+    """Patterns of the scanners, the highlighters of the same syntax
+    (one for each editor) share them"""
+    return re.compile(pattern, flags)
+
+
 class Partition(object):
     # every partition maps to a specific state in QSyntaxHighlighter
 
@@ -75,7 +94,7 @@ class Partition(object):
         self.end = end
         self.is_multiline = is_multiline
         try:
-            self.search_end = re.compile(end, re.M | re.S).search
+            self.search_end = _compile(end, re.M | re.S).search
         except Exception as exc:
             raise HighlighterError("{0}: {1} {2}".format(exc, name, end))
 
@@ -100,10 +119,33 @@ class PartitionScanner(object):
             start_groups.append("(?P<g%s_%s>%s)" % (i, p.name, p.start))
         start_pat = "|".join(start_groups)
         try:
-            self.search_start = re.compile(start_pat, re.M | re.S).search
+            self.search_start = _compile(start_pat, re.M | re.S).search
         except Exception as exc:
             raise HighlighterError("%s: %s" % (exc, start_pat))
 
+    def end_state(self, current_state, text):
+        """The state at the end of text, the same of the last item of
+        scan() without yielding the partitions"""
+
+        last_pos = 0
+        length = len(text)
+        parts = self.partitions
+        while last_pos < length:
+            if current_state == -1:
+                found = self.search_start(text, last_pos)
+                if not found:
+                    break
+                current_state = found.lastindex - 1
+            else:
+                found = parts[current_state].search_end(text, last_pos)
+                if not found:
+                    break
+                current_state = -1
+            last_pos = found.end()
+        if current_state != -1 and not parts[current_state].is_multiline:
+            current_state = -1
+        return current_state
+
     def scan(self, current_state, text):
         last_pos = 0
         length = len(text)
@@ -177,7 +219,7 @@ class Scanner(object):
             groups.append(p)
             self.tokens.append(t)
         pat = "|".join(groups)
-        self.search = re.compile(pat).search
+        self.search = _compile(pat).search
 
     def scan(self, s):
         search = self.search
@@ -194,6 +236,19 @@ class Scanner(object):
 
 
 class SyntaxHighlighter(QSyntaxHighlighter):
+    """Highlight the blocks visible first and the rest in idle time.
+
+    Qt calls highlightBlock for every block after a change (all of them
+    when a file is loaded). After SYNC_TIME seconds in the same event
+    loop iteration only the state of the blocks outside the visible range
+    is computed (with the partition scanner, the cheap part), they are
+    marked as pending and formatted later in slices of IDLE_SLICE
+    seconds."""
+
+    SYNC_TIME = 0.02
+    IDLE_SLICE = 0.01
+    # Pending blocks formatted with each call to rehighlightBlock
+    BATCH_SIZE = 50
 
     def __init__(self, parent, partition_scanner,
                  scanner, formats, default_font=None):
@@ -259,6 +314,22 @@ class SyntaxHighlighter(QSyntaxHighlighter):
         self.get_scanner = scan_inside.get
         self.scan_partitions = partition_scanner.scan
         self.get_format = self.formats.get
+        # Part of the keys of the blocks highlighted by this instance
+        self._cache_token = object()
+
+        # Scheduling
+        self._sync_start = None
+        self._deferring = False
+        # Last block number formatted by _format_blocks
+        self._format_until = None
+        # Block numbers (first, last) visible in the editor
+        self._visible = (0, 0)
+        # First block number that can be pending
+        self._pending_from = None
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setInterval(0)
+        self._idle_timer.timeout.connect(self._format_pending)
+        self.document().contentsChange.connect(self._on_contents_change)
 
     def current_block_user_data(self):
         user_data = self.currentBlockUserData()
@@ -272,10 +343,35 @@ class SyntaxHighlighter(QSyntaxHighlighter):
 
         text = str(text) + "\n"
         previous_state = self.previousBlockState()
+        if previous_state >= PENDING - 1:
+            previous_state -= PENDING
+        block_number = self.currentBlock().blockNumber()
+        if not self._format_now(block_number):
+            self._defer_block(block_number, previous_state, text)
+            return
+        set_format = self.setFormat
+        user_data = self.current_block_user_data()
+        key = (self._cache_token, hash(text))
+        if user_data.highlight_key != key:
+            user_data.highlight_key = key
+            user_data.highlight_cache = {}
+            # For indentation guides
+            stripped = text.lstrip()
+            user_data.indentation = (len(text) - len(stripped)
+                                     if stripped else 0)
+        cached = user_data.highlight_cache.get(previous_state)
+        if cached is not None:
+            # Same text after the same state, nothing to scan
+            spans, new_state = cached
+            for start, length, f in spans:
+                set_format(start, length, f)
+            self.setCurrentBlockState(new_state)
+            return
         new_state = previous_state
+        spans = []
+        add_span = spans.append
         # speed-up name-lookups
         get_format = self.get_format
-        set_format = self.setFormat
         get_scanner = self.get_scanner
 
         for start, end, partition, new_state, is_inside in \
@@ -285,23 +381,108 @@ class SyntaxHighlighter(QSyntaxHighlighter):
             #    user_data.add_string_info(start, end)
             f = get_format(partition, None)
             if f:
-                set_format(start, end - start, f)
+                add_span((start, end - start, f))
             if is_inside:
                 scan = get_scanner(partition)
                 if scan:
                     for token, token_pos, token_end in scan(text[start:end]):
                         f = get_format(token)
                         if f:
-                            set_format(
-                                start + token_pos, token_end - token_pos, f)
+                            add_span((start + token_pos,
+                                      token_end - token_pos, f))
+        for start, length, f in spans:
+            set_format(start, length, f)
 
         self.setCurrentBlockState(new_state)
+        user_data.highlight_cache[previous_state] = (spans, new_state)
+
+    def _format_now(self, block_number):
+        """True if the formats of the current block must be applied now"""
+
+        if self._format_until is not None:
+            # Called from _format_blocks
+            if block_number <= self._format_until:
+                return True
+        elif not self._deferring:
+            now = time.perf_counter()
+            if self._sync_start is None:
+                self._sync_start = now
+                # The next iteration of the event loop starts a new period
+                QTimer.singleShot(0, self._end_sync)
+            if now - self._sync_start < self.SYNC_TIME:
+                return True
+            self._deferring = True
+        first, last = self._visible
+        return first <= block_number <= last
+
+    def _end_sync(self):
+        self._sync_start = None
+        self._deferring = False
+
+    def _defer_block(self, block_number, previous_state, text):
+        self.setCurrentBlockState(self.partition_scanner.end_state(
+            previous_state, text) + PENDING)
+        if self._pending_from is None:
+            self._pending_from = block_number
+            self._idle_timer.start()
+        elif block_number < self._pending_from:
+            self._pending_from = block_number
+
+    def _on_contents_change(self, position, removed, added):
+        # Removing lines moves the pending blocks up
+        if self._pending_from is not None:
+            block_number = self.document().findBlock(position).blockNumber()
+            self._pending_from = min(self._pending_from, block_number)
+
+    @staticmethod
+    def _is_pending(block):
+        return block.userState() >= PENDING - 1
+
+    def _format_blocks(self, block, last_number):
+        """Format the blocks from block to the number last_number with one
+        call (Qt goes on with the next block while the state of the
+        current one changes, as it happens with the pending ones)"""
+
+        self._format_until = last_number
+        try:
+            self.rehighlightBlock(block)
+        finally:
+            self._format_until = None
+
+    def set_visible_blocks(self, first, last):
+        """The blocks between first and last are visible in the editor,
+        they are formatted now if they are pending"""
+
+        self._visible = (first.blockNumber(), last.blockNumber())
+        if self._pending_from is None:
+            return
+        block = first
+        end = last.next()
+        while block.isValid() and block != end:
+            if self._is_pending(block):
+                self._format_blocks(block, self._visible[1])
+            block = block.next()
+
+    def _format_pending(self):
+        """Format the pending blocks during IDLE_SLICE seconds"""
+
+        deadline = time.perf_counter() + self.IDLE_SLICE
+        block = self.document().findBlockByNumber(self._pending_from or 0)
+        while block.isValid():
+            if self._is_pending(block):
+                self._format_blocks(
+                    block, block.blockNumber() + self.BATCH_SIZE - 1)
+            block = block.next()
+            if time.perf_counter() > deadline:
+                break
+        if block.isValid():
+            self._pending_from = block.blockNumber()
+        else:
+            self._pending_from = None
+            self._idle_timer.stop()
 
-        # For indentation guides
-        if text.strip():
-            leading_ws = text[:len(text) - len(text.lstrip())]
-            user_data = self.current_block_user_data()
-            user_data.indentation = len(leading_ws)
+    def has_pending_blocks(self):
+        return self._pending_from is not None
 
 
 def _create_context():
@@ -52,8 +52,6 @@ from ninja_ide.tools import ui_tools
 from ninja_ide.tools import json_manager
 from ninja_ide.gui.ide import IDE
 # from ninja_ide.gui.dialogs import add_to_project
-from ninja_ide.gui.dialogs import project_properties_widget
-from ninja_ide.gui.dialogs import new_project_manager
 from ninja_ide.gui.explorer.explorer_container import ExplorerContainer
 from ninja_ide.gui.explorer import actions
 from ninja_ide.gui.explorer.nproject import NProject
@@ -281,6 +279,7 @@ class ProjectTreeColumn(QDialog):
                 main_container.save_project(path)
 
     def create_new_project(self):
+        from ninja_ide.gui.dialogs import new_project_manager
         wizard = new_project_manager.NewProjectManager(self)
         wizard.show()
 
@@ -601,6 +600,7 @@ class TreeProjectsWidget(QTreeView):
             main_container.open_file(path)
 
     def open_project_properties(self):
+        from ninja_ide.gui.dialogs import project_properties_widget
         proj = project_properties_widget.ProjectProperties(self.project, self)
         proj.show()
 
@@ -17,6 +17,7 @@
 
 # import os
 import collections
+import importlib
 
 from PyQt5.QtWidgets import (
     QMainWindow,
@@ -54,11 +55,8 @@ from ninja_ide.gui import actions
 from ninja_ide.gui import notification
 from ninja_ide.gui.editor import neditable
 from ninja_ide.gui.explorer import nproject
-from ninja_ide.gui.dialogs import about_ninja
-from ninja_ide.gui.dialogs import unsaved_files
 # from ninja_ide.gui.dialogs import schemes_manager
 # from ninja_ide.gui.dialogs import language_manager
-from ninja_ide.gui.dialogs import session_manager
 from ninja_ide.gui.dialogs.preferences import preferences
 # from ninja_ide.gui.dialogs import traceback_widget
 # from ninja_ide.gui.dialogs import python_detect_dialog
@@ -97,6 +95,8 @@ class IDE(QMainWindow):
     filesAndProjectsLoaded = pyqtSignal()
 
     __IDESERVICES = {}
+    # {service_name: module registering the service when imported}
+    __IDELAZYSERVICES = {}
     __IDECONNECTIONS = {}
     __IDESHORTCUTS = {}
     __IDEBARCATEGORIES = {}
@@ -271,6 +271,9 @@ class IDE(QMainWindow):
         """Return the instance of a registered service."""
 
         service = cls.__IDESERVICES.get(service_name, None)
+        if service is None and service_name in cls.__IDELAZYSERVICES:
+            importlib.import_module(cls.__IDELAZYSERVICES.pop(service_name))
+            service = cls.__IDESERVICES.get(service_name, None)
         if service is None:
             logger.debug("Service '{}' unregistered".format(service_name))
         return service
@@ -294,6 +297,14 @@ class IDE(QMainWindow):
         if cls.__created:
             cls.__instance.install_service(service_name)
 
+    @classmethod
+    def register_lazy_service(cls, service_name, module_name):
+        """Register a service created on the first request of it.
+        @service_name: id of the service
+        @module_name: module registering the service when imported"""
+        if service_name not in cls.__IDESERVICES:
+            cls.__IDELAZYSERVICES[service_name] = module_name
+
     def install_service(self, service_name):
         """ Activate the registered service """
 
@@ -411,7 +422,8 @@ class IDE(QMainWindow):
     def _unload_neditable(self, editable):
         self.__neditables.pop(editable.nfile)
         editable.nfile.deleteLater()
-        editable.editor.deleteLater()
+        if editable.editor is not None:
+            editable.editor.deleteLater()
         editable.deleteLater()
 
     @property
@@ -529,11 +541,9 @@ class IDE(QMainWindow):
         projects_explorer = IDE.get_service('projects_explorer')
         if projects_explorer is not None:
             projects_explorer.load_session_projects(projects)
-        # Load files
+        # Load files, only the current one is read now
         main_container = IDE.get_service('main_container')
-        for path, cursor_pos in files:
-            line, col = cursor_pos
-            main_container.open_file(path, line, col)
+        main_container.restore_files(files, current_file)
         # if current_file:
         #    main_container.open_file(current_file)
         self.filesAndProjectsLoaded.emit()
@@ -676,7 +686,7 @@ class IDE(QMainWindow):
             files_info = []
             for path in opened_files:
                 editable = self.__neditables.get(opened_files[path])
-                files_info.append((path, editable.editor.cursor_position))
+                files_info.append((path, editable.cursor_position))
             data_settings.setValue('lastSession/openedFiles', files_info)
         main_container = self.get_service("main_container")
         neditor = main_container.get_current_editor()
@@ -738,6 +748,7 @@ class IDE(QMainWindow):
                     {'session': self.Session}),
                 QMessageBox.Yes, QMessageBox.No)
             if val == QMessageBox.Yes:
+                from ninja_ide.gui.dialogs import session_manager
                 session_manager.SessionsManager.save_session_data(
                     self.Session, self)
         # qsettings.setValue('preferences/general/toolbarArea',
@@ -745,6 +756,7 @@ class IDE(QMainWindow):
 
     def activate_profile(self):
         """Show the Session Manager dialog."""
+        from ninja_ide.gui.dialogs import session_manager
         profilesLoader = session_manager.SessionsManager(self)
         profilesLoader.show()
 
@@ -767,7 +779,7 @@ class IDE(QMainWindow):
         files = self.opened_files
         for f in files:
             editable = self.__neditables.get(f)
-            if editable is not None and editable.editor.is_modified:
+            if editable is not None and editable.is_modified:
                 unsaved.append(f)
         return unsaved
 
@@ -784,12 +796,14 @@ class IDE(QMainWindow):
         #    self.s_listener.close()
         _unsaved_files = self._get_unsaved_files()
         if settings.CONFIRM_EXIT and _unsaved_files:
+            from ninja_ide.gui.dialogs import unsaved_files
             dialog = unsaved_files.UnsavedFilesDialog(_unsaved_files, self)
             if dialog.exec_() == QDialog.Rejected:
                 event.ignore()
                 return
         self.save_settings()
         self.goingDown.emit()
+        self.filesystem.shutdown()
         # close python documentation server (if running)
         # main_container.close_python_doc()
         # Shutdown PluginManager
@@ -838,6 +852,7 @@ class IDE(QMainWindow):
 
     def show_about_ninja(self):
         """Show About NINJA-IDE Dialog."""
+        from ninja_ide.gui.dialogs import about_ninja
         about = about_ninja.AboutNinja(self)
         about.show()
 
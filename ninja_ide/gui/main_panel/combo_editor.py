@@ -47,6 +47,7 @@ from PyQt5.QtGui import (
 from PyQt5.QtCore import (
     # QSize,
     Qt,
+    QTimer,
     pyqtSignal,
     pyqtSlot,
     QModelIndex,
@@ -56,6 +57,7 @@ from PyQt5.QtCore import (
 from ninja_ide import translations
 from ninja_ide.extensions import handlers
 from ninja_ide.core import settings
+from ninja_ide.core.file_handling import file_manager
 from ninja_ide.gui.ide import IDE
 from ninja_ide.tools import ui_tools
 from ninja_ide.gui.main_panel import set_language
@@ -70,6 +72,10 @@ class ComboEditor(ui_tools.StyledBar):
     allFilesClosed = pyqtSignal()
     about_to_close_combo_editor = pyqtSignal()
 
+    # Restored files loaded in advance after the current one
+    PREFETCH_EDITORS = 2
+    PREFETCH_DELAY = 200
+
     def __init__(self, original=False):
         super(ComboEditor, self).__init__(None)
         self.__original = original
@@ -90,6 +96,11 @@ class ComboEditor(ui_tools.StyledBar):
         self.stacked = QStackedLayout()
         vbox.addLayout(self.stacked)
 
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(self.PREFETCH_DELAY)
+        self._prefetch_timer.timeout.connect(self._prefetch_editors)
+
         self._main_container = IDE.get_service('main_container')
 
         if not self.__original:
@@ -158,7 +169,15 @@ class ComboEditor(ui_tools.StyledBar):
 
     def add_editor(self, neditable, keep_index=False):
         """Add Editor Widget to the UI area."""
-        if neditable.editor:
+        if neditable.is_restored:
+            # The editor is created when the file is shown
+            self.stacked.addWidget(EditorPlaceholder(neditable))
+            self.bar.add_item(neditable.display_name, neditable,
+                              set_current=False)
+            if not self.bar.isVisible():
+                self.bar.setVisible(True)
+            self._connect_editable(neditable)
+        elif neditable.editor:
             if self.__original:
                 editor = neditable.editor
             else:
@@ -176,19 +195,8 @@ class ComboEditor(ui_tools.StyledBar):
             if keep_index:
                 self.bar.set_current_by_index(current_index)
             # Connections
-            neditable.fileClosing.connect(self._close_file)
-            editor.editorFocusObtained.connect(self._editor_with_focus)
-            editor.modificationChanged.connect(self._editor_modified)
-            neditable.checkersUpdated.connect(self._show_notification_icon)
-            # Connect file system signals only in the original
-            if self.__original:
-                neditable.askForSaveFileClosing.connect(self._ask_for_save)
-                neditable.fileChanged.connect(self._file_has_been_modified)
-                self.info_bar.reloadClicked.connect(neditable.reload_file)
-            # Editor Signals
-            editor.cursor_position_changed[int, int].connect(
-                self._update_cursor_position)
-            editor.current_line_changed[int].connect(self._set_current_symbol)
+            self._connect_editable(neditable)
+            self._connect_editor(editor)
             """
             # self.connect(editor, SIGNAL("editorFocusObtained()"),
             #             self._editor_with_focus)
@@ -214,6 +222,97 @@ class ComboEditor(ui_tools.StyledBar):
             self._load_symbols(neditable)
             """
 
+    def _connect_editable(self, neditable):
+        neditable.fileClosing.connect(self._close_file)
+        neditable.checkersUpdated.connect(self._show_notification_icon)
+        # Connect file system signals only in the original
+        if self.__original:
+            neditable.askForSaveFileClosing.connect(self._ask_for_save)
+            neditable.fileChanged.connect(self._file_has_been_modified)
+            self.info_bar.reloadClicked.connect(neditable.reload_file)
+
+    def _connect_editor(self, editor):
+        editor.editorFocusObtained.connect(self._editor_with_focus)
+        editor.modificationChanged.connect(self._editor_modified)
+        # Editor Signals
+        editor.cursor_position_changed[int, int].connect(
+            self._update_cursor_position)
+        editor.current_line_changed[int].connect(self._set_current_symbol)
+
+    def _load_editor(self, index):
+        """Replace the placeholder in index with the editor of its file.
+        Returns False if the file was removed, then it's closed"""
+
+        placeholder = self.stacked.widget(index)
+        neditable = placeholder.neditable
+        if neditable.editor is None and \
+                not file_manager.file_exists(neditable.file_path):
+            # Removed since it was restored or hibernated, closed like
+            # the missing files of a session
+            neditable.nfile.close(force_close=True)
+            return False
+        line, col = neditable.cursor_position
+        scroll = neditable.scroll_position
+        if neditable.editor is None:
+            self._main_container.create_editor_from_editable(neditable)
+        if self.__original:
+            editor = neditable.editor
+        else:
+            editor = neditable.editor.clone()
+        current_index = self.stacked.currentIndex()
+        self.stacked.insertWidget(index, editor)
+        self.stacked.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.stacked.setCurrentIndex(current_index)
+        self._connect_editor(editor)
+        editor.go_to_line(line, col)
+        if scroll:
+            editor.verticalScrollBar().setValue(scroll)
+        return True
+
+    def is_current(self, neditable):
+        """Return True if the file of neditable is the one shown, here or
+        in an undocked window"""
+
+        widget = self.current_editor()
+        if getattr(widget, 'neditable', None) is neditable:
+            return True
+        return any(combo.is_current(neditable) for combo in self.__undocked)
+
+    def hibernate_editor(self, neditable):
+        """Replace the editor of neditable with a placeholder, here and in
+        the undocked windows, it's created again when the file is shown.
+
+        The original editor is released by NEditable.hibernate"""
+
+        for index in range(self.stacked.count()):
+            widget = self.stacked.widget(index)
+            if isinstance(widget, EditorPlaceholder) or \
+                    getattr(widget, 'neditable', None) is not neditable:
+                continue
+            current_index = self.stacked.currentIndex()
+            self.stacked.insertWidget(index, EditorPlaceholder(neditable))
+            self.stacked.removeWidget(widget)
+            self.stacked.setCurrentIndex(current_index)
+            if not self.__original:
+                widget.deleteLater()
+            break
+        for combo in self.__undocked:
+            combo.hibernate_editor(neditable)
+
+    def _prefetch_editors(self):
+        """Load the next restored files after the current one, one each
+        time the timer fires"""
+
+        current_index = self.stacked.currentIndex()
+        last_index = min(current_index + self.PREFETCH_EDITORS,
+                         self.stacked.count() - 1)
+        for index in range(current_index + 1, last_index + 1):
+            if isinstance(self.stacked.widget(index), EditorPlaceholder):
+                self._load_editor(index)
+                self._prefetch_timer.start()
+                break
+
     def show_combo_file(self):
         self.bar.combo.showPopup()
 
@@ -339,10 +438,18 @@ class ComboEditor(ui_tools.StyledBar):
     def set_current(self, neditable):
         if neditable:
             self.bar.set_current_file(neditable)
+            # The index didn't change if the placeholder was the current one
+            index = self.stacked.currentIndex()
+            if isinstance(self.stacked.widget(index), EditorPlaceholder):
+                self._set_current(neditable, index)
 
     def _set_current(self, neditable, index):
         self.stacked.setCurrentIndex(index)
         if neditable:
+            if isinstance(self.stacked.widget(index), EditorPlaceholder):
+                if not self._load_editor(index):
+                    return
+                self._prefetch_timer.start()
             self.bar.image_viewer_controls.setVisible(False)
             self.bar.code_navigator.setVisible(True)
             self.bar.symbols_combo.setVisible(True)
@@ -539,6 +646,16 @@ class ActionBar(ui_tools.StyledBar):
         self.lbl_position.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
         hbox.addWidget(self.lbl_position)
 
+        self.lbl_hibernated = QLabel()
+        self.lbl_hibernated.setProperty("gradient", True)
+        self.lbl_hibernated.setToolTip(
+            translations.TR_EDITORS_HIBERNATED_TOOLTIP)
+        self.lbl_hibernated.setContentsMargins(margin, 0, margin, 0)
+        self.lbl_hibernated.setSizePolicy(
+            QSizePolicy.Fixed, QSizePolicy.Fixed)
+        self.lbl_hibernated.setVisible(False)
+        hbox.addWidget(self.lbl_hibernated)
+
         self.btn_close = QToolButton()
         self.btn_close.setProperty("gradient", True)
 
@@ -577,9 +694,27 @@ class ActionBar(ui_tools.StyledBar):
             self.code_navigator.show()
             self.lbl_position.show()
 
-    def add_item(self, text, neditable):
+    def show_hibernated(self, count, reclaimed):
+        """Show how many editors are hibernated and the memory reclaimed
+        in bytes, None if it couldn't be measured"""
+
+        if reclaimed is None:
+            size = "?"
+        else:
+            size = "%.1f MB" % (reclaimed / (1024 * 1024))
+        self.lbl_hibernated.setText(
+            translations.TR_EDITORS_HIBERNATED % (count, size))
+        self.lbl_hibernated.setVisible(True)
+
+    def add_item(self, text, neditable, set_current=True):
         """Add a new item to the combo and add the neditable data."""
 
+        if not set_current:
+            # The first item becomes the current one without notice
+            self.combo_files.blockSignals(True)
+            self.combo_files.addItem(text, neditable)
+            self.combo_files.blockSignals(False)
+            return
         self.combo_files.addItem(text, neditable)
         self.combo_files.setCurrentIndex(self.combo_files.count() - 1)
 
@@ -823,6 +958,15 @@ class ActionBar(ui_tools.StyledBar):
                 self.about_to_close_file(i)
 
 
+class EditorPlaceholder(QWidget):
+    """Takes the place of the editor of a file restored from a session, or
+    hibernated, until the file is shown"""
+
+    def __init__(self, neditable):
+        super().__init__()
+        self.neditable = neditable
+
+
 class ComboFiles(QComboBox):
     showComboSelector = pyqtSignal()
 
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import time
+import weakref
+
+from PyQt5.QtCore import (
+    QCoreApplication,
+    QEvent,
+    QObject,
+    QTimer,
+    pyqtSignal
+)
+
+from ninja_ide.core import settings
+from ninja_ide.gui.main_panel import combo_editor
+from ninja_ide.tools import utils
+
+
+class EditorPool(QObject):
+    """Hibernate the unmodified editors that weren't shown for a while, and
+    the least recently shown ones while the memory used is over budget.
+
+    Only the path, cursor and scroll of a hibernated file are kept, its
+    editor is created again when the file is shown."""
+
+    # Emitted with the number of hibernated editors and the memory
+    # reclaimed in bytes, None if it can't be measured
+    editorsHibernated = pyqtSignal(int, 'PyQt_PyObject')
+
+    CHECK_INTERVAL = 30000
+
+    def __init__(self, main_container):
+        super().__init__(main_container)
+        self._main_container = main_container
+        self._last_shown = weakref.WeakKeyDictionary()
+        self._hibernated = weakref.WeakSet()
+        self._reclaimed = 0
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.CHECK_INTERVAL)
+        self._timer.timeout.connect(self.check)
+
+    def start(self):
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    @property
+    def hibernated(self):
+        """Number of editors hibernated and not shown again"""
+        return sum(1 for neditable in self._hibernated
+                   if neditable.editor is None)
+
+    def _combos(self):
+        return self._main_container.splitter.findChildren(
+            combo_editor.ComboEditor)
+
+    def check(self):
+        """Hibernate the editors idle for too long, then the least recently
+        shown until the memory used is under the budget"""
+
+        now = time.monotonic()
+        combos = self._combos()
+        editables = set()
+        for combo in combos:
+            editables.update(combo.bar.get_editables())
+        candidates = []
+        for neditable in editables:
+            if any(combo.is_current(neditable) for combo in combos):
+                self._last_shown[neditable] = now
+            elif neditable.editor is not None and \
+                    not neditable.is_modified and \
+                    not neditable.new_document:
+                self._last_shown.setdefault(neditable, now)
+                candidates.append(neditable)
+        # Least recently shown first
+        candidates.sort(key=self._last_shown.get)
+
+        rss = utils.get_rss()
+        idle_time = settings.HIBERNATE_EDITORS_AFTER * 60
+        budget = settings.EDITORS_MEMORY_BUDGET * 1024 * 1024
+        hibernated = False
+        for neditable in candidates:
+            idle = idle_time and now - self._last_shown[neditable] >= idle_time
+            over_budget = budget and rss is not None and rss > budget
+            if not idle and not over_budget:
+                break
+            self.hibernate(neditable, combos)
+            # Delete the released editor now to measure the memory
+            QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+            utils.trim_memory()
+            new_rss = utils.get_rss()
+            if rss is None or new_rss is None:
+                self._reclaimed = None
+            elif self._reclaimed is not None:
+                self._reclaimed += max(rss - new_rss, 0)
+            rss = new_rss
+            hibernated = True
+        if hibernated or self._hibernated:
+            self.editorsHibernated.emit(self.hibernated, self._reclaimed)
+
+    def hibernate(self, neditable, combos=None):
+        """Release the editors of neditable, in every combo"""
+
+        if combos is None:
+            combos = self._combos()
+        for combo in combos:
+            combo.hibernate_editor(neditable)
+        if neditable.hibernate():
+            self._hibernated.add(neditable)
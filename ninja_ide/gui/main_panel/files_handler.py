@@ -18,7 +18,6 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 import os
-import re
 import uuid
 
 from PyQt5.QtWidgets import (
@@ -38,6 +37,9 @@ logger = NinjaLogger(__name__)
 
 class FilesHandler(QWidget):
 
+    # Files shown for a fuzzy search
+    MAX_FUZZY_RESULTS = 100
+
     def __init__(self, parent=None):
         super(FilesHandler, self).__init__(None, Qt.Popup)
         self.setAttribute(Qt.WA_TranslucentBackground)
@@ -90,19 +92,9 @@ class FilesHandler(QWidget):
             nfile.close()
 
     def _fuzzy_search(self, search):
-        search = '.+'.join(re.escape(search).split('\\ '))
-        pattern = re.compile(search, re.IGNORECASE)
-
-        model = []
-        for project_path in locator.files_paths:
-            files_in_project = locator.files_paths[project_path]
-            base_project = os.path.basename(project_path)
-            for file_path in files_in_project:
-                file_path = os.path.join(
-                    base_project, os.path.relpath(file_path, project_path))
-                if pattern.search(file_path):
-                    model.append([os.path.basename(file_path), file_path,
-                                  project_path])
+        model = [[os.path.basename(file_path), file_path, project_path]
+                 for file_path, project_path in locator.files_paths.search(
+                     search, self.MAX_FUZZY_RESULTS)]
         self._root.set_fuzzy_model(model)
 
     def _add_model(self):
@@ -133,7 +125,7 @@ class FilesHandler(QWidget):
                         "checker_text": checker.dirty_text,
                         "checker_color": color
                     })
-            modified = neditable.editor.is_modified
+            modified = neditable.is_modified
             temp_file = str(uuid.uuid4()) if nfile.file_path is None else ""
             filepath = nfile.file_path if nfile.file_path is not None else ""
             model.append([nfile.file_name, filepath, checks, modified,
@@ -35,6 +35,7 @@ from ninja_ide.gui.ide import IDE
 from ninja_ide.tools import ui_tools
 from ninja_ide.gui.main_panel import actions
 from ninja_ide.gui.main_panel import combo_editor
+from ninja_ide.gui.main_panel import editor_pool
 from ninja_ide.gui.main_panel import add_file_folder
 from ninja_ide.gui.main_panel import start_page
 from ninja_ide.gui.main_panel import set_language
@@ -58,6 +59,8 @@ class _MainContainer(QWidget):
     currentEditorChanged = pyqtSignal("QString")
     fileOpened = pyqtSignal("QString")
     fileSaved = pyqtSignal("QString")
+    # Emitted with the path of a project file whose content changed
+    fileUpdated = pyqtSignal("QString")
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -94,6 +97,11 @@ class _MainContainer(QWidget):
                 "signal_name": "projectOpened",
                 "slot": self._explore_code
             },
+            {
+                "target": "filesystem",
+                "signal_name": "filesChanged",
+                "slot": self._on_files_changed
+            },
             {
                 "target": "projects_explore",
                 "signal_name": "updateLocator",
@@ -117,6 +125,11 @@ class _MainContainer(QWidget):
         self.combo_area.allFilesClosed.connect(self._files_closed)
         self.splitter.add_widget(self.combo_area)
         self.add_widget(self.splitter)
+        # Editors of the files not shown are released to save memory
+        self._editor_pool = editor_pool.EditorPool(self)
+        self._editor_pool.editorsHibernated.connect(
+            self.combo_area.bar.show_hibernated)
+        self._editor_pool.start()
         # self.current_widget = self.combo_area
         # Code Locator
         self._code_locator = locator_widget.LocatorWidget(ninjaide)
@@ -171,6 +184,17 @@ class _MainContainer(QWidget):
 
         self._code_locator.explore_code()
 
+    def _on_files_changed(self, paths):
+        """Update locator metadata for the files changed outside the IDE"""
+
+        self._code_locator.explore_changed_files(paths)
+
+    def _on_editable_saved(self, neditable):
+        """Update locator metadata for the file just saved"""
+
+        self._code_locator.explore_changed_files([neditable.file_path])
+        self.fileUpdated.emit(neditable.file_path)
+
     def current_editor_changed(self, filename):
         """Notify the new filename of the current editor"""
 
@@ -348,7 +372,7 @@ class _MainContainer(QWidget):
     def add_editor(self, filename=None):
         ninjaide = IDE.get_service("ide")
         editable = ninjaide.get_or_create_editable(filename)
-        if editable.editor:
+        if editable.editor or editable.is_restored:
             # If already open
             logger.debug("%s is already open" % filename)
             self.combo_area.set_current(editable)
@@ -357,6 +381,7 @@ class _MainContainer(QWidget):
             pass
 
         editor_widget = self.create_editor_from_editable(editable)
+        editable.fileSaved.connect(self._on_editable_saved)
         # editor_widget.set_language()
         # Add the tab
         keep_index = (self.splitter.count() > 1 and
@@ -372,6 +397,38 @@ class _MainContainer(QWidget):
         editor_widget.setFocus()
         return editor_widget
 
+    def restore_files(self, files, current_file=None):
+        """Add the files of a session without reading them.
+
+        The editor of each file is created when its tab is shown (see
+        ComboEditor), only the current file (or the last one) is loaded now.
+        @files: list of (path, (line, col)) or (path, (line, col), mtime)"""
+
+        ninjaide = IDE.get_service("ide")
+        image_extensions = ("png", "jpg", "jpeg", "bmp", "gif")
+        last_file = None
+        for file_data in files:
+            path, cursor_position = file_data[:2]
+            mtime = file_data[2] if len(file_data) > 2 else None
+            if not file_manager.file_exists(path):
+                continue
+            last_file = path
+            if file_manager.get_file_extension(path) in image_extensions:
+                self.open_image(path)
+                continue
+            editable = ninjaide.get_or_create_editable(path)
+            if editable.editor or editable.is_restored:
+                continue
+            editable.restore(tuple(cursor_position), mtime)
+            editable.fileSaved.connect(self._on_editable_saved)
+            self.combo_area.add_editor(editable, keep_index=True)
+            self.fileOpened.emit(path)
+        if current_file and file_manager.file_exists(current_file):
+            last_file = current_file
+        if last_file is not None:
+            self.stack.setCurrentWidget(self.splitter)
+            self.open_file(last_file)
+
     def create_editor_from_editable(self, editable):
         neditor = editor.create_editor(editable)
         neditor.zoomChanged.connect(self._show_zoom_indicator)
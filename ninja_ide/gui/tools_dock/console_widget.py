@@ -15,8 +15,14 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import re
+
 from PyQt5.QtWidgets import (
+    QApplication,
     QPlainTextEdit,
+    QStyle,
+    QToolButton
 )
 from PyQt5.QtGui import (
     QTextCursor,
@@ -27,8 +33,10 @@ from PyQt5.QtCore import Qt
 
 from ninja_ide import resources
 from ninja_ide.tools import console
+from ninja_ide.tools import ui_tools
 from ninja_ide.core import settings
 from ninja_ide.gui.editor import syntaxhighlighter
+from ninja_ide.utils import theme
 
 
 class Highlighter(syntaxhighlighter.SyntaxHighlighter):
@@ -40,21 +48,34 @@ class Highlighter(syntaxhighlighter.SyntaxHighlighter):
 
 
 class ConsoleWidget(QPlainTextEdit):
-    """Extends QPlainTextEdit to emulate a python interpreter"""
+    """Extends QPlainTextEdit to emulate a python interpreter, the code
+    is executed in another process (see tools.console)"""
+
+    # Lines kept in the console
+    MAX_LINES = 10000
 
     def __init__(self, parent=None):
         super().__init__("❭ ")
         self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(self.MAX_LINES)
         self.document().setDefaultFont(settings.FONT)
         self.setFrameShape(0)
         self.prompt = "❭ "
+        self.continuation_prompt = "... "
+        # The interpreter is waiting for more lines of a command
+        self._incomplete = False
         # Hostory
         self._history_index = 0
         self._history = []
         self._current_command = ''
 
         self.moveCursor(QTextCursor.EndOfLine)
-        self._console = console.Console()
+        self._console = console.ConsoleProcess(self)
+        self._console.outputAvailable.connect(self._on_output)
+        self._console.executed.connect(self._on_executed)
+        self._console.completionsFound.connect(self._on_completions)
+        self._console.restarted.connect(self._on_restarted)
+        QApplication.instance().aboutToQuit.connect(self._console.shutdown)
         syntax = syntaxhighlighter.build_highlighter_for(language='python')
         self._highlighter = Highlighter(
             self.document(),
@@ -72,9 +93,28 @@ class ConsoleWidget(QPlainTextEdit):
             Qt.Key_Left: self.__manage_left,
             Qt.Key_Home: self.__manage_home,
             Qt.Key_Up: self.__up_pressed,
-            Qt.Key_Down: self.__down_pressed
+            Qt.Key_Down: self.__down_pressed,
+            Qt.Key_Tab: self.__manage_tab
         }
 
+        # Button Widgets
+        self._btn_interrupt = QToolButton()
+        self._btn_interrupt.setIcon(
+            ui_tools.colored_icon(':img/stop', '#d74044'))
+        self._btn_interrupt.setToolTip('Interrupt (Ctrl+C)')
+        self._btn_interrupt.clicked.connect(self._console.interrupt)
+        self._btn_restart = QToolButton()
+        self._btn_restart.setIcon(
+            self.style().standardIcon(QStyle.SP_BrowserReload))
+        self._btn_restart.setToolTip('Restart the Interpreter')
+        self._btn_restart.clicked.connect(self._console.restart)
+        self._btn_clean = QToolButton()
+        self._btn_clean.setIcon(
+            ui_tools.colored_icon(
+                ':img/clean', theme.get_color('IconBaseColor')))
+        self._btn_clean.setToolTip('Clear Console')
+        self._btn_clean.clicked.connect(self._clear)
+
     def apply_editor_style(self):
         palette = self.palette()
         palette.setColor(
@@ -172,9 +212,12 @@ class ConsoleWidget(QPlainTextEdit):
         """Clean console and add prompt"""
 
         self.clear()
-        self.__add_prompt()
+        if not self._console.busy:
+            self.__add_prompt()
 
     def _write_command(self):
+        if self._console.busy:
+            return
         text = self.textCursor().block().text()
         command = text[len(self.prompt):]
         if command.startswith('.'):
@@ -186,22 +229,95 @@ class ConsoleWidget(QPlainTextEdit):
         if clear:
             self._clear()
             return
-        incomplete = self._console.push(command) if conditional else None
-        if not incomplete:
-            output = self._console.output
-            if output:
-                self.appendPlainText(output)
-        self.__add_prompt(incomplete)
+        if not conditional:
+            self.__add_prompt()
+            return
+        # The output goes below the command, the prompt is added when the
+        # execution finishes
+        self.moveCursor(QTextCursor.End)
+        self.textCursor().insertBlock()
+        self._console.execute(command)
+
+    def _on_output(self, text, stream):
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        self.moveCursor(QTextCursor.End)
+
+    def _on_executed(self, incomplete):
+        if not self._console.busy:
+            self.__add_prompt(incomplete)
+
+    def _on_restarted(self):
+        # Replace the empty prompt (if any) with the message
+        block = self.document().lastBlock()
+        cursor = QTextCursor(block)
+        if block.text() == self.prompt:
+            cursor.movePosition(QTextCursor.EndOfBlock,
+                                QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
+        elif block.text():
+            cursor.movePosition(QTextCursor.EndOfBlock)
+            cursor.insertBlock()
+        cursor.insertText('=== The interpreter was restarted ===')
+        self.__add_prompt()
 
     def __add_prompt(self, incomplete=False):
+        self._incomplete = incomplete
         prompt = self.prompt
         if incomplete:
-            prompt = '...' + ' '
-        self.appendPlainText(prompt)
+            prompt = self.continuation_prompt
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        if cursor.block().text():
+            cursor.insertBlock()
+        cursor.insertText(prompt)
         self.moveCursor(QTextCursor.End)
 
+    def _word_under_cursor(self):
+        """The name (with its dots) before the cursor"""
+        cursor = self.textCursor()
+        line = cursor.block().text()[:cursor.positionInBlock()]
+        return re.search(r'[\w.]*$', line).group()
+
+    def __manage_tab(self, event):
+        word = self._word_under_cursor()
+        if not word or self._console.busy:
+            # Indentation
+            return False
+        self._console.complete(word)
+        return True
+
+    def _on_completions(self, text, matches):
+        if text != self._word_under_cursor() or not matches:
+            return
+        prefix = os.path.commonprefix(matches)
+        if len(prefix) > len(text):
+            self.textCursor().insertText(prefix[len(text):])
+            return
+        # Show the options, then the command again after the same prompt
+        incomplete = self._incomplete
+        prompt = self.continuation_prompt if incomplete else self.prompt
+        command = self.document().lastBlock().text()[len(prompt):]
+        names = [match.rsplit('.', 1)[-1] for match in matches]
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertBlock()
+        cursor.insertText('  '.join(names))
+        self.__add_prompt(incomplete)
+        self.textCursor().insertText(command)
+
     def keyPressEvent(self, event):
         # self._check_event_on_selection(event)
+        if self._console.busy:
+            if event.key() == Qt.Key_C and \
+                    event.modifiers() == Qt.ControlModifier and \
+                    not self.textCursor().hasSelection():
+                self._console.interrupt()
+                return
+            if event.text() and not event.modifiers() & Qt.ControlModifier:
+                # The input isn't mixed with the output
+                return
         if self._key_operations.get(event.key(), lambda e: False)(event):
             return
         super().keyPressEvent(event)
@@ -211,4 +327,8 @@ class ConsoleWidget(QPlainTextEdit):
         return self.textCursor().columnNumber() - len(self.prompt)
 
     def button_widgets(self):
-        return []
+        return (
+            self._btn_clean,
+            self._btn_interrupt,
+            self._btn_restart
+        )
@@ -15,19 +15,109 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import time
+
 from PyQt5.QtWidgets import (
     QTreeWidget,
     QTreeWidgetItem,
     QWidget,
     QVBoxLayout
 )
+from PyQt5.QtCore import (
+    QObject,
+    QThread,
+    Qt,
+    pyqtSignal,
+    pyqtSlot
+)
+from ninja_ide import resources
+from ninja_ide.core import settings
 from ninja_ide.gui.ide import IDE
+from ninja_ide.tools import project_lint
+
+
+class ProjectLintWorker(QObject):
+    """Lint the projects in its own thread. The results stored in the
+    database are sent first, then the ones of the files checked again"""
+
+    # (project_path, [(file_path, errors)])
+    resultsFound = pyqtSignal('QString', 'PyQt_PyObject')
+    finished = pyqtSignal('QString')
+
+    # Seconds between each batch of results
+    BATCH_INTERVAL = 0.2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lint = project_lint.ProjectLint()
+        # {project_path: LintDatabase}, used only from the worker thread
+        self._databases = {}
+
+    def _get_database(self, project_path):
+        database = self._databases.get(project_path)
+        if database is None:
+            db_path = os.path.join(resources.NINJA_KNOWLEDGE_PATH,
+                                   project_lint.db_name(project_path))
+            database = project_lint.LintDatabase(db_path)
+            self._databases[project_path] = database
+        return database
+
+    @pyqtSlot('QString')
+    def lint_project(self, project_path):
+        database = self._get_database(project_path)
+        self.resultsFound.emit(project_path,
+                               list(database.errors().items()))
+        batch = []
+        last_emit = time.time()
+        for result in self._lint.lint(project_path, database):
+            batch.append(result)
+            if time.time() - last_emit > self.BATCH_INTERVAL:
+                self.resultsFound.emit(project_path, batch)
+                batch = []
+                last_emit = time.time()
+        if batch:
+            self.resultsFound.emit(project_path, batch)
+        self.finished.emit(project_path)
+
+    @pyqtSlot('PyQt_PyObject')
+    def files_changed(self, paths):
+        """Check again these files in the projects containing them, or
+        the whole project if its folder is in paths"""
+        for project_path, database in list(self._databases.items()):
+            if project_path in paths:
+                self.lint_project(project_path)
+                continue
+            folder = os.path.join(project_path, '')
+            changed = [path for path in paths
+                       if path.startswith(folder) and path.endswith('.py')]
+            if changed:
+                self.resultsFound.emit(
+                    project_path, self._lint.lint_files(changed, database))
+
+    @pyqtSlot('QString')
+    def close_project(self, project_path):
+        database = self._databases.pop(project_path, None)
+        if database is not None:
+            database.close()
 
-# FIXME: se ejecuta 2 veces refresh, proviene de _set_current combo editor
-# FIXME: analizar todo el proyecto
+    def cancel(self):
+        """Can be called from any thread"""
+        self._lint.cancel()
+
+    def shutdown(self):
+        self._lint.shutdown()
+        for database in self._databases.values():
+            database.close()
+        self._databases = {}
 
 
 class ErrorsTree(QWidget):
+    """Errors of all the files of the opened projects"""
+
+    _lintRequested = pyqtSignal('QString')
+    _projectClosed = pyqtSignal('QString')
+    _filesChanged = pyqtSignal('PyQt_PyObject')
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -37,18 +127,126 @@ class ErrorsTree(QWidget):
         self._tree = QTreeWidget()
         self._tree.header().setHidden(True)
         self._tree.setAnimated(True)
+        self._tree.itemActivated.connect(self._go_to)
         box.addWidget(self._tree)
+        # {file_path: (project_path, QTreeWidgetItem)}
+        self._items = {}
+        self._lint_thread = None
+
+        connections = (
+            {
+                "target": "filesystem",
+                "signal_name": "projectOpened",
+                "slot": self._on_project_opened
+            },
+            {
+                "target": "filesystem",
+                "signal_name": "projectClosed",
+                "slot": self._on_project_closed
+            },
+            {
+                "target": "filesystem",
+                "signal_name": "filesChanged",
+                "slot": self._on_files_changed
+            },
+            {
+                "target": "main_container",
+                "signal_name": "fileUpdated",
+                "slot": self._on_file_updated
+            },
+            {
+                "target": "ide",
+                "signal_name": "goingDown",
+                "slot": self._stop_lint_thread
+            }
+        )
+        IDE.register_signals("errors_tree", connections)
+
+    def _start_lint_thread(self):
+        if self._lint_thread is not None:
+            return
+        self._lint_worker = ProjectLintWorker()
+        self._lint_thread = QThread()
+        self._lint_worker.moveToThread(self._lint_thread)
+        self._lint_worker.resultsFound.connect(self._on_results_found)
+        self._lintRequested.connect(self._lint_worker.lint_project)
+        self._projectClosed.connect(self._lint_worker.close_project)
+        self._filesChanged.connect(self._lint_worker.files_changed)
+        self._lint_thread.start()
+
+    def _stop_lint_thread(self):
+        if self._lint_thread is None:
+            return
+        self._lint_worker.cancel()
+        self._lint_thread.quit()
+        self._lint_thread.wait()
+        self._lint_worker.shutdown()
+        self._lint_thread = None
+
+    def _on_project_opened(self, project_path):
+        self._start_lint_thread()
+        self._lintRequested.emit(project_path)
 
-    def refresh(self, errors, path):
-        self._tree.clear()
-        parent = QTreeWidgetItem(self._tree, [path])
-        for lineno, msg in errors.items():
-            item = QTreeWidgetItem(parent, [msg])
-            self._tree.addTopLevelItem(item)
+    def _on_project_closed(self, project_path):
+        for file_path, (project, _) in list(self._items.items()):
+            if project == project_path:
+                self.set_errors(project_path, file_path, [])
+        if self._lint_thread is not None:
+            self._projectClosed.emit(project_path)
+
+    def _on_file_updated(self, file_path):
+        self._on_files_changed([file_path])
+
+    def _on_files_changed(self, file_paths):
+        if self._lint_thread is not None:
+            self._filesChanged.emit(file_paths)
+
+    @pyqtSlot('QString', 'PyQt_PyObject')
+    def _on_results_found(self, project_path, results):
+        self._tree.setUpdatesEnabled(False)
+        for file_path, errors in results:
+            self.set_errors(project_path, file_path, errors)
+        self._tree.setUpdatesEnabled(True)
+
+    def set_errors(self, project_path, file_path, errors):
+        """Replace the errors displayed for file_path, errors is a list
+        of (lineno, kind, message, column)"""
+        kinds = set()
+        if settings.FIND_ERRORS:
+            kinds.add(project_lint.PYFLAKES)
+        if settings.CHECK_STYLE:
+            kinds.add(project_lint.PEP8)
+        errors = [error for error in errors if error[1] in kinds]
+        _, parent = self._items.pop(file_path, (None, None))
+        if parent is not None:
+            index = self._tree.indexOfTopLevelItem(parent)
+            self._tree.takeTopLevelItem(index)
+        if not errors:
+            return
+        parent = QTreeWidgetItem([os.path.relpath(file_path, project_path)])
+        parent.setToolTip(0, file_path)
+        parent.setData(0, Qt.UserRole, (file_path, 0))
+        children = []
+        for lineno, _, message, _ in errors:
+            child = QTreeWidgetItem(['%d: %s' % (lineno + 1, message)])
+            child.setData(0, Qt.UserRole, (file_path, lineno))
+            children.append(child)
+        parent.addChildren(children)
+        self._tree.addTopLevelItem(parent)
+        self._items[file_path] = (project_path, parent)
+
+    def _go_to(self, item, column):
+        file_path, lineno = item.data(0, Qt.UserRole)
+        main_container = IDE.get_service("main_container")
+        if main_container is not None:
+            main_container.open_file(file_path, line=lineno)
 
     def display_name(self):
         return 'Errors'
 
+    def button_widgets(self):
+        return []
+
 
 # FIXME: if stm
 ErrorsTree()
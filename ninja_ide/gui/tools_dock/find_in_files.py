@@ -15,8 +15,9 @@
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
 
-import queue
+import os
 import re
+import time
 from PyQt5.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -36,13 +37,9 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import (
     QObject,
-    QDir,
     QAbstractItemModel,
-    QFile,
-    QTextStream,
     pyqtSignal,
     pyqtSlot,
-    QRegExp,
     Qt,
     QRect,
     QThread,
@@ -53,72 +50,81 @@ from PyQt5.QtGui import (
     # QBrush,
     QPalette
 )
+from ninja_ide import resources
 from ninja_ide.gui.ide import IDE
 from ninja_ide.tools import ui_tools
+from ninja_ide.tools import file_search
+from ninja_ide.tools import content_index
 from ninja_ide.core import settings
 from ninja_ide.utils import theme
 
 
 class FindInFilesWorker(QObject):
+    """Run the searches in its own thread, the results are sent in
+    batches to avoid flooding the GUI with one signal per file"""
 
-    finished = pyqtSignal('PyQt_PyObject')
-
-    def find_in_files(self, dir_name, filters, regexp, recursive):
-        """Trigger the find in files thread and return the lines found"""
-
-        self._cancel = False
-        self.recursive = recursive
-        self.search_pattern = regexp
-        self.filters = filters
-        self.queue = queue.Queue()
-        self.queue.put(dir_name)
-        self.root_dir = dir_name
-        # Start!
-        self.start_worker()
-
-    def start_worker(self):
-        file_filter = QDir.Files | QDir.NoDotAndDotDot | QDir.Readable
-        dir_filter = QDir.Dirs | QDir.NoDotAndDotDot | QDir.Readable
-        while not self._cancel and not self.queue.empty():
-            current_dir = QDir(self.queue.get())
-            # Skip not readable dirs!
-            if not current_dir.isReadable():
+    resultsFound = pyqtSignal(int, 'PyQt_PyObject')
+    finished = pyqtSignal(int)
+
+    # Seconds between each batch of results
+    BATCH_INTERVAL = 0.1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._search = file_search.FileSearch()
+        # {project_path: ContentIndex}, used only from the worker thread
+        self._indexes = {}
+
+    def _get_index(self, dir_name):
+        index = self._indexes.get(dir_name)
+        if index is None:
+            db_path = os.path.join(resources.NINJA_KNOWLEDGE_PATH,
+                                   content_index.db_name(dir_name))
+            index = content_index.ContentIndex(db_path)
+            self._indexes[dir_name] = index
+        return index
+
+    @pyqtSlot(int, 'QString', 'PyQt_PyObject', 'PyQt_PyObject', bool)
+    def find_in_files(self, search_id, dir_name, filters, regexp, recursive):
+        """Search regexp (a compiled regex) in the files of dir_name,
+        search_id is sent with the results"""
+
+        batch = []
+        last_emit = time.time()
+        for result in self._search.search(dir_name, regexp, filters,
+                                          recursive,
+                                          self._get_index(dir_name)):
+            batch.append(result)
+            if time.time() - last_emit > self.BATCH_INTERVAL:
+                self.resultsFound.emit(search_id, batch)
+                batch = []
+                last_emit = time.time()
+        if batch:
+            self.resultsFound.emit(search_id, batch)
+        self.finished.emit(search_id)
+
+    @pyqtSlot('PyQt_PyObject')
+    def files_changed(self, paths):
+        """Update the content index of the projects with these files"""
+        for project_path, index in self._indexes.items():
+            folder = os.path.join(project_path, '')
+            changed = [path for path in paths if path.startswith(folder)]
+            if not changed:
                 continue
-            # Collect all sub dirs!
-            if self.recursive:
-                current_sub_dirs = current_dir.entryInfoList(dir_filter)
-                for one_dir in current_sub_dirs:
-                    self.queue.put(one_dir.absoluteFilePath())
-            # All files in sub_dir first apply the filters
-            current_files = current_dir.entryInfoList(
-                self.filters, file_filter)
-            # Process all files in current dir
-            for one_file in current_files:
-                self._grep_file(
-                    one_file.absoluteFilePath(), one_file.fileName())
-
-    def _grep_file(self, file_path, file_name):
-        """Search for each line inside the file"""
-        file_obj = QFile(file_path)
-        if not file_obj.open(QFile.ReadOnly):
-            return
-        stream = QTextStream(file_obj)
-        lines = []
-        append = lines.append
-        line_index = 0
-        line = stream.readLine()
-        while not self._cancel and not stream.atEnd():
-            column = self.search_pattern.indexIn(line)
-            if column != - 1:
-                append((line_index, line))
-            # Take the next line
-            line = stream.readLine()
-            line_index += 1
+            existing = [path for path in changed if os.path.isfile(path)]
+            index.remove(set(changed) - set(existing))
+            index.update(content_index.index_files(existing))
 
-        import os
+    def cancel(self):
+        """Can be called from any thread, the search stops as soon as
+        the current files are searched"""
+        self._search.cancel()
 
-        p = os.path.join(self.root_dir, file_path)
-        self.finished.emit((p, lines))
+    def shutdown(self):
+        self._search.shutdown()
+        for index in self._indexes.values():
+            index.close()
+        self._indexes = {}
 
 
 class SearchResultTreeView(QTreeView):
@@ -133,12 +139,16 @@ class SearchResultTreeView(QTreeView):
     def clear(self):
         self._model.clear()
 
-    def add_result(self, results):
-        self._model.add_result(results)
+    def add_results(self, results):
+        self._model.add_results(results)
 
 
 class FindInFilesWidget(QWidget):
 
+    _searchStarted = pyqtSignal(
+        int, 'QString', 'PyQt_PyObject', 'PyQt_PyObject', bool)
+    _filesChanged = pyqtSignal('PyQt_PyObject')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         # Button widgets
@@ -157,10 +167,19 @@ class FindInFilesWidget(QWidget):
         self._main_container = IDE.get_service("main_container")
         # Search worker
         self._search_worker = FindInFilesWorker()
+        self._search_id = 0
         self._search_thread = QThread()
         self._search_worker.moveToThread(self._search_thread)
-        self._search_worker.finished.connect(self._on_worker_finished)
-        # self._search_thread.finished.connect(self._search_worker.deleteLater)
+        self._search_worker.resultsFound.connect(self._on_results_found)
+        self._searchStarted.connect(self._search_worker.find_in_files)
+        self._filesChanged.connect(self._search_worker.files_changed)
+        self._main_container.fileUpdated.connect(self._on_file_updated)
+        filesystem = IDE.get_service('filesystem')
+        if filesystem is not None:
+            filesystem.filesChanged.connect(self._filesChanged)
+        self._search_thread.start()
+        ninjaide = IDE.get_service('ide')
+        ninjaide.goingDown.connect(self._stop_search_thread)
 
         self._actions.searchRequested.connect(self._on_search_requested)
         self._tree_results.activated.connect(self._go_to)
@@ -177,19 +196,42 @@ class FindInFilesWidget(QWidget):
             # Open the file and jump to line
             self._main_container.open_file(file_name, line=lineno)
 
-    @pyqtSlot('PyQt_PyObject')
-    def _on_worker_finished(self, lines):
-        self._tree_results.add_result(lines)
+    def _on_file_updated(self, file_path):
+        self._filesChanged.emit([file_path])
+
+    def _stop_search_thread(self):
+        self._search_worker.cancel()
+        self._search_thread.quit()
+        self._search_thread.wait()
+        self._search_worker.shutdown()
+
+    @pyqtSlot(int, 'PyQt_PyObject')
+    def _on_results_found(self, search_id, results):
+        # Discard the batches sent before the last search was cancelled
+        if search_id == self._search_id:
+            self._tree_results.add_results(results)
 
     @pyqtSlot('QString', bool)
     def _on_search_requested(self, to_find, cs):
         ninjaide = IDE.get_service('ide')
         # editor = self._main_container.get_current_editor()
         nproject = ninjaide.get_current_project()
-        to_find = QRegExp(to_find, cs)
+        if nproject is None:
+            return
+        flags = re.MULTILINE
+        if not cs:
+            flags |= re.IGNORECASE
+        try:
+            to_find = re.compile(to_find, flags)
+        except re.error:
+            to_find = re.compile(re.escape(to_find), flags)
         filters = re.split(",", '*.py,*.md')
-        self._search_worker.find_in_files(
-            nproject.path, filters, to_find, True)
+        # The previous search stops and the new one is queued after it
+        self._search_worker.cancel()
+        self._tree_results.clear()
+        self._search_id += 1
+        self._searchStarted.emit(
+            self._search_id, nproject.path, filters, to_find, True)
 
     def showEvent(self, event):
         self._actions._line_search.setFocus()
@@ -263,10 +305,10 @@ class SearchResultDelegate(QItemDelegate):
         padding = 4
         model = index.model()
         lineno = model.data(index, Qt.UserRole)
-        if lineno < 1:
+        if lineno < 0:
             return 0
         is_selected = option.state & QStyle.State_Selected
-        lineno_text = str(lineno)
+        lineno_text = str(lineno + 1)
         font_width = painter.fontMetrics().width(lineno_text)
         lineno_width = padding + font_width + padding
         lineno_rect = QRect(rect)
@@ -296,25 +338,26 @@ class SearchResultModel(QAbstractItemModel):
         super().__init__()
         self.root_item = TreeItem(None)
 
-    def add_result(self, result):
-        file_path = result[0]
-        items = result[1]
-        if items:
+    def add_results(self, results):
+        """Append a batch of (file_path, lines) with a single insert"""
+        results = [result for result in results if result[1]]
+        if not results:
+            return
+        first = self.root_item.child_count()
+        self.beginInsertRows(
+            QModelIndex(), first, first + len(results) - 1)
+        for file_path, lines in results:
             parent = ResultItem()
             parent.file_path = file_path
             parent_item = TreeItem(parent, self.root_item)
-            self.beginInsertRows(QModelIndex(), 0, 0)
             self.root_item.append_child(parent_item)
-            self.endInsertRows()
-            for item in items:
+            for lineno, text in lines:
                 io = ResultItem()
                 io.parent = parent
-                io.lineno = item[0]
-                io.text = item[1]
-                item_tree = TreeItem(io, parent_item)
-                self.beginInsertRows(QModelIndex(), 0, 0)
-                parent_item.append_child(item_tree)
-                self.endInsertRows()
+                io.lineno = lineno
+                io.text = text
+                parent_item.append_child(TreeItem(io, parent_item))
+        self.endInsertRows()
 
     def parent(self, index=QModelIndex()):
         if not index.isValid():
@@ -17,9 +17,12 @@
 
 import sys
 import re
+import codecs
+from collections import deque
 
 from PyQt5.QtWidgets import (
     QPlainTextEdit,
+    QTextEdit,
     QLabel,
     QLineEdit,
     QVBoxLayout,
@@ -60,6 +63,9 @@ logger = NinjaLogger(__name__)
 
 
 class RunProcess(QObject):
+    """Run the pre execution script, the program and the post execution
+    script. The output is decoded incrementally (a character can be split
+    between two reads) and sent in chunks, not line by line"""
 
     stdoutAvailable = pyqtSignal("QString")
     errorAvailable = pyqtSignal("QString")
@@ -84,6 +90,7 @@ class RunProcess(QObject):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._current_process = None
+        self._reset_decoders()
         # Process for execute script before project
         self._pre_exec_process = QProcess(self)
         self._pre_exec_process.started.connect(
@@ -133,6 +140,7 @@ class RunProcess(QObject):
         else:
             message = "Execution Interrupted! '{}'".format(self.program)
             frmt = 'error'
+        self._flush_decoders()
         self.processFinished.emit(self.__add_current_time(message), frmt)
         logger.debug('Process finished with {}, {}'.format(code, status))
 
@@ -144,19 +152,37 @@ class RunProcess(QObject):
 
     @pyqtSlot()
     def _on_process_started(self):
+        self._reset_decoders()
         message = self.__add_current_time("Running: " + self.program)
         self.processStarted.emit(message)
 
+    def _reset_decoders(self):
+        decoder = codecs.getincrementaldecoder('utf-8')
+        self._stdout_decoder = decoder('replace')
+        self._stderr_decoder = decoder('replace')
+
+    def _flush_decoders(self):
+        """Send the end of an incomplete character, if any"""
+        output = self._stdout_decoder.decode(b'', final=True)
+        if output:
+            self.stdoutAvailable.emit(output)
+        error = self._stderr_decoder.decode(b'', final=True)
+        if error:
+            self.errorAvailable.emit(error)
+
     @pyqtSlot()
     def _error_available(self):
-        output = self._current_process.readAllStandardError().data().decode()
-        for line_text in output.splitlines():
-            self.errorAvailable.emit(line_text)
+        data = self._current_process.readAllStandardError().data()
+        error = self._stderr_decoder.decode(data)
+        if error:
+            self.errorAvailable.emit(error)
 
     @pyqtSlot()
     def _result_available(self):
-        output = self._current_process.readAllStandardOutput().data().decode()
-        self.stdoutAvailable.emit(output.strip())
+        data = self._current_process.readAllStandardOutput().data()
+        output = self._stdout_decoder.decode(data)
+        if output:
+            self.stdoutAvailable.emit(output)
 
     def start_process(self, filename, python_exec, pre_exec_script,
                       post_exec_script, program_params):
@@ -330,11 +356,7 @@ class RunWidget(QWidget):
 
     @pyqtSlot('QString')
     def _on_error_available(self, error_msg):
-        if self.output.patLink.match(error_msg):
-            frmt = 'error2'
-        else:
-            frmt = 'error'
-        self.output.append_text(error_msg, text_format=frmt)
+        self.output.append_output(error_msg, text_format='error')
         self.input.hide()
         self.label_input.hide()
 
@@ -350,7 +372,7 @@ class RunWidget(QWidget):
 
     @pyqtSlot('QString')
     def _on_stdout_available(self, data):
-        self.output.append_text(data, text_format='plain')
+        self.output.append_output(data, text_format='plain')
 
     def display_name(self):
         return 'Output'
@@ -368,7 +390,7 @@ class RunWidget(QWidget):
 
         data = self.input.text()
         self._process.write(data.encode())
-        self.output.append_message(data)
+        self.output.append_output(data + '\n', text_format='plain')
         self.input.clear()
 
     def set_font(self, font):
@@ -571,7 +593,15 @@ class RunWidget(QWidget):
 
 class OutputWidget(QPlainTextEdit):
 
-    """Widget to handle the output of the running process"""
+    """Widget to handle the output of the running process.
+
+    The text received is queued and appended in bulk at most FRAME_RATE
+    times per second. Only the last MAX_LINES lines are kept, in the queue
+    and in the document. The links of the tracebacks are found when the
+    mouse is over them."""
+
+    MAX_LINES = 10000
+    FRAME_RATE = 30
 
     def __init__(self, parent):
         super(OutputWidget, self).__init__(parent)
@@ -582,6 +612,17 @@ class OutputWidget(QPlainTextEdit):
         self.setMouseTracking(True)
         self.setFrameShape(0)
         self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(self.MAX_LINES)
+        # [text_format, text] not appended yet, and their line count
+        self._pending = deque()
+        self._pending_lines = 0
+        self._at_line_start = True
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(1000 // self.FRAME_RATE)
+        self._flush_timer.timeout.connect(self.flush)
+        # Block of the link under the mouse
+        self._link_block = None
         # Traceback pattern
         self.patLink = re.compile(r'(\s)*File "(.*?)", line \d.+')
 
@@ -608,9 +649,6 @@ class OutputWidget(QPlainTextEdit):
             'error2': error_format2
         }
 
-        self.blockCountChanged[int].connect(
-            lambda: self.moveCursor(QTextCursor.End))
-
         # Style
         palette = self.palette()
         palette.setColor(
@@ -626,15 +664,37 @@ class OutputWidget(QPlainTextEdit):
         self.go_to_error(event)
 
     def mouseMoveEvent(self, event):
-        cursor = self.cursorForPosition(event.pos())
-        text = cursor.block().text()
-        if text:
-            if self.patLink.match(text):
-                self.viewport().setCursor(Qt.PointingHandCursor)
-            else:
-                self.viewport().setCursor(Qt.IBeamCursor)
+        block = self.cursorForPosition(event.pos()).block()
+        if self.patLink.match(block.text()):
+            self._highlight_link(block)
+        else:
+            self._highlight_link(None)
         QPlainTextEdit.mouseMoveEvent(self, event)
 
+    def leaveEvent(self, event):
+        self._highlight_link(None)
+        QPlainTextEdit.leaveEvent(self, event)
+
+    def _highlight_link(self, block):
+        """Underline the traceback line of block (None to clear it)"""
+        if block == self._link_block:
+            return
+        self._link_block = block
+        selections = []
+        if block is None:
+            self.viewport().setCursor(Qt.IBeamCursor)
+            self.viewport().setToolTip('')
+        else:
+            self.viewport().setCursor(Qt.PointingHandCursor)
+            self.viewport().setToolTip('Click to show the source')
+            selection = QTextEdit.ExtraSelection()
+            selection.format = self._text_formats['error2']
+            selection.cursor = QTextCursor(block)
+            selection.cursor.movePosition(
+                QTextCursor.EndOfBlock, QTextCursor.KeepAnchor)
+            selections.append(selection)
+        self.setExtraSelections(selections)
+
     def go_to_error(self, event):
         """Resolve the link and take the user to the error line."""
         cursor = self.cursorForPosition(event.pos())
@@ -674,6 +734,60 @@ class OutputWidget(QPlainTextEdit):
     #    popup_menu.exec_(event.globalPos())
 
     def append_text(self, text, text_format="normal"):
-        cursor = self.textCursor()
-        cursor.insertText(text, self._text_formats[text_format])
-        cursor.insertBlock()
+        """Append a message in its own line"""
+        if not self._at_line_start:
+            text = '\n' + text
+        self.append_output(text + '\n', text_format)
+
+    def append_output(self, text, text_format="plain"):
+        """Append text as it is, it will be displayed with the next
+        frame"""
+        if not text:
+            return
+        lines = text.count('\n')
+        if self._pending and self._pending[-1][0] == text_format:
+            self._pending[-1][1] += text
+        else:
+            self._pending.append([text_format, text])
+        self._pending_lines += lines
+        self._at_line_start = text.endswith('\n')
+        # Drop the oldest lines, they wouldn't be kept in the document
+        excess = self._pending_lines - self.MAX_LINES
+        while excess > 0:
+            first = self._pending[0]
+            lines = first[1].count('\n')
+            if lines <= excess and len(self._pending) > 1:
+                self._pending.popleft()
+            else:
+                lines = min(lines, excess)
+                first[1] = first[1].split('\n', lines)[-1]
+            self._pending_lines -= lines
+            excess -= lines
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """Append the text received since the last frame"""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() == scrollbar.maximum()
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        while self._pending:
+            text_format, text = self._pending.popleft()
+            cursor.insertText(text, self._text_formats[text_format])
+        cursor.endEditBlock()
+        self._pending_lines = 0
+        self._link_block = None
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def clear(self):
+        self._pending.clear()
+        self._pending_lines = 0
+        self._at_line_start = True
+        self._link_block = None
+        super().clear()
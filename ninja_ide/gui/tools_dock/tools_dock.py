@@ -192,13 +192,13 @@ class _ToolsDock(ui_tools.StyledBar):
         main_layout.addWidget(self._stack)
 
         # Widgets
-        # errors_tree = IDE.get_service('errors_tree')
+        errors_tree = IDE.get_service('errors_tree')
         from ninja_ide.gui.tools_dock import find_in_files
         self.widgets = [
             self._run_widget,
             console_widget.ConsoleWidget(),
             find_in_files.FindInFilesWidget(),
-            # errors_tree
+            errors_tree
         ]
         # Install widgets
         number = 1
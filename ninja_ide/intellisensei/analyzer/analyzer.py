@@ -24,6 +24,7 @@ import ast
 import _ast
 
 from ninja_ide.tools.logger import NinjaLogger
+from ninja_ide.tools import parse_cache
 from ninja_ide.intellisensei.analyzer import model
 
 
@@ -60,7 +61,7 @@ class Analyzer(object):
         """Try to parse the module and fix some errors if it has some."""
         astModule = None
         try:
-            astModule = ast.parse(source)
+            astModule = parse_cache.parse(source)
             self._fixed_line = -1
         except SyntaxError as reason:
             line = reason.lineno - 1
@@ -14,57 +14,188 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Code completion with jedi, executed in its own thread.
+
+All the editors share one CodeCompletion (jedi is not thread safe):
+    - the path of the file is sent to jedi, so its parser cache is
+      updated with the diff parser instead of parsing the whole source
+    - only the last request is answered, the ones queued before it are
+      skipped and the results of the one running are dropped
+    - the docstrings are computed only for the highlighted proposal
+    - between the requests, the files opened are analyzed in advance
+      (the visible ones first): jedi resolves their imports and keeps
+      the modules parsed, the files not modified since they were
+      analyzed (same source hash) are skipped. The hashes are kept only
+      for this process: what the analysis warms is in jedi's memory
+"""
+
 import sys
 import os
+import heapq
+import hashlib
+import itertools
 from PyQt5.QtCore import (
     QObject,
-    pyqtSignal
+    QThread,
+    QTimer,
+    pyqtSignal,
+    pyqtSlot
 )
+from ninja_ide.gui.ide import IDE
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from ninja_ide.intellisensei import jedi
 sys.path.pop(0)
 jedi.settings.case_insensitive_completion = False
 
+# Priorities of the files analyzed in advance
+VISIBLE = 0
+OPENED = 1
+
+_code_completion = None
+
+
+def get_code_completion():
+    """Return the CodeCompletion, running in its thread since the first
+    call."""
+    global _code_completion
+    if _code_completion is None:
+        thread = QThread()
+        _code_completion = CodeCompletion()
+        _code_completion.moveToThread(thread)
+        _code_completion._thread = thread
+        thread.start()
+        ninjaide = IDE.get_service('ide')
+        if ninjaide is not None:
+            ninjaide.goingDown.connect(_code_completion.stop)
+    return _code_completion
+
 
 class CodeCompletion(QObject):
 
-    completionsReady = pyqtSignal('PyQt_PyObject')
+    # (request_id, [{'type', 'name', 'index'}])
+    completionsReady = pyqtSignal(int, 'PyQt_PyObject')
+    # (request_id, index, description)
+    docstringReady = pyqtSignal(int, int, 'QString')
 
     def __init__(self):
         QObject.__init__(self)
         self.__proposals = []
+        self._completions = []
+        self._docstrings = {}
+        # Only written from the GUI thread
+        self._last_request = 0
+        # Heap of (priority, order, path) of the files to analyze
+        self._jobs = []
+        self._job_order = itertools.count()
+        # {path: priority} of the jobs waiting
+        self._queued = {}
+        # {path: source hash} of the files analyzed
+        self._analyzed = {}
+        self._jobs_running = False
 
     @property
     def proposals(self):
         return self.__proposals
 
-    def prepare(self, source, line, offset):
-        self._source = source
-        self._lineno = line
-        self._offset = offset
+    def request(self):
+        """Return the id of a new request, the older ones are cancelled.
+        Called from the GUI thread."""
+        self._last_request += 1
+        return self._last_request
 
-    def clean_up(self):
-        self.__proposals.clear()
-        self._source = None
-        self._lineno = None
-        self._offset = None
+    def cancel(self, request_id=None):
+        """Drop the results of request_id, if it's still the last one (of
+        any request pending or running if request_id is None)"""
+        if request_id is None or request_id == self._last_request:
+            self._last_request += 1
 
-    def collect_completions(self):
+    @pyqtSlot(int, 'QString', int, int, 'QString')
+    def collect_completions(self, request_id, source, lineno, offset, path):
+        if request_id != self._last_request:
+            # A newer request is waiting
+            return
         try:
-            script = jedi.Script(self._source, self._lineno + 1, self._offset)
+            script = jedi.Script(source, lineno + 1, offset, path=path or None)
             completions = script.completions()
-        except jedi.NotFoundError:
+        except (jedi.NotFoundError, ValueError):
             completions = []
-        for completion in completions:
-            self.__proposals.append({
-                'type': completion.type,
-                'name': completion.name,
-                'desc': ' '.join(completion.docstring().split()[:3])
-                # 'docstring': completion.docstring().split('\n')
-            })
-        self.completionsReady.emit(self.__proposals)
-
-    def get_definition(self):
-        script = jedi.Script(self._source, self._lineno + 1, self._offset)
-        defs = script.goto_definitions()
-        print(defs)
+        if request_id != self._last_request:
+            return
+        self._completions = completions
+        self._docstrings = {}
+        self.__proposals = [
+            {'type': completion.type, 'name': completion.name, 'index': i}
+            for i, completion in enumerate(completions)]
+        self.completionsReady.emit(request_id, self.__proposals)
+
+    @pyqtSlot(int, int)
+    def collect_docstring(self, request_id, index):
+        """Emit docstringReady with the description of a proposal of the
+        last completions."""
+        if request_id != self._last_request or \
+                index >= len(self._completions):
+            return
+        desc = self._docstrings.get(index)
+        if desc is None:
+            docstring = self._completions[index].docstring()
+            desc = self._docstrings[index] = ' '.join(docstring.split()[:3])
+        self.docstringReady.emit(request_id, index, desc)
+
+    @pyqtSlot('QString', int)
+    def schedule(self, path, priority):
+        """Analyze path when there are no requests waiting, the jobs with
+        the lowest priority value go first"""
+        if self._queued.get(path, priority + 1) <= priority:
+            return
+        self._queued[path] = priority
+        heapq.heappush(self._jobs, (priority, next(self._job_order), path))
+        if not self._jobs_running:
+            self._jobs_running = True
+            # The completion requests queued meanwhile are answered first
+            QTimer.singleShot(0, self._run_next_job)
+
+    def _run_next_job(self):
+        while self._jobs:
+            priority, _, path = heapq.heappop(self._jobs)
+            # The entries replaced by one with a higher priority are left
+            # in the heap
+            if self._queued.get(path) == priority:
+                del self._queued[path]
+                self.analyze(path)
+                break
+        if self._jobs:
+            QTimer.singleShot(0, self._run_next_job)
+        else:
+            self._jobs_running = False
+
+    def analyze(self, path):
+        """Parse path and resolve its imports, unless it wasn't modified
+        since the last time. Returns True if it was analyzed."""
+        try:
+            with open(path, 'rb') as f:
+                source = f.read()
+        except (IOError, OSError):
+            return False
+        digest = hashlib.sha1(source).hexdigest()
+        if self._analyzed.get(path) == digest:
+            return False
+        try:
+            for definition in jedi.names(source, path=path):
+                if definition.type == 'module':
+                    # Loads the module in the parser cache of jedi
+                    definition.goto_assignments()
+        except Exception:
+            # Whatever jedi can't handle, it is analyzed again on request
+            return False
+        self._analyzed[path] = digest
+        return True
+
+    def get_definition(self, source, lineno, offset, path=None):
+        script = jedi.Script(source, lineno + 1, offset, path=path)
+        return script.goto_definitions()
+
+    def stop(self):
+        self.cancel()
+        self._thread.quit()
+        self._thread.wait()
@@ -26,9 +26,10 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import (
-    QThread,
     QSize,
-    Qt
+    Qt,
+    pyqtSignal,
+    pyqtSlot
 )
 from ninja_ide.intellisensei.completion import code_completion
 from ninja_ide.intellisensei.completion import completion_delegate
@@ -37,17 +38,23 @@ from ninja_ide.tools.ui_tools import colored_icon
 
 class CodeCompletionWidget(QFrame):
 
+    _completionRequested = pyqtSignal(int, 'QString', int, int, 'QString')
+    _docstringRequested = pyqtSignal(int, int)
+    _analysisRequested = pyqtSignal('QString', int)
+
     def __init__(self, neditor):
         super().__init__(None, Qt.FramelessWindowHint | Qt.ToolTip)
         self._neditor = neditor
-        # Code completion worker
-        self._cc_worker = QThread()
-        self._cc = code_completion.CodeCompletion()
-        self._cc.moveToThread(self._cc_worker)
+        # Code completion worker, shared by all the editors
+        self._cc = code_completion.get_code_completion()
+        self._request_id = 0
+        self._proposals = []
         box = QVBoxLayout(self)
         box.setContentsMargins(0, 0, 0, 0)
         self._completion_list = QListWidget()
         self._completion_list.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self._completion_list.currentItemChanged.connect(
+            self._on_current_item_changed)
         delegate = completion_delegate.CompletionDelegate()
         # self._completion_list.setItemDelegate(delegate)
         box.addWidget(self._completion_list)
@@ -70,23 +77,57 @@ class CodeCompletionWidget(QFrame):
         self.__desktop = QApplication.instance().desktop()
         # Connections
         self._neditor.post_key_press.connect(self.process_key_event)
-        self._cc_worker.started.connect(self._cc.collect_completions)
+        self._completionRequested.connect(self._cc.collect_completions)
+        self._docstringRequested.connect(self._cc.collect_docstring)
         self._cc.completionsReady.connect(self.__show_completions)
-
-    def __show_completions(self, completions):
+        self._cc.docstringReady.connect(self._on_docstring_ready)
+        self._analysisRequested.connect(self._cc.schedule)
+        self._neditor.editorFocusObtained.connect(self._on_editor_focused)
+        self._request_analysis(code_completion.OPENED)
+
+    def _request_analysis(self, priority):
+        if self._neditor.file_path:
+            self._analysisRequested.emit(self._neditor.file_path, priority)
+
+    def _on_editor_focused(self):
+        self._request_analysis(code_completion.VISIBLE)
+
+    @pyqtSlot(int, 'PyQt_PyObject')
+    def __show_completions(self, request_id, completions):
+        if request_id != self._request_id:
+            # Requested by another editor or cancelled
+            return
+        self._proposals = completions
         self._add_proposals(completions)
         self.set_geometry()
         self.show()
 
+    def _on_current_item_changed(self, item, previous):
+        if item is not None and item.data(Qt.UserRole + 1) is None:
+            # The description is computed only for the highlighted item
+            self._docstringRequested.emit(
+                self._request_id, item.data(Qt.UserRole))
+
+    @pyqtSlot(int, int, 'QString')
+    def _on_docstring_ready(self, request_id, index, desc):
+        if request_id != self._request_id:
+            return
+        for row in range(self._completion_list.count()):
+            item = self._completion_list.item(row)
+            if item.data(Qt.UserRole) == index:
+                item.setData(Qt.UserRole + 1, desc)
+                item.setToolTip(desc)
+                break
+
     def _add_proposals(self, proposals):
         self._completion_list.clear()
 
         for proposal in proposals:
             item = QListWidgetItem()
             item.setText(proposal['name'])
-            item.setIcon(QIcon(self._icons[proposal['type']]))
+            item.setIcon(QIcon(self._icons.get(proposal['type'], '')))
+            item.setData(Qt.UserRole, proposal['index'])
             # item.setData(Qt.DisplayRole, proposal['name'])
-            # item.setData(Qt.UserRole + 1, proposal['desc'])
             # item.setData(Qt.DecorationRole, self._icons.get(proposal['type']))
             self._completion_list.addItem(item)
         self._completion_list.setCurrentRow(0)
@@ -137,7 +178,7 @@ class CodeCompletionWidget(QFrame):
             if self.__prefix is None:
                 return
             proposals = []
-            for completion in self._cc.proposals:
+            for completion in self._proposals:
                 name = completion['name']
                 len_prefix = len(self.__prefix)
                 if name[:len_prefix] == self.__prefix:
@@ -159,21 +200,23 @@ class CodeCompletionWidget(QFrame):
         self.hide_completer()
 
     def complete(self):
-        self._cc.clean_up()
+        self._proposals = []
         # Get data from editor
         source = self._neditor.text
         lineno, offset = self._neditor.cursor_position
         self.__prefix = self._neditor._text_under_cursor()
-        # Prepare the worker and run thread
-        self._cc.prepare(source, lineno, offset)
-        self._cc_worker.start()
+        # The requests still waiting in the worker are skipped
+        self._request_id = self._cc.request()
+        self._completionRequested.emit(
+            self._request_id, source, lineno, offset,
+            self._neditor.file_path or '')
 
     def hide_completer(self):
         self.hide()
-        # Stop thread
         self.__prefix = ''
-        self._cc_worker.quit()
-        self._cc_worker.wait(10)
+        # Drop the results of the request running, if any, unless another
+        # editor requested completions since
+        self._cc.cancel(self._request_id)
 
     def previous_item(self):
         new_row = self._completion_list.currentRow() - 1
@@ -391,7 +391,13 @@ class BaseDefinition(object):
             return ''
 
         path = self._name.get_root_context().py__file__()
-        lines = parser_cache[path].lines
+        try:
+            lines = parser_cache[path].lines
+        except KeyError:
+            # Dropped from the cache since it was parsed
+            with open(path, 'rb') as f:
+                lines = common.splitlines(
+                    common.source_to_unicode(f.read()), keepends=True)
 
         line_nr = self._name.start_pos[0]
         start_line_nr = line_nr - before
@@ -7,6 +7,7 @@ import shutil
 import pickle
 import platform
 import errno
+from collections import OrderedDict
 
 from jedi import settings
 from jedi import debug
@@ -40,8 +41,62 @@ we generate something similar.  See:
 http://docs.python.org/3/library/sys.html#sys.implementation
 """
 
+
+class _ParserCache(OrderedDict):
+    """
+    Modules parsed by path. The least recently used ones are dropped when
+    there are more than ``settings.parser_cache_size`` or their sources
+    add up to more than ``settings.parser_cache_max_chars``.
+    """
+    def __init__(self):
+        OrderedDict.__init__(self)
+        self._sizes = {}
+        self.chars = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getitem__(self, path):
+        try:
+            item = OrderedDict.__getitem__(self, path)
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        self.move_to_end(path)
+        return item
+
+    def __setitem__(self, path, item):
+        if path in self:
+            del self[path]
+        OrderedDict.__setitem__(self, path, item)
+        size = sum(len(line) for line in item.lines)
+        self._sizes[path] = size
+        self.chars += size
+        while len(self) > 1 and (len(self) > settings.parser_cache_size or
+                                 self.chars > settings.parser_cache_max_chars):
+            del self[next(iter(self))]
+            self.evictions += 1
+
+    def __delitem__(self, path):
+        OrderedDict.__delitem__(self, path)
+        self.chars -= self._sizes.pop(path)
+
+    def clear(self):
+        OrderedDict.clear(self)
+        self._sizes.clear()
+        self.chars = 0
+
+
 # for fast_parser, should not be deleted
-parser_cache = {}
+parser_cache = _ParserCache()
+
+_disk_loads = 0
+_last_removal = None
+_REMOVAL_INTERVAL = 60 * 60
+# The pickles loaded are touched at most this often, they are removed by
+# the time they were last used
+_TOUCH_INTERVAL = 24 * 60 * 60
 
 
 
@@ -79,7 +134,8 @@ def _load_from_file_system(grammar, path, p_time):
     cache_path = _get_hashed_path(grammar, path)
     try:
         try:
-            if p_time > os.path.getmtime(cache_path):
+            mtime = os.path.getmtime(cache_path)
+            if p_time > mtime:
                 # Cache is outdated
                 return None
         except OSError as e:
@@ -98,8 +154,15 @@ def _load_from_file_system(grammar, path, p_time):
     except FileNotFoundError:
         return None
     else:
+        global _disk_loads
+        _disk_loads += 1
         parser_cache[path] = module_cache_item
         debug.dbg('pickle loaded: %s', path)
+        if time.time() - mtime > _TOUCH_INTERVAL:
+            try:
+                os.utime(cache_path)
+            except OSError:
+                pass
         return module_cache_item.node
 
 
@@ -117,16 +180,69 @@ def save_module(grammar, path, module, lines, pickling=True):
 
 
 def _save_to_file_system(grammar, path, item):
+    global _last_removal
     with open(_get_hashed_path(grammar, path), 'wb') as f:
         pickle.dump(item, f, pickle.HIGHEST_PROTOCOL)
+    if _last_removal is None or \
+            time.time() - _last_removal > _REMOVAL_INTERVAL:
+        _last_removal = time.time()
+        remove_old_modules()
+
+
+def _pickled_modules():
+    """
+    Returns a list of (mtime, size, path) of the modules pickled for this
+    version of Python.
+    """
+    modules = []
+    directory = _get_cache_directory_path()
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        modules.append((stat.st_mtime, stat.st_size, path))
+    return modules
+
+
+def remove_old_modules():
+    """
+    Removes the pickled modules not saved or loaded in
+    ``settings.cache_max_age`` seconds, and the oldest ones while they take
+    more than ``settings.cache_max_size`` bytes.
+    """
+    modules = sorted(_pickled_modules())
+    total_size = sum(size for _, size, _ in modules)
+    limit = time.time() - settings.cache_max_age
+    for mtime, size, path in modules:
+        if mtime >= limit and total_size <= settings.cache_max_size:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_size -= size
 
 
-def remove_old_modules(self):
+def get_statistics():
     """
-    # TODO Might want to use such a function to clean up the cache (if it's
-    # too old). We could potentially also scan for old files in the
-    # directory and delete those.
+    Returns a dict with the use of the parser cache: ``hits``, ``misses``
+    and ``evictions`` of the modules in memory, the ``modules`` kept and
+    the ``chars`` of their sources, the modules loaded from the disk
+    (``disk_loads``) and the ``disk_files`` and ``disk_bytes`` pickled.
     """
+    modules = _pickled_modules() if settings.use_filesystem_cache else []
+    return {
+        'hits': parser_cache.hits,
+        'misses': parser_cache.misses,
+        'evictions': parser_cache.evictions,
+        'modules': len(parser_cache),
+        'chars': parser_cache.chars,
+        'disk_loads': _disk_loads,
+        'disk_files': len(modules),
+        'disk_bytes': sum(size for _, size, _ in modules),
+    }
 
 
 def clear_cache(self):
@@ -123,6 +123,33 @@ On Linux, if environment variable ``$XDG_CACHE_HOME`` is set,
 ``$XDG_CACHE_HOME/jedi`` is used instead of the default one.
 """
 
+cache_max_size = 200 * 1024 * 1024
+"""
+Size in bytes of the modules pickled in :data:`cache_directory` (for this
+version of Python). The oldest ones are removed when it's exceeded.
+"""
+
+cache_max_age = 30 * 24 * 60 * 60
+"""
+Seconds before a pickled module that was not saved again is removed.
+"""
+
+# ----------------
+# Memory cache
+# ----------------
+
+parser_cache_size = 300
+"""
+Maximum number of parsed modules kept in memory, the least recently used
+ones are dropped first.
+"""
+
+parser_cache_max_chars = 32 * 1024 * 1024
+"""
+Maximum size (in characters of their source) of the parsed modules kept in
+memory.
+"""
+
 # ----------------
 # parser
 # ----------------
@@ -25,6 +25,7 @@ import sys
 from PyQt5.QtGui import QKeySequence
 from PyQt5.QtCore import (
     QDir,
+    QResource,
     QSettings,
     Qt
 )
@@ -83,8 +84,12 @@ LOG_FILE_PATH = os.path.join(HOME_NINJA_PATH, 'ninja_ide.log')
 
 GET_SYSTEM_PATH = os.path.join(PRJ_PATH, 'tools', 'get_system_path.py')
 
+CONSOLE_KERNEL = os.path.join(PRJ_PATH, 'tools', 'console_kernel.py')
+
 QML_FILES = os.path.join(PRJ_PATH, "gui", "qml")
 
+RESOURCES_FILE = os.path.join(PRJ_PATH, "nresources.rcc")
+
 ###############################################################################
 # URLS
 ###############################################################################
@@ -342,6 +347,15 @@ CUSTOM_SHORTCUTS = {}
 ###############################################################################
 
 
+def load_resources():
+    """
+    Register the images of the IDE from the binary resources file, the
+    generated nresources module is only imported if it is missing
+    """
+    if not QResource.registerResource(RESOURCES_FILE):
+        from ninja_ide import nresources  # lint:ok
+
+
 def load_shortcuts():
     """
     Loads the shortcuts from QSettings
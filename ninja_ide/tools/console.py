@@ -14,94 +14,162 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Client of the interpreter of the console.
+
+The code is executed by tools/console_kernel.py in its own process, so
+a long computation (or a big output) doesn't block the IDE. See that
+file for the messages exchanged."""
+
 from __future__ import absolute_import
 
+import os
 import sys
-from code import InteractiveConsole
-
-
-class Cache(object):
-    """Replace stdout and stderr behavior in order to collect outputs."""
-
-    def __init__(self):
-        self.reset()
-
-    def reset(self):
-        """Clean the cache."""
-        self.out = []
-
-    def write(self, line):
-        """Collect the output into cache to be accesed later."""
-        self.out.append(line)
-
-    def flush(self):
-        """Join together all the outputs and return it to be displayed."""
-        output = ''.join(self.out)[:-1]
-        self.reset()
-        return output
-
-
-class ExitWrapper(object):
-    """Wrap the built-in function exit in the interpreter."""
-
-    def __call__(self, code=None):
-        return None
-
-    def __repr__(self):
-        return exit.__repr__()
-
-
-class HelpWrapper(object):
-    """Wrap the built-in function help in the interpreter."""
-
-    def __call__(self, *args, **kwds):
-        if args or kwds:
-            return help(*args, **kwds)
-
-    def __repr__(self):
-        return help.__repr__()
-
-
-class Console(InteractiveConsole):
-    """Work as a Python Console."""
-
-    def __init__(self):
-        # InteractiveConsole.__init__(self,
-        #                            locals={
-        #                                'exit': ExitWrapper(),
-        #                                'help': HelpWrapper()
-        #                            })
-        super().__init__()
-        self.stdout = sys.stdout
-        self.stderr = sys.stderr
-        self._cache = Cache()
-        self.output = ''
-
-    def get_output(self):
-        """Replace out and error channels with cache."""
-        sys.stdout = self._cache
-        sys.stderr = self._cache
-
-    def return_output(self):
-        """Reassign the proper values to output and error channel."""
-        sys.stdout = self.stdout
-        sys.stderr = self.stderr
-
-    def push(self, line):
-        """Insert a command into the console."""
-        self.get_output()
-        val = InteractiveConsole.push(self, line)
-        self.return_output()
-        self.output = self._cache.flush()
-        return val
-
-    def get_type(self, var):
-        """Get the type of a variable."""
-        type_line = "'.'.join([type(%s).__module__, type(%s).__name__])" % \
-            (var[:-1], var[:-1])
-        self.get_output()
-        InteractiveConsole.push(self, type_line)
-        self.return_output()
-        exec_line = self._cache.flush() + '.'
-        exec_line = exec_line.replace("'", "")
-        return exec_line
+import json
+import codecs
+import signal
+import struct
+
+from PyQt5.QtCore import (
+    QObject,
+    QProcess,
+    pyqtSignal,
+    pyqtSlot
+)
+
+from ninja_ide import resources
+from ninja_ide.tools.logger import NinjaLogger
+
+logger = NinjaLogger(__name__)
+
+HEADER = struct.Struct('>I')
+
+
+class ConsoleProcess(QObject):
+    """Start the interpreter on the first request and restart it when it
+    exits (ie: after exit() or a crash)."""
+
+    # (text, stream), stream is 'stdout' or 'stderr'
+    outputAvailable = pyqtSignal('QString', 'QString')
+    # True if the code is incomplete (more lines are expected)
+    executed = pyqtSignal(bool)
+    # (text, [match])
+    completionsFound = pyqtSignal('QString', 'PyQt_PyObject')
+    restarted = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._process = QProcess(self)
+        self._process.readyReadStandardOutput.connect(self._read_messages)
+        self._process.readyReadStandardError.connect(self._read_error)
+        self._process.finished.connect(self._on_finished)
+        self._buffer = bytearray()
+        self._error_decoder = None
+        # Lines sent and not executed yet
+        self._pending = 0
+        self._stopping = False
+
+    @property
+    def busy(self):
+        """True while some code is executed"""
+        return self._pending > 0
+
+    def is_running(self):
+        return self._process.state() != QProcess.NotRunning
+
+    def start(self):
+        if self.is_running():
+            return
+        self._buffer = bytearray()
+        self._error_decoder = codecs.getincrementaldecoder('utf-8')(
+            'replace')
+        self._process.start(sys.executable, [resources.CONSOLE_KERNEL])
+
+    def execute(self, source):
+        """Send a line of code, executed is emitted when it's done"""
+        self.start()
+        self._pending += 1
+        self._send(type='execute', source=source)
+
+    def complete(self, text):
+        """Ask the completions of text (ie: 'os.pa')"""
+        self.start()
+        self._send(type='complete', text=text)
+
+    def interrupt(self):
+        """Interrupt the code being executed"""
+        if not self.busy:
+            return
+        if os.name == 'nt':
+            # The process can't receive a SIGINT on Windows
+            self.restart()
+        else:
+            os.kill(self._process.processId(), signal.SIGINT)
+
+    def restart(self):
+        """Start a new interpreter, with an empty namespace"""
+        self.shutdown()
+        self.start()
+        self.restarted.emit()
+
+    def shutdown(self):
+        if not self.is_running():
+            return
+        self._stopping = True
+        self._process.kill()
+        self._process.waitForFinished()
+        self._stopping = False
+        self._finish_execution()
+
+    def _send(self, **message):
+        data = json.dumps(message).encode('utf-8')
+        self._process.write(HEADER.pack(len(data)) + data)
+
+    @pyqtSlot()
+    def _read_messages(self):
+        buffer = self._buffer
+        buffer += self._process.readAllStandardOutput().data()
+        offset = 0
+        while len(buffer) - offset >= HEADER.size:
+            size = HEADER.unpack_from(buffer, offset)[0]
+            end = offset + HEADER.size + size
+            if len(buffer) < end:
+                break
+            data = bytes(buffer[offset + HEADER.size:end])
+            offset = end
+            self._on_message(json.loads(data.decode('utf-8')))
+        # The messages read are dropped at once
+        del buffer[:offset]
+
+    def _on_message(self, message):
+        kind = message.get('type')
+        if kind == 'output':
+            self.outputAvailable.emit(message['text'], message['stream'])
+        elif kind == 'executed':
+            self._pending -= 1
+            self.executed.emit(message['more'])
+        elif kind == 'completions':
+            self.completionsFound.emit(message['text'], message['matches'])
+
+    @pyqtSlot()
+    def _read_error(self):
+        # The output of the processes started from the console
+        data = self._process.readAllStandardError().data()
+        text = self._error_decoder.decode(data)
+        if text:
+            self.outputAvailable.emit(text, 'stderr')
+
+    @pyqtSlot(int, QProcess.ExitStatus)
+    def _on_finished(self, code, status):
+        if self._stopping:
+            return
+        logger.debug('The console process finished with {}'.format(code))
+        self._read_messages()
+        self._finish_execution()
+        # ie: exit() was called, the next request starts it again
+        self.restarted.emit()
+
+    def _finish_execution(self):
+        if self._pending:
+            self._pending = 0
+            self.executed.emit(False)
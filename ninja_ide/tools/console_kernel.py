@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Python interpreter of the console, running in its own process.
+
+This file is executed by tools.console.ConsoleProcess with the python of
+the IDE, so it must only use the standard library. The messages in both
+directions are frames: the size of the content (4 bytes, big endian)
+followed by the content, a JSON object encoded in UTF-8.
+
+Requests:
+    {"type": "execute", "source": line}
+    {"type": "complete", "text": text}
+Replies:
+    {"type": "output", "stream": "stdout" | "stderr", "text": text}
+    {"type": "executed", "more": bool}
+    {"type": "completions", "text": text, "matches": [match, ...]}
+
+SIGINT interrupts the code being executed, it's ignored otherwise."""
+
+import io
+import os
+import sys
+import code
+import json
+import time
+import signal
+import struct
+import threading
+import rlcompleter
+
+HEADER = struct.Struct('>I')
+# The output is sent when this many characters are buffered, or
+# CHUNK_INTERVAL seconds after the oldest one was written
+CHUNK_SIZE = 8192
+CHUNK_INTERVAL = 0.05
+MAX_COMPLETIONS = 500
+
+
+class Channel(object):
+    """Read and write frames, a frame is never cut by an interrupt.
+
+    Frames can be sent from any thread."""
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._interrupted = False
+        self._lock = threading.Lock()
+
+    def send(self, **message):
+        data = json.dumps(message).encode('utf-8')
+        if threading.current_thread() is not threading.main_thread():
+            # The interrupts are only received by the main thread
+            self._write(data)
+            return
+        # An interrupt received meanwhile is handled after the frame
+        handler = signal.signal(signal.SIGINT, self._defer_interrupt)
+        try:
+            self._write(data)
+        finally:
+            signal.signal(signal.SIGINT, handler)
+        if self._interrupted:
+            self._interrupted = False
+            if callable(handler):
+                handler(signal.SIGINT, None)
+
+    def _write(self, data):
+        with self._lock:
+            self._writer.write(HEADER.pack(len(data)) + data)
+            self._writer.flush()
+
+    def _defer_interrupt(self, signum, frame):
+        self._interrupted = True
+
+    def receive(self):
+        """Return the next message, None if the IDE closed the channel"""
+        header = self._read(HEADER.size)
+        if header is None:
+            return None
+        data = self._read(HEADER.unpack(header)[0])
+        if data is None:
+            return None
+        return json.loads(data.decode('utf-8'))
+
+    def _read(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self._reader.read(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+
+class Output(object):
+    """Output of stdout and stderr, in the order it was written.
+
+    A thread sends the output buffered for CHUNK_INTERVAL seconds, even
+    if nothing else is written (ie: a print before a long loop)."""
+
+    def __init__(self, channel):
+        self._channel = channel
+        # [[stream, text]]
+        self._chunks = []
+        self._size = 0
+        self._first_write = 0
+        self._condition = threading.Condition()
+        flusher = threading.Thread(target=self._flush_buffered)
+        flusher.daemon = True
+        flusher.start()
+
+    def write(self, stream, text):
+        with self._condition:
+            if not self._chunks:
+                self._first_write = time.time()
+                self._condition.notify()
+            if self._chunks and self._chunks[-1][0] == stream:
+                self._chunks[-1][1] += text
+            else:
+                self._chunks.append([stream, text])
+            self._size += len(text)
+            if self._size >= CHUNK_SIZE:
+                self.flush()
+
+    def flush(self):
+        # Sent with the lock held to keep the order of the output
+        with self._condition:
+            chunks, self._chunks, self._size = self._chunks, [], 0
+            for stream, text in chunks:
+                self._channel.send(type='output', stream=stream, text=text)
+
+    def _flush_buffered(self):
+        with self._condition:
+            while True:
+                if not self._chunks:
+                    self._condition.wait()
+                    continue
+                delay = self._first_write + CHUNK_INTERVAL - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                else:
+                    self.flush()
+
+
+class OutputStream(io.TextIOBase):
+    """sys.stdout and sys.stderr of the interpreter"""
+
+    encoding = 'utf-8'
+
+    def __init__(self, output, stream):
+        super(OutputStream, self).__init__()
+        self._output = output
+        self._stream = stream
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        if not isinstance(text, str):
+            raise TypeError('write() argument must be str, not %s' %
+                            type(text).__name__)
+        if text:
+            self._output.write(self._stream, text)
+        return len(text)
+
+    def flush(self):
+        self._output.flush()
+
+
+class Kernel(code.InteractiveConsole):
+
+    def __init__(self, channel):
+        super(Kernel, self).__init__(
+            {'__name__': '__console__', '__doc__': None})
+        self._channel = channel
+        self._output = Output(channel)
+        self._completer = rlcompleter.Completer(self.locals)
+
+    def run(self):
+        sys.stdout = OutputStream(self._output, 'stdout')
+        sys.stderr = OutputStream(self._output, 'stderr')
+        # input() can't read from the channel
+        sys.stdin = io.StringIO()
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        handlers = {
+            'execute': self._execute,
+            'complete': self._complete
+        }
+        while True:
+            message = self._channel.receive()
+            if message is None:
+                break
+            handler = handlers.get(message.get('type'))
+            if handler is not None:
+                handler(message)
+
+    def showtraceback(self):
+        """Like the original one, without the frames of this module (ie:
+        interrupted while writing the output)"""
+        tb = sys.exc_info()[2]
+        while tb is not None and tb.tb_next is not None:
+            if tb.tb_next.tb_frame.f_globals is globals():
+                try:
+                    tb.tb_next = None
+                except (AttributeError, TypeError):
+                    # Read only before python 3.7
+                    pass
+                break
+            tb = tb.tb_next
+        super(Kernel, self).showtraceback()
+
+    def _execute(self, message):
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        try:
+            more = self.push(message['source'])
+        except KeyboardInterrupt:
+            # Out of the code of the user (ie: while compiling it)
+            self.resetbuffer()
+            self.write('\nKeyboardInterrupt\n')
+            more = False
+        finally:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+        self._output.flush()
+        self._channel.send(type='executed', more=more)
+
+    def _complete(self, message):
+        text = message['text']
+        matches = []
+        try:
+            while len(matches) < MAX_COMPLETIONS:
+                match = self._completer.complete(text, len(matches))
+                if match is None:
+                    break
+                matches.append(match)
+        except Exception:
+            pass
+        self._channel.send(type='completions', text=text, matches=matches)
+
+
+def main():
+    # The frames use the original stdin and stdout, the output of the
+    # processes started by the user goes to stderr
+    reader = os.fdopen(os.dup(0), 'rb')
+    writer = os.fdopen(os.dup(1), 'wb')
+    with open(os.devnull, 'rb') as devnull:
+        os.dup2(devnull.fileno(), 0)
+    os.dup2(2, 1)
+    # Like the interactive interpreter (not the folder of this file)
+    sys.path[0] = ''
+    Kernel(Channel(reader, writer)).run()
+
+
+if __name__ == '__main__':
+    main()
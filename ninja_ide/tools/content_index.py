@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Trigram index of the content of the project files.
+
+For each trigram (3 bytes substring of the lowercased content) the list
+of files containing it is stored. Before running a regex over the project
+the literals that any match must contain are extracted from it, and only
+the files having all their trigrams are searched.
+
+The files not indexed yet or modified since they were indexed are
+always searched, so the index can't hide results. Like file_search, the
+functions used by the workers must not import the GUI."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import re
+import sqlite3
+import hashlib
+import itertools
+from array import array
+from operator import itemgetter
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+from ninja_ide.tools import file_search
+
+# Files bigger than this are not indexed (they are always searched)
+MAX_FILE_SIZE = 4 * 1024 * 1024
+# Ids kept in memory before appending them to the postings
+MAX_PENDING_IDS = 1 << 20
+# Merge the chunks of the postings when this many were appended
+MAX_CHUNKS = 64
+# Compact the postings when this fraction of the ids belongs to files
+# removed or indexed again
+MAX_DEAD_RATIO = 0.25
+
+# Non ascii chars matching an ascii letter when the case is ignored
+# (ie: the KELVIN SIGN matches 'k'), indexed as that letter
+_ASCII_FOLDS = tuple((char.encode('utf-8'), letter) for char, letter in (
+    ('\u0130', b'i'), ('\u0131', b'i'), ('\u017f', b's'),
+    ('\u212a', b'k')))
+
+
+_NON_ASCII = re.compile('[^\x00-\x7f]+')
+
+
+def db_name(project_path):
+    """Name of the index database of a project (one per project)."""
+    digest = hashlib.sha1(project_path.encode('utf-8')).hexdigest()
+    return 'content_%s.db' % digest[:16]
+
+
+def file_stat(file_path):
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def trigrams(content):
+    """Return an array with the distinct trigrams of content (bytes),
+    each one packed in an integer."""
+    content = content.lower()
+    for char, letter in _ASCII_FOLDS:
+        if char in content:
+            content = content.replace(char, letter)
+    count = len(content) - 2
+    if count <= 0:
+        return array('I')
+    # Interleave the 3 shifted copies to build the integers in C
+    packed = bytearray(4 * count)
+    packed[0::4] = content[:-2]
+    packed[1::4] = content[1:-1]
+    packed[2::4] = content[2:]
+    return array('I', sorted(set(memoryview(packed).cast('I'))))
+
+
+def _literals(parsed, runs, current):
+    """Append to runs the literals that must be in every match of the
+    parsed pattern. Returns the run still being collected."""
+    for op, av in parsed:
+        if op == sre_constants.LITERAL:
+            current.append(chr(av))
+        elif op == sre_constants.SUBPATTERN:
+            # (?:...) and groups, av[-1] is the content in all versions
+            current = _literals(av[-1], runs, current)
+        elif op == sre_constants.AT:
+            # Zero width (^, $, \b), it doesn't break the literal
+            continue
+        else:
+            # Alternations, repetitions, classes, etc: keep the literals
+            # of the mandatory repetitions only and stop the run
+            runs.append(''.join(current))
+            current = []
+            if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) \
+                    and av[0] > 0:
+                runs.append(''.join(_literals(av[2], runs, [])))
+    return current
+
+
+def pattern_trigrams(pattern):
+    """Return the trigrams that any text matching the compiled regex
+    must contain (an empty set if nothing is known)."""
+    if not isinstance(pattern.pattern, str):
+        return set()
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return set()
+    runs = []
+    runs.append(''.join(_literals(parsed, runs, [])))
+    required = set()
+    for run in runs:
+        # The index is built with the bytes lowercased, only the ascii
+        # chars are lowercased the same way in the pattern
+        for part in _NON_ASCII.split(run):
+            required.update(trigrams(part.encode('ascii')))
+    return required
+
+
+def index_file(file_path):
+    """Return (file_path, stat, trigrams), trigrams is None when the
+    file is too big to be indexed."""
+    stat = file_stat(file_path)
+    if stat[1] > MAX_FILE_SIZE:
+        return file_path, stat, None
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    if file_search.is_binary(content):
+        # Never searched, an indexed file without trigrams
+        return file_path, stat, array('I')
+    return file_path, stat, trigrams(content)
+
+
+def index_files(file_paths):
+    """Job executed by the workers"""
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append(index_file(file_path))
+        except (IOError, OSError):
+            continue
+    return results
+
+
+class ContentIndex(object):
+    """Trigram index of a project stored in a sqlite database.
+
+    The postings (ids of the files containing a trigram) are stored as
+    blobs in chunks, each update appends a new chunk to the trigrams it
+    touches without reading the previous ones. A file indexed again
+    gets a new id. compact() merges the chunks and drops the ids of the
+    files that don't exist anymore.
+
+    It must be used from one thread at a time."""
+
+    def __init__(self, db_path):
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "create table if not exists files(id INTEGER PRIMARY KEY "
+            "AUTOINCREMENT, path text UNIQUE, mtime integer, "
+            "size integer, indexed integer)")
+        self._connection.execute(
+            "create table if not exists meta(key text PRIMARY KEY, "
+            "value integer)")
+        if self._connection.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' "
+                "AND name='postings'").fetchone() is not None:
+            # One blob for each trigram, rewritten on each update, the
+            # files are indexed again
+            self._connection.execute("DROP TABLE postings")
+            self._connection.execute("DELETE FROM files")
+            self._connection.execute("DELETE FROM meta")
+        self._connection.execute(
+            "create table if not exists chunks(trigram INTEGER, ids blob)")
+        self._connection.execute(
+            "create index if not exists chunks_trigram on chunks(trigram)")
+        self._connection.commit()
+        # {path: (id, mtime, size, indexed)} loaded on first use
+        self._files = None
+
+    def _load_files(self):
+        if self._files is None:
+            cur = self._connection.execute(
+                "SELECT path, id, mtime, size, indexed FROM files")
+            self._files = {row[0]: row[1:] for row in cur}
+        return self._files
+
+    def _posting(self, trigram):
+        posting = array('I')
+        for row in self._connection.execute(
+                "SELECT ids FROM chunks WHERE trigram=?", (trigram,)):
+            posting.frombytes(row[0])
+        return posting
+
+    def _files_with(self, required):
+        """Return the ids of the files containing all the trigrams."""
+        ids = None
+        for trigram in required:
+            found = set(self._posting(trigram))
+            ids = found if ids is None else ids & found
+            if not ids:
+                break
+        return ids
+
+    def candidates(self, file_paths, pattern):
+        """Return (candidates, stale): the files of file_paths that could
+        match pattern, and the ones that need to be indexed again."""
+        files = self._load_files()
+        required = pattern_trigrams(pattern)
+        ids = self._files_with(required) if required else None
+        candidates = []
+        stale = []
+        for file_path in file_paths:
+            row = files.get(file_path)
+            try:
+                stat = file_stat(file_path)
+            except OSError:
+                continue
+            if row is None or (row[1], row[2]) != stat:
+                stale.append(file_path)
+                candidates.append(file_path)
+            elif not row[3] or ids is None or row[0] in ids:
+                candidates.append(file_path)
+        return candidates, stale
+
+    def update(self, results):
+        """Store the (file_path, stat, trigrams) returned by index_file.
+
+        The results are consumed as they arrive and written each time
+        MAX_PENDING_IDS ids are pending."""
+        pending = []
+        pending_ids = 0
+        for result in results:
+            pending.append(result)
+            pending_ids += len(result[2] or ())
+            if pending_ids >= MAX_PENDING_IDS:
+                self._append(pending)
+                pending = []
+                pending_ids = 0
+        if pending:
+            self._append(pending)
+        self._compact_if_needed()
+
+    def _append(self, results):
+        """Add the files and a new chunk to the postings of their
+        trigrams, in the same transaction"""
+        files = self._load_files()
+        additions = {}
+        with self._connection:
+            for file_path, stat, file_trigrams in results:
+                self._remove(file_path)
+                indexed = int(file_trigrams is not None)
+                cur = self._connection.execute(
+                    "INSERT INTO files(path, mtime, size, indexed) "
+                    "values (?, ?, ?, ?)",
+                    (file_path, stat[0], stat[1], indexed))
+                file_id = cur.lastrowid
+                files[file_path] = (file_id, stat[0], stat[1], indexed)
+                for trigram in file_trigrams or ():
+                    additions.setdefault(trigram, array('I')).append(file_id)
+            self._connection.executemany(
+                "INSERT INTO chunks values (?, ?)",
+                ((trigram, ids.tobytes())
+                 for trigram, ids in additions.items()))
+            self._add_to_meta('chunks', 1)
+
+    def _add_to_meta(self, key, amount):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO meta values (?, "
+            "coalesce((SELECT value FROM meta WHERE key=?), 0) + ?)",
+            (key, key, amount))
+
+    def _remove(self, file_path):
+        self._load_files().pop(file_path, None)
+        cur = self._connection.execute(
+            "DELETE FROM files WHERE path=?", (file_path,))
+        if cur.rowcount:
+            # Its id stays in the postings until they are compacted
+            self._add_to_meta('dead', cur.rowcount)
+
+    def remove(self, file_paths):
+        with self._connection:
+            for file_path in file_paths:
+                self._remove(file_path)
+        self._compact_if_needed()
+
+    def prune(self, seen_paths):
+        """Remove the files not in seen_paths that don't exist anymore."""
+        removed = [path for path in list(self._load_files())
+                   if path not in seen_paths and not os.path.exists(path)]
+        self.remove(removed)
+        return removed
+
+    def _compact_if_needed(self):
+        cur = self._connection.execute(
+            "SELECT (SELECT value FROM meta WHERE key='dead'), "
+            "(SELECT value FROM meta WHERE key='chunks')")
+        dead, chunks = cur.fetchone()
+        alive = len(self._load_files())
+        if (dead and dead > max(alive, 1) * MAX_DEAD_RATIO) or \
+                (chunks or 0) > MAX_CHUNKS:
+            self.compact()
+
+    def compact(self):
+        """Merge the chunks of each trigram in one, without the ids of the
+        files removed."""
+        alive = {row[0] for row in self._load_files().values()}
+        with self._connection:
+            self._connection.execute("DROP TABLE IF EXISTS compacted")
+            self._connection.execute(
+                "CREATE TABLE compacted(trigram INTEGER, ids blob)")
+            rows = self._connection.execute(
+                "SELECT trigram, ids FROM chunks ORDER BY trigram")
+            for trigram, chunks in itertools.groupby(rows, itemgetter(0)):
+                posting = array('I')
+                for _, ids in chunks:
+                    posting.frombytes(ids)
+                posting = array('I', [i for i in posting if i in alive])
+                if posting:
+                    self._connection.execute(
+                        "INSERT INTO compacted values (?, ?)",
+                        (trigram, posting.tobytes()))
+            self._connection.execute("DROP TABLE chunks")
+            self._connection.execute(
+                "ALTER TABLE compacted RENAME TO chunks")
+            self._connection.execute(
+                "CREATE INDEX chunks_trigram on chunks(trigram)")
+            self._connection.execute(
+                "INSERT OR REPLACE INTO meta values ('dead', 0)")
+            self._connection.execute(
+                "INSERT OR REPLACE INTO meta values ('chunks', 0)")
+
+    def close(self):
+        self._connection.close()
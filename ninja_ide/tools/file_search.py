@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Search engine used by Find in Files.
+
+The files are searched in a pool of processes, each file is read in one
+call and the regex runs over the whole content. Like the locator indexer,
+this module is imported by the workers so it must not import the GUI."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import fnmatch
+from concurrent import futures
+
+# Directories of the version control systems, never searched
+VCS_DIRS = frozenset(('.git', '.hg', '.svn', '.bzr', '_darcs', 'CVS'))
+# Amount of bytes checked to decide if a file is binary
+BINARY_CHECK_SIZE = 8192
+# Number of files sent to a worker in each job
+CHUNK_SIZE = 16
+# Below this amount of files is cheaper to search them in this process
+PARALLEL_THRESHOLD = 48
+
+
+def iter_files(root, filters=None, recursive=True):
+    """Yield the path of the files inside root matching the filters
+    (a list of wildcards, ie: ['*.py']), skipping the VCS directories."""
+
+    pending = [root]
+    while pending:
+        folder = pending.pop()
+        try:
+            entries = sorted(os.scandir(folder), key=lambda e: e.name)
+        except OSError:
+            # Not readable
+            continue
+        folders = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                if recursive and entry.name not in VCS_DIRS:
+                    folders.append(entry.path)
+            elif not filters or any(fnmatch.fnmatch(entry.name, wildcard)
+                                    for wildcard in filters):
+                yield entry.path
+        # Keep the alphabetical order using the list as a stack
+        pending.extend(reversed(folders))
+
+
+def is_binary(content):
+    return b'\0' in content[:BINARY_CHECK_SIZE]
+
+
+def grep_file(file_path, pattern):
+    """Return a list of (lineno, line) for the lines matching the compiled
+    regex pattern, line numbers start at 0. Binary files return []"""
+
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    if not content or is_binary(content):
+        return []
+    text = content.decode('utf-8', 'replace')
+    lines = []
+    lineno = 0
+    counted = 0
+    match = pattern.search(text)
+    while match is not None:
+        start = text.rfind('\n', 0, match.start()) + 1
+        end = text.find('\n', match.start())
+        if end == -1:
+            end = len(text)
+        lineno += text.count('\n', counted, start)
+        counted = start
+        lines.append((lineno, text[start:end].rstrip('\r')))
+        # Only one result for each line
+        match = pattern.search(text, end + 1)
+    return lines
+
+
+def _grep_files(file_paths, pattern):
+    """Job executed by the workers"""
+
+    results = []
+    for file_path in file_paths:
+        try:
+            lines = grep_file(file_path, pattern)
+        except (IOError, OSError):
+            continue
+        if lines:
+            results.append((file_path, lines))
+    return results
+
+
+class FileSearch(object):
+    """Search the files of a folder spreading the work across processes.
+
+    search() is a generator returning (file_path, lines) for each file
+    with matches as soon as they are found. cancel() can be called from
+    another thread to stop it."""
+
+    def __init__(self, max_workers=None):
+        self._max_workers = max_workers
+        self._executor = None
+        self._pending = []
+        self._cancelled = False
+
+    def search(self, root, pattern, filters=None, recursive=True,
+               index=None):
+        """If a ContentIndex is received it's used to discard the files
+        that can't match, and it's updated when the search finishes."""
+        self._cancelled = False
+        file_paths = []
+        for file_path in iter_files(root, filters, recursive):
+            if self._cancelled:
+                return
+            file_paths.append(file_path)
+        stale = []
+        if index is not None:
+            seen_paths = set(file_paths)
+            file_paths, stale = index.candidates(file_paths, pattern)
+        for result in self._run(_grep_files, file_paths, pattern):
+            yield result
+        if stale and not self._cancelled:
+            from ninja_ide.tools.content_index import index_files
+            index.update(self._run(index_files, stale))
+            index.prune(seen_paths)
+
+    def _run(self, job, file_paths, *args):
+        """Run job over the chunks of file_paths, in the workers if there
+        are enough files. Yield the items of the lists returned."""
+        if len(file_paths) < PARALLEL_THRESHOLD or \
+                not self._start_executor():
+            for i in range(0, len(file_paths), CHUNK_SIZE):
+                if self._cancelled:
+                    return
+                for result in job(file_paths[i:i + CHUNK_SIZE], *args):
+                    yield result
+            return
+        self._pending = [
+            self._executor.submit(job, file_paths[i:i + CHUNK_SIZE], *args)
+            for i in range(0, len(file_paths), CHUNK_SIZE)]
+        try:
+            for future in futures.as_completed(self._pending):
+                if self._cancelled:
+                    return
+                if future.cancelled():
+                    continue
+                for result in future.result():
+                    yield result
+        finally:
+            self.cancel_pending()
+            self._pending = []
+
+    def _start_executor(self):
+        if self._executor is None:
+            try:
+                self._executor = futures.ProcessPoolExecutor(
+                    max_workers=self._max_workers)
+            except (OSError, NotImplementedError):
+                # No multiprocessing support (ie: missing /dev/shm)
+                return False
+        return True
+
+    def cancel(self):
+        """Stop the current search, the chunks being searched finish."""
+        self._cancelled = True
+        self.cancel_pending()
+
+    def cancel_pending(self):
+        for future in list(self._pending):
+            future.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -18,6 +18,7 @@ import _ast
 import ast
 
 from ninja_ide.intellisensei.analyzer import model
+from ninja_ide.tools import parse_cache
 
 from ninja_ide.tools.logger import NinjaLogger
 
@@ -159,10 +160,20 @@ def _parse_function(symbol, with_docstrings):
 
 def obtain_symbols(source, with_docstrings=False, filename='',
                    simple=False, only_simple=False):
-    """Parse a module source code to obtain: Classes, Functions and Assigns."""
+    """Parse a module source code to obtain: Classes, Functions and Assigns.
 
+    The results are shared by all the callers with the same source and
+    options (see parse_cache), they must not be modified."""
+
+    kind = 'symbols:%d%d%d' % (with_docstrings, simple, only_simple)
+    return parse_cache.summary(
+        kind, source, lambda source: _obtain_symbols(
+            source, with_docstrings, filename, simple, only_simple))
+
+
+def _obtain_symbols(source, with_docstrings, filename, simple, only_simple):
     try:
-        module = ast.parse(source)
+        module = parse_cache.parse(source)
     except:
         logger_symbols.debug("The file contains syntax errors: %s" % filename)
         if simple:
@@ -222,7 +233,7 @@ def obtain_symbols(source, with_docstrings=False, filename='',
 def obtain_imports(source='', body=None):
     if source:
         try:
-            module = ast.parse(source)
+            module = parse_cache.parse(source)
             body = module.body
         except:
             logger_imports.debug("A file contains syntax errors.")
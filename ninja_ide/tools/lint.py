@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Checks executed by the lint service in a separate process.
+
+This module is imported by the worker process, so it must not import
+anything from the GUI."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+
+from ninja_ide.dependencies.pyflakes_mod import checker
+from ninja_ide.tools import parse_cache
+from ninja_ide.tools import style_check
+
+# Style engines kept alive in the worker, by file
+STYLE_ENGINES_SIZE = 32
+
+_style_engines = OrderedDict()
+
+
+source_hash = parse_cache.source_hash
+
+
+def pyflakes_checks(source, path):
+    """Return {lineno: (text, column)} with the PyFlakes messages of
+    source, text is a list of messages (a string for syntax errors)."""
+
+    checks = {}
+    # Compile into an AST (shared with the other tools) and handle syntax
+    # errors
+    try:
+        tree = parse_cache.parse(source, path)
+    except SyntaxError as reason:
+        if reason.text is not None:
+            checks[reason.lineno - 1] = (
+                "[PyFlakes] %s" % reason.args[0], (reason.offset or 1) - 1)
+    except (ValueError, TypeError):
+        # ie: null bytes in the source
+        pass
+    else:
+        # Okay, now check it
+        lint_checker = checker.Checker(tree, path)
+        lint_checker.messages.sort(key=lambda msg: msg.lineno)
+        for message in lint_checker.messages:
+            lineno = message.lineno - 1
+            text = message.message % message.message_args
+            if lineno in checks:
+                checks[lineno][0].append(text)
+            else:
+                checks[lineno] = ([text], message.col)
+    return checks
+
+
+def pep8_checks(source, path):
+    """Return {lineno: (message, column)} with the pycodestyle errors of
+    source. Only the lines changed since the last check of path are
+    checked again."""
+
+    engine = _style_engines.pop(path, None)
+    if engine is None:
+        engine = style_check.StyleEngine(path)
+    _style_engines[path] = engine
+    while len(_style_engines) > STYLE_ENGINES_SIZE:
+        _style_engines.popitem(last=False)
+    return engine.check(source)
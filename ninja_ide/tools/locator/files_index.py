@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Index of the project files for the fuzzy file opener.
+
+The path shown for each file ("project/package/module.py") is computed
+once, when the project is explored, and updated from the filesystem
+events. The searches run over these paths and the file names joined in
+a KeysIndex (see search_index), ranked in tiers:
+
+    1. the file name is the query
+    2. the file name starts with the query
+    3. the file name contains the query
+    4. the path contains the query
+    5. the path contains the words of the query in order
+    6. the path contains the characters of the query in order
+
+Only the first results are computed. Apart from tier 5, the spaces in
+the query are ignored."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import re
+import threading
+import itertools
+
+from ninja_ide.tools.locator import search_index
+
+
+def _entry(project_path, file_path):
+    """Return the path shown for the file, and the keys of the path and
+    the file name."""
+    project_path = project_path.rstrip(os.sep)
+    if file_path.startswith(project_path + os.sep):
+        # Much faster than relpath, for the paths found by os.walk
+        shown = os.path.basename(project_path) + \
+            file_path[len(project_path):]
+    else:
+        shown = os.path.join(os.path.basename(project_path),
+                             os.path.relpath(file_path, project_path))
+    key = shown.lower()
+    return shown, key, key.rpartition(os.sep)[2]
+
+
+class FilesIndex(object):
+    """Files of each project, safe to update from the Locator thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # {project path: {file path: (path shown, path key, name key)}}
+        self._projects = {}
+        self._snapshot = None
+
+    def set_project_files(self, project_path, file_paths):
+        """Replace the files of the project with file_paths."""
+        files = {path: _entry(project_path, path) for path in file_paths}
+        with self._lock:
+            self._projects[project_path] = files
+            self._snapshot = None
+
+    def remove_project(self, project_path):
+        with self._lock:
+            if self._projects.pop(project_path, None) is not None:
+                self._snapshot = None
+
+    def add(self, project_path, file_path):
+        with self._lock:
+            files = self._projects.setdefault(project_path, {})
+            if file_path not in files:
+                files[file_path] = _entry(project_path, file_path)
+                self._snapshot = None
+
+    def remove(self, file_path):
+        with self._lock:
+            for files in self._projects.values():
+                if files.pop(file_path, None) is not None:
+                    self._snapshot = None
+
+    def projects(self):
+        with self._lock:
+            return list(self._projects)
+
+    def files(self, project_path):
+        """Return the paths of the files of the project."""
+        with self._lock:
+            return list(self._projects.get(project_path, ()))
+
+    def __contains__(self, file_path):
+        with self._lock:
+            return any(file_path in files
+                       for files in self._projects.values())
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(files) for files in self._projects.values())
+
+    def prepare(self):
+        """Build the search structures after the changes, from the Locator
+        thread, instead of on the next search."""
+        self._get_snapshot()
+
+    def _get_snapshot(self):
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = _Snapshot(self._projects)
+            return self._snapshot
+
+    def search(self, query, limit=None):
+        """Return a list of (path shown, project path) of the files
+        matching query, the best ones first."""
+        return self._get_snapshot().search(query.lower().split(), limit)
+
+
+class _Snapshot(object):
+    """The files of every project when it was built, never modified."""
+
+    def __init__(self, projects):
+        self.entries = []
+        path_keys = []
+        name_keys = []
+        for project_path, files in projects.items():
+            for shown, path_key, name_key in files.values():
+                self.entries.append((shown, project_path))
+                path_keys.append(path_key)
+                name_keys.append(name_key)
+        self.paths = search_index.KeysIndex(path_keys)
+        self.names = search_index.KeysIndex(name_keys)
+
+    def _tiers(self, words):
+        query = ''.join(words)
+        names = self.names.keys
+        paths = self.paths.keys
+        yield self.names.scan_equal(query)
+        yield (index for index in self.names.scan_prefix(query)
+               if names[index] != query)
+        yield (index for index in self.names.scan_contains(query)
+               if not names[index].startswith(query))
+        yield (index for index in self.paths.scan_contains(query)
+               if query not in names[index])
+        words_pattern = None
+        if len(words) > 1:
+            words_pattern = re.compile('[^\n]*?'.join(
+                re.escape(word) for word in words))
+            yield (index for index in self.paths.scan_fuzzy(words_pattern)
+                   if query not in paths[index])
+        if len(query) > 1:
+            yield (index for index in self.paths.scan_fuzzy(
+                   search_index.fuzzy_pattern(query))
+                   if query not in paths[index] and (
+                       words_pattern is None or
+                       not words_pattern.search(paths[index])))
+
+    def search(self, words, limit=None):
+        if words:
+            matches = itertools.chain.from_iterable(self._tiers(words))
+        else:
+            matches = range(len(self.entries))
+        return [self.entries[index]
+                for index in itertools.islice(matches, limit)]
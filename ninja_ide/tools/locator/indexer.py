@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Parse project files in a pool of processes for the Locator.
+
+This module is imported by the worker processes, so it must not import
+anything from the GUI (and it doesn't log, the log file is opened in
+write mode on each import)."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import importlib
+from concurrent import futures
+
+
+# @ FILES
+# < CLASSES
+# > FUNCTIONS
+# - MODULE ATTRIBUTES
+# ! NO PYTHON FILES
+# . SYMBOLS IN THIS FILE
+# / TABS OPENED
+# : LINE NUMBER
+FILTERS = {
+    'files': '@',
+    'classes': '<',
+    'functions': '>',
+    'attribs': '-',
+    'non-python': '!',
+    'this-file': '.',
+    'tabs': '/',
+    'lines': ':'}
+
+# Number of files sent to a worker in each job
+CHUNK_SIZE = 32
+# Below this amount of files is cheaper to parse them in the current process
+PARALLEL_THRESHOLD = 64
+
+
+def flatten_symbols(symbols):
+    """Convert the dict returned by a symbols handler in a list of
+    (type, name, lineno) tuples, line numbers start at 0."""
+
+    results = []
+    _flatten_symbols(symbols, results)
+    return results
+
+
+def _flatten_symbols(symbols, results):
+    if 'classes' in symbols:
+        _flatten_classes(symbols['classes'], results)
+    if 'attributes' in symbols:
+        attributes = symbols['attributes']
+        for attr in attributes:
+            results.append((FILTERS['attribs'], attr, attributes[attr] - 1))
+    if 'functions' in symbols:
+        _flatten_functions(symbols['functions'], results)
+
+
+def _flatten_classes(clazzes, results):
+    for claz in clazzes:
+        members = clazzes[claz]['members']
+        results.append(
+            (FILTERS['classes'], claz, clazzes[claz]['lineno'] - 1))
+        if 'attributes' in members:
+            for attr in members['attributes']:
+                results.append((FILTERS['attribs'], attr,
+                                members['attributes'][attr] - 1))
+        if 'functions' in members:
+            _flatten_functions(members['functions'], results)
+        if 'classes' in members:
+            _flatten_classes(members['classes'], results)
+
+
+def _flatten_functions(functions, results):
+    for func in functions:
+        results.append(
+            (FILTERS['functions'], func, functions[func]['lineno'] - 1))
+        _flatten_symbols(functions[func]['functions'], results)
+
+
+def parse_file(file_path, handler):
+    """Return (file_path, mtime, symbols) for file_path using the
+    symbols handler received (a module or an object with obtain_symbols)."""
+
+    mtime = int(os.stat(file_path).st_mtime)
+    with open(file_path) as f:
+        content = f.read()
+    symbols = handler.obtain_symbols(content, filename=file_path)
+    return file_path, mtime, flatten_symbols(symbols)
+
+
+def _parse_files(file_paths, handler_name):
+    """Job executed by the workers, the handler is received by name
+    because modules can't be pickled."""
+
+    handler = importlib.import_module(handler_name)
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append(parse_file(file_path, handler) + (None,))
+        except Exception as reason:
+            results.append((file_path, None, [], repr(reason)))
+    return results
+
+
+class SymbolsIndexer(object):
+    """Parse a list of files spreading the work across processes.
+
+    parse() is a generator returning the results as soon as each
+    chunk of files is ready: (file_path, mtime, symbols, error)"""
+
+    def __init__(self, max_workers=None):
+        self._max_workers = max_workers
+        self._executor = None
+        self._pending = []
+
+    def parse(self, jobs):
+        """jobs is a list of (file_path, handler) pairs."""
+
+        jobs = list(jobs)
+        if len(jobs) < PARALLEL_THRESHOLD or not self._start_executor():
+            for result in self._parse_inline(jobs):
+                yield result
+            return
+        inline = []
+        by_handler = {}
+        for file_path, handler in jobs:
+            handler_name = getattr(handler, '__name__', None)
+            if handler_name is None or \
+                    importlib.import_module(handler_name) is not handler:
+                # Plugins may register objects that can't be imported
+                # from a worker, parse those files here
+                inline.append((file_path, handler))
+            else:
+                by_handler.setdefault(handler_name, []).append(file_path)
+        for handler_name, file_paths in by_handler.items():
+            for i in range(0, len(file_paths), CHUNK_SIZE):
+                chunk = file_paths[i:i + CHUNK_SIZE]
+                self._pending.append(self._executor.submit(
+                    _parse_files, chunk, handler_name))
+        for result in self._parse_inline(inline):
+            yield result
+        try:
+            for future in futures.as_completed(self._pending):
+                if future.cancelled():
+                    continue
+                for result in future.result():
+                    yield result
+        finally:
+            self._pending = []
+
+    def _parse_inline(self, jobs):
+        for file_path, handler in jobs:
+            try:
+                yield parse_file(file_path, handler) + (None,)
+            except Exception as reason:
+                yield (file_path, None, [], repr(reason))
+
+    def _start_executor(self):
+        if self._executor is None:
+            try:
+                self._executor = futures.ProcessPoolExecutor(
+                    max_workers=self._max_workers)
+            except (OSError, NotImplementedError):
+                # No multiprocessing support (ie: missing /dev/shm)
+                return False
+        return True
+
+    def cancel(self):
+        """Cancel the jobs that were not started yet."""
+        for future in self._pending:
+            future.cancel()
+
+    def shutdown(self):
+        """Stop the workers, waits only for the chunks being parsed."""
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
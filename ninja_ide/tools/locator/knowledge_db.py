@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Persistence of the Locator knowledge (locator.db)."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import sqlite3
+
+# Rows written in each transaction
+BATCH_SIZE = 500
+# SQLite limits the number of host parameters in a query to 999
+_MAX_VARIABLES = 900
+
+# Files created by sqlite next to the database in WAL mode
+DB_SUFFIXES = ('', '-wal', '-shm')
+
+
+def _create_table(locator_db):
+    # WAL avoids rewriting the whole journal on each transaction and lets
+    # the readers work while the indexer is writing
+    locator_db.execute("PRAGMA journal_mode=WAL")
+    locator_db.execute("create table if not exists "
+                       "locator(path text PRIMARY KEY, stat integer, "
+                       "data blob)")
+    locator_db.commit()
+
+
+def initialize_db(db_path):
+    locator_db = sqlite3.connect(db_path)
+    _create_table(locator_db)
+    locator_db.close()
+
+
+def remove_db(db_path):
+    """Remove the database and the files created by the WAL journal."""
+    for suffix in DB_SUFFIXES:
+        file_path = db_path + suffix
+        if os.path.isfile(file_path):
+            os.remove(file_path)
+
+
+class KnowledgeDB(object):
+    """Connection to locator.db writing the symbols in batches.
+
+    Rows saved with save() are kept in memory and written in a single
+    transaction when BATCH_SIZE is reached, flush() is called or the
+    connection is closed."""
+
+    def __init__(self, db_path, batch_size=BATCH_SIZE):
+        self._connection = sqlite3.connect(db_path)
+        # The knowledge could be cleaned after the module was imported
+        _create_table(self._connection)
+        # In WAL mode NORMAL is still safe against corruption, it only
+        # skips the fsync on each commit
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._batch_size = batch_size
+        self._batch = []
+        self._stats = None
+
+    def load_stats(self):
+        """Load the (path, stat) of all the rows with a single query."""
+        cur = self._connection.execute("SELECT path, stat FROM locator")
+        self._stats = dict(cur.fetchall())
+        return self._stats
+
+    def get_stat(self, path):
+        if self._stats is not None:
+            return self._stats.get(path)
+        cur = self._connection.execute(
+            "SELECT stat FROM locator WHERE path=?", (path,))
+        row = cur.fetchone()
+        return row[0] if row is not None else None
+
+    def get_data(self, path):
+        cur = self._connection.execute(
+            "SELECT data FROM locator WHERE path=?", (path,))
+        row = cur.fetchone()
+        return row[0] if row is not None else None
+
+    def get_data_many(self, paths):
+        """Return a dict {path: data} querying the paths in chunks."""
+        results = {}
+        paths = list(paths)
+        for i in range(0, len(paths), _MAX_VARIABLES):
+            chunk = paths[i:i + _MAX_VARIABLES]
+            cur = self._connection.execute(
+                "SELECT path, data FROM locator WHERE path IN (%s)" %
+                ', '.join('?' * len(chunk)), chunk)
+            results.update(cur.fetchall())
+        return results
+
+    def save(self, path, stat, data):
+        self._batch.append((path, stat, sqlite3.Binary(data)))
+        if self._stats is not None:
+            self._stats[path] = stat
+        if len(self._batch) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the pending rows in one transaction."""
+        if not self._batch:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO locator values (?, ?, ?)",
+                self._batch)
+        self._batch = []
+
+    def remove(self, paths):
+        paths = list(paths)
+        if not paths:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "DELETE FROM locator WHERE path=?", [(p,) for p in paths])
+        if self._stats is not None:
+            for path in paths:
+                self._stats.pop(path, None)
+
+    def prune(self, folder, existing_paths):
+        """Remove the rows of the files inside folder that are not in
+        existing_paths (deleted since the last exploration)."""
+        if self._stats is None:
+            self.load_stats()
+        folder = os.path.join(folder, '')
+        removed = [path for path in self._stats
+                   if path.startswith(folder) and path not in existing_paths]
+        self.remove(removed)
+        return removed
+
+    def close(self):
+        self.flush()
+        self._connection.close()
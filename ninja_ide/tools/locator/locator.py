@@ -19,20 +19,16 @@ from __future__ import unicode_literals
 from __future__ import print_function
 
 import os
-import sqlite3
-import pickle
-try:
-    import Queue
-except:
-    import queue as Queue  # lint:ok
+import time
+import threading
 
 from PyQt5.QtWidgets import QMessageBox
 from PyQt5.QtCore import (
     QObject,
     QThread,
-    QDir,
     QFile,
-    QTextStream
+    QTextStream,
+    pyqtSignal
 )
 
 from ninja_ide import resources
@@ -41,6 +37,12 @@ from ninja_ide.extensions import handlers
 from ninja_ide.gui.ide import IDE
 from ninja_ide.core.file_handling import file_manager
 from ninja_ide.core import settings
+from ninja_ide.tools.locator import files_index
+from ninja_ide.tools.locator import indexer
+from ninja_ide.tools.locator import knowledge_db
+from ninja_ide.tools.locator import symbols_codec
+from ninja_ide.tools import parse_cache
+from ninja_ide.tools.locator.indexer import FILTERS  # lint:ok
 
 from ninja_ide.tools.logger import NinjaLogger
 
@@ -48,45 +50,23 @@ from ninja_ide.tools.logger import NinjaLogger
 logger = NinjaLogger('ninja_ide.tools.locator')
 
 mapping_symbols = {}
-files_paths = {}
-
-
-# @ FILES
-# < CLASSES
-# > FUNCTIONS
-# - MODULE ATTRIBUTES
-# ! NO PYTHON FILES
-# . SYMBOLS IN THIS FILE
-# / TABS OPENED
-# : LINE NUMBER
-FILTERS = {
-    'files': '@',
-    'classes': '<',
-    'functions': '>',
-    'attribs': '-',
-    'non-python': '!',
-    'this-file': '.',
-    'tabs': '/',
-    'lines': ':'}
+# Files of the projects, for the fuzzy file opener
+files_paths = files_index.FilesIndex()
+# mtime of the files loaded in mapping_symbols
+files_mtime = {}
 
+# Emit the partial results of the indexer at most each 250 ms
+PARTIAL_RESULTS_INTERVAL = 0.25
 
-db_path = os.path.join(resources.NINJA_KNOWLEDGE_PATH, 'locator.db')
-
-
-def _initialize_db():
-    locator_db = sqlite3.connect(db_path)
-    cur = locator_db.cursor()
-    cur.execute("create table if not exists "
-                "locator(path text PRIMARY KEY, stat integer, data blob)")
-    locator_db.commit()
-    locator_db.close()
 
-
-# Initialize Database and open connection
-_initialize_db()
+db_path = os.path.join(resources.NINJA_KNOWLEDGE_PATH, 'locator.db')
 
 
-# TODO: Clean non existent paths from the DB
+# Initialize Database
+knowledge_db.initialize_db(db_path)
+# Symbols of the sources parsed, shared with the editor between sessions
+parse_cache.set_summaries_db(
+    os.path.join(resources.NINJA_KNOWLEDGE_PATH, 'summaries.db'))
 
 
 class GoToDefinition(QObject):
@@ -130,6 +110,9 @@ class GoToDefinition(QObject):
 class ResultItem(object):
     """The Representation of each item found with the locator."""
 
+    # There is one of these for each symbol in the projects
+    __slots__ = ('type', 'name', 'path', 'lineno', 'comparison')
+
     def __init__(self, symbol_type='', name='', path='', lineno=-1):
         if name:
             self.type = symbol_type  # Function, Class, etc
@@ -158,6 +141,15 @@ class ResultItem(object):
 
 
 class LocateSymbolsThread(QThread):
+    """Build the knowledge used by the Locator.
+
+    The first time the projects are explored every file is parsed in a pool
+    of processes (see indexer.SymbolsIndexer) and the partial results are
+    notified with symbolsUpdated, after that only the files that changed
+    (according to its mtime) or the ones reported with files_changed
+    are parsed again."""
+
+    symbolsUpdated = pyqtSignal()
 
     def __init__(self):
         super(LocateSymbolsThread, self).__init__()
@@ -168,9 +160,13 @@ class LocateSymbolsThread(QThread):
         self.dirty = False
         self._search = None
         self._isVariable = None
+        self._indexer = None
+        self._changed_paths = set()
+        self._changed_lock = threading.Lock()
+        self.finished.connect(self._process_changed_files)
 
         # Locator Knowledge
-        self._locator_db = None
+        self._knowledge = None
 
     def find(self, search, filePath, isVariable):
         self.cancel()
@@ -186,10 +182,6 @@ class LocateSymbolsThread(QThread):
         self.wait()
         self._cancel = False
         if not self.isRunning():
-            global mapping_symbols
-            global files_paths
-            mapping_symbols = {}
-            files_paths = {}
             self.execute = self.locate_code
             self.start()
 
@@ -201,6 +193,18 @@ class LocateSymbolsThread(QThread):
             self.execute = self.locate_file_code
             self.start()
 
+    def files_changed(self, paths):
+        """Update the knowledge only for the paths received
+        (reported by the file system watcher or after saving a file)."""
+        with self._changed_lock:
+            self._changed_paths.update(paths)
+        self._process_changed_files()
+
+    def _process_changed_files(self):
+        if self._changed_paths and not self.isRunning():
+            self.execute = self.locate_changed_files
+            self.start()
+
     def run(self):
         self.results = []
         self.locations = []
@@ -211,82 +215,140 @@ class LocateSymbolsThread(QThread):
         self._cancel = False
         self._search = None
         self._isVariable = None
-        if self._locator_db is not None:
-            self._locator_db.commit()
-            self._locator_db.close()
-            self._locator_db = None
-
-    def _save_file_symbols(self, path, stat, data):
-        if self._locator_db is not None:
-            pdata = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
-            cur = self._locator_db.cursor()
-            cur.execute("INSERT OR REPLACE INTO locator values (?, ?, ?)",
-                        (path, stat, sqlite3.Binary(pdata)))
-            self._locator_db.commit()
-
-    def _get_file_symbols(self, path):
-        if self._locator_db is not None:
-            cur = self._locator_db.cursor()
-            cur.execute("SELECT * FROM locator WHERE path=:path",
-                        {'path': path})
-            return cur.fetchone()
+        if self._knowledge is not None:
+            self._knowledge.close()
+            self._knowledge = None
+
+    def _save_file_symbols(self, path, stat, symbols):
+        if self._knowledge is not None:
+            self._knowledge.save(path, stat, symbols_codec.dumps(symbols))
 
     def locate_code(self):
-        self._locator_db = sqlite3.connect(db_path)
+        self._knowledge = knowledge_db.KnowledgeDB(db_path)
+        # One query for the stat of every known file
+        self._knowledge.load_stats()
         ide = IDE.get_service('ide')
         projects = ide.filesystem.get_projects()
         if not projects:
             return
         projects = list(projects.values())
+        to_parse = []
+        cached = []
+        found = set()
         for nproject in projects:
             if self._cancel:
                 break
-            current_dir = QDir(nproject.path)
             # Skip not readable dirs!
-            if not current_dir.isReadable():
+            if not os.access(nproject.path, os.R_OK | os.X_OK):
                 continue
-
-            queue_folders = Queue.Queue()
-            queue_folders.put(current_dir)
-            files_paths[nproject.path] = list()
-            self.__locate_code_in_project(queue_folders, nproject)
+            self.__locate_code_in_project(nproject, to_parse, cached, found)
+            if not self._cancel:
+                self._knowledge.prune(nproject.path, found)
+        if self._cancel:
+            return
+        # Load the symbols of the files not modified in a few queries
+        data = self._knowledge.get_data_many(
+            file_path for file_path, _, _ in cached)
+        for file_path, mtime, handler in cached:
+            if not self._load_cached_symbols(file_path, mtime,
+                                             data.get(file_path)):
+                to_parse.append((file_path, handler))
+        # Forget the files removed or from the projects already closed
+        for path in list(mapping_symbols.keys()):
+            if path not in found:
+                self._forget_file(path)
+        for path in files_paths.projects():
+            if path not in ide.filesystem.get_projects():
+                files_paths.remove_project(path)
+        files_paths.prepare()
+        self.dirty = True
+        self.symbolsUpdated.emit()
+        self._parse_files(to_parse)
         self.dirty = True
         self.get_locations()
+        self.symbolsUpdated.emit()
 
-    def __locate_code_in_project(self, queue_folders, nproject):
-        file_filter = QDir.Files | QDir.NoDotAndDotDot | QDir.Readable
-        dir_filter = QDir.Dirs | QDir.NoDotAndDotDot | QDir.Readable
-        while not self._cancel and not queue_folders.empty():
-            current_dir = QDir(queue_folders.get())
-            # Skip not readable dirs!
-            if not current_dir.isReadable():
-                continue
-
-            # Collect all sub dirs!
-            current_sub_dirs = current_dir.entryInfoList(dir_filter)
-            for one_dir in current_sub_dirs:
-                queue_folders.put(one_dir.absoluteFilePath())
-
-            # all files in sub_dir first apply the filters
-            current_files = current_dir.entryInfoList(
-                ['*{0}'.format(x) for x in nproject.extensions], file_filter)
-            # process all files in current dir!
-            global files_paths
-            for one_file in current_files:
+    def __locate_code_in_project(self, nproject, to_parse, cached, found):
+        extensions = tuple(nproject.extensions)
+        project_files = []
+        for root, dirs, files in os.walk(nproject.path):
+            if self._cancel:
+                break
+            # Skip hidden and not readable dirs!
+            dirs[:] = [d for d in dirs if not d.startswith('.') and
+                       os.access(os.path.join(root, d), os.R_OK | os.X_OK)]
+            for file_name in files:
+                if file_name.startswith('.') or \
+                        not file_name.endswith(extensions):
+                    continue
+                file_path = os.path.join(root, file_name)
                 try:
-                    self._grep_file_symbols(one_file.absoluteFilePath(),
-                                            one_file.fileName())
-                    files_paths[nproject.path].append(
-                        one_file.absoluteFilePath())
+                    mtime = int(os.stat(file_path).st_mtime)
+                    found.add(file_path)
+                    project_files.append(file_path)
+                    if files_mtime.get(file_path) == mtime and \
+                            file_path in mapping_symbols:
+                        # Nothing changed since the last exploration
+                        continue
+                    handler = self._file_entry(file_path, file_name)
+                    if handler is None:
+                        continue
+                    if self._knowledge.get_stat(file_path) == mtime:
+                        cached.append((file_path, mtime, handler))
+                    else:
+                        to_parse.append((file_path, handler))
                 except Exception as reason:
                     logger.error(
                         '__locate_code_in_project, error: %r' % reason)
                     logger.error(
                         '__locate_code_in_project fail for file: %r' %
-                        one_file.absoluteFilePath())
+                        file_path)
+        if not self._cancel:
+            files_paths.set_project_files(nproject.path, project_files)
+
+    def _parse_files(self, to_parse):
+        """Parse the files in a pool of processes saving the results as
+        soon as they arrive."""
+        self._indexer = indexer.SymbolsIndexer()
+        last_notification = time.time()
+        try:
+            for path, mtime, symbols, error in self._indexer.parse(to_parse):
+                if self._cancel:
+                    self._indexer.cancel()
+                    break
+                if error is not None:
+                    logger.error('_parse_files fail for file: %r, %s' %
+                                 (path, error))
+                    continue
+                self._store_symbols(path, mtime, symbols)
+                if time.time() - last_notification > \
+                        PARTIAL_RESULTS_INTERVAL:
+                    self.dirty = True
+                    self.symbolsUpdated.emit()
+                    last_notification = time.time()
+        finally:
+            self._indexer.shutdown()
+            self._indexer = None
+
+    def _create_items(self, file_path, symbols):
+        return [ResultItem(symbol_type=symbol_type, name=name,
+                           path=file_path, lineno=lineno)
+                for symbol_type, name, lineno in symbols]
+
+    def _store_symbols(self, file_path, mtime, symbols):
+        results = self._create_items(file_path, symbols)
+        if results:
+            self._save_file_symbols(file_path, mtime, symbols)
+        entry = mapping_symbols.get(file_path, [])[:1]
+        mapping_symbols[file_path] = entry + results
+        files_mtime[file_path] = mtime
+
+    def _forget_file(self, file_path):
+        mapping_symbols.pop(file_path, None)
+        files_mtime.pop(file_path, None)
 
     def locate_file_code(self):
-        self._locator_db = sqlite3.connect(db_path)
+        self._knowledge = knowledge_db.KnowledgeDB(db_path)
         file_name = file_manager.get_basename(self._file_path)
         try:
             self._grep_file_symbols(self._file_path, file_name)
@@ -294,6 +356,40 @@ class LocateSymbolsThread(QThread):
         except Exception as reason:
             logger.error('locate_file_code, error: %r' % reason)
 
+    def locate_changed_files(self):
+        self._knowledge = knowledge_db.KnowledgeDB(db_path)
+        with self._changed_lock:
+            paths = self._changed_paths
+            self._changed_paths = set()
+        ide = IDE.get_service('ide')
+        projects = ide.filesystem.get_projects()
+        for path in paths:
+            project_path = None
+            for each_path in projects:
+                if path.startswith(os.path.join(each_path, '')):
+                    project_path = each_path
+                    break
+            if not os.path.isfile(path):
+                self._forget_file(path)
+                self._knowledge.remove([path])
+                files_paths.remove(path)
+                continue
+            if project_path is None and path not in mapping_symbols:
+                # Outside of the projects, nothing to update
+                continue
+            if project_path is not None:
+                extensions = tuple(projects[project_path].extensions)
+                if not path.endswith(extensions):
+                    continue
+                files_paths.add(project_path, path)
+            try:
+                self._grep_file_symbols(path, file_manager.get_basename(path))
+            except Exception as reason:
+                logger.error('locate_changed_files, error: %r' % reason)
+        files_paths.prepare()
+        self.dirty = True
+        self.symbolsUpdated.emit()
+
     def go_to_definition(self):
         self.dirty = True
         self.results = []
@@ -348,13 +444,14 @@ class LocateSymbolsThread(QThread):
 
     def convert_map_to_array(self):
         global mapping_symbols
-        self.locations = [x for location in mapping_symbols
-                          for x in mapping_symbols[location]]
+        # The indexer could be updating the map while we read it
+        symbols = list(mapping_symbols.values())
+        self.locations = [x for location in symbols for x in location]
         self.locations = sorted(self.locations, key=lambda item: item.name)
 
-    def _grep_file_symbols(self, file_path, file_name):
-        # type - file_name - file_path
-        global mapping_symbols
+    def _file_entry(self, file_path, file_name):
+        """Add the file entry to mapping_symbols and return the symbols
+        handler for it, or None if the file can't be parsed."""
         exts = settings.SYNTAX.get('python')['extension']
         file_ext = file_manager.get_file_extension(file_path)
         if file_ext not in exts:
@@ -365,95 +462,50 @@ class LocateSymbolsThread(QThread):
             mapping_symbols[file_path] = [
                 ResultItem(symbol_type=FILTERS['files'], name=file_name,
                            path=file_path, lineno=-1)]
-        data = self._get_file_symbols(file_path)
-        # FIXME: stat not int
-        mtime = int(os.stat(file_path).st_mtime)
-        if data is not None and (mtime == int(data[1])):
+        # obtain a symbols handler for this file extension
+        return handlers.get_symbols_handler(file_ext)
+
+    def _load_cached_symbols(self, file_path, mtime, data=None):
+        """Load the symbols from the locator knowledge if the file
+        was not modified, return True if they could be loaded."""
+        if self._knowledge is None:
+            return False
+        if data is None:
+            # FIXME: stat not int
+            stat = self._knowledge.get_stat(file_path)
+            if stat is None or mtime != int(stat):
+                return False
+            data = self._knowledge.get_data(file_path)
+        if data is not None:
             try:
-                results = pickle.loads(data[2])
+                results = self._create_items(
+                    file_path, symbols_codec.loads(data))
                 mapping_symbols[file_path] += results
-                return
+                files_mtime[file_path] = mtime
+                return True
             except:
                 print("ResultItem couldn't be loaded, let's analyze it again'")
-        # obtain a symbols handler for this file extension
-        symbols_handler = handlers.get_symbols_handler(file_ext)
-        if symbols_handler is None:
-            return
-        results = []
-        with open(file_path) as f:
-            content = f.read()
-            symbols = symbols_handler.obtain_symbols(
-                content,
-                filename=file_path)
-            self.__parse_symbols(symbols, results, file_path)
+        return False
 
-        if results:
-            self._save_file_symbols(file_path, mtime, results)
-            mapping_symbols[file_path] += results
-
-    def __parse_symbols(self, symbols, results, file_path):
-        if "classes" in symbols:
-            self.__parse_class(symbols, results, file_path)
-        if 'attributes' in symbols:
-            self.__parse_attributes(symbols, results, file_path)
-        if 'functions' in symbols:
-            self.__parse_functions(symbols, results, file_path)
-
-    def __parse_class(self, symbols, results, file_path):
-        clazzes = symbols['classes']
-        for claz in clazzes:
-            line_number = clazzes[claz]['lineno'] - 1
-            members = clazzes[claz]['members']
-            results.append(ResultItem(symbol_type=FILTERS['classes'],
-                           name=claz, path=file_path,
-                           lineno=line_number))
-            if 'attributes' in members:
-                for attr in members['attributes']:
-                    line_number = members['attributes'][attr] - 1
-                    results.append(ResultItem(symbol_type=FILTERS['attribs'],
-                                   name=attr, path=file_path,
-                                   lineno=line_number))
-            if 'functions' in members:
-                for func in members['functions']:
-                    line_number = members['functions'][func]['lineno'] - 1
-                    results.append(ResultItem(
-                        symbol_type=FILTERS['functions'], name=func,
-                        path=file_path, lineno=line_number))
-                    self.__parse_symbols(
-                        members['functions'][func]['functions'],
-                        results, file_path)
-            if 'classes' in members:
-                self.__parse_class(members, results, file_path)
-
-    def __parse_attributes(self, symbols, results, file_path):
-        attributes = symbols['attributes']
-        for attr in attributes:
-            line_number = attributes[attr] - 1
-            results.append(ResultItem(symbol_type=FILTERS['attribs'],
-                           name=attr, path=file_path,
-                           lineno=line_number))
-
-    def __parse_functions(self, symbols, results, file_path):
-        functions = symbols['functions']
-        for func in functions:
-            line_number = functions[func]['lineno'] - 1
-            results.append(ResultItem(
-                symbol_type=FILTERS['functions'], name=func,
-                path=file_path, lineno=line_number))
-            self.__parse_symbols(functions[func]['functions'],
-                                 results, file_path)
+    def _grep_file_symbols(self, file_path, file_name):
+        # type - file_name - file_path
+        symbols_handler = self._file_entry(file_path, file_name)
+        mtime = int(os.stat(file_path).st_mtime)
+        files_mtime[file_path] = mtime
+        if symbols_handler is None or \
+                self._load_cached_symbols(file_path, mtime):
+            return
+        path, mtime, symbols = indexer.parse_file(file_path, symbols_handler)
+        self._store_symbols(path, mtime, symbols)
 
     def get_symbols_for_class(self, file_path, clazzName):
-        results = []
-        with open(file_path) as f:
-            content = f.read()
-            ext = file_manager.get_file_extension(file_path)
-            # obtain a symbols handler for this file extension
-            symbols_handler = handlers.get_symbols_handler(ext)
-            symbols = symbols_handler.obtain_symbols(content,
-                                                     filename=file_path)
-            self.__parse_symbols(symbols, results, file_path)
-        return results
+        ext = file_manager.get_file_extension(file_path)
+        # obtain a symbols handler for this file extension
+        symbols_handler = handlers.get_symbols_handler(ext)
+        _, _, symbols = indexer.parse_file(file_path, symbols_handler)
+        return self._create_items(file_path, symbols)
 
     def cancel(self):
         self._cancel = True
+        if self._indexer is not None:
+            self._indexer.cancel()
@@ -36,6 +36,7 @@ from ninja_ide.core.file_handling import file_manager
 from ninja_ide.tools import ui_tools
 from ninja_ide.gui.ide import IDE
 from ninja_ide.tools.locator import locator
+from ninja_ide.tools.locator import search_index
 from ninja_ide.tools.logger import NinjaLogger
 logger = NinjaLogger(__name__)
 DEBUG = logger.debug
@@ -65,6 +66,7 @@ class LocatorWidget(QDialog):
 
         self.locate_symbols = locator.LocateSymbolsThread()
         self.locate_symbols.finished.connect(self._cleanup)
+        self.locate_symbols.symbolsUpdated.connect(self._on_symbols_updated)
         # FIXME: invalid signal
         # self.locate_symbols.terminated.connect(self._cleanup)
         # Hide locator with Escape key
@@ -111,6 +113,7 @@ class LocatorWidget(QDialog):
         self.__pre_filters = []
         self.__pre_results = []
         self.tempLocations = []
+        self._search_index = None
         self.items_in_page = 0
         self._line_jump = -1
 
@@ -134,6 +137,15 @@ class LocatorWidget(QDialog):
     def explore_file_code(self, path):
         self.locate_symbols.find_file_code_location(path)
 
+    def explore_changed_files(self, paths):
+        """Update the locator metadata only for the paths received"""
+        self.locate_symbols.files_changed(paths)
+
+    def _on_symbols_updated(self):
+        """Show the partial results while the projects are explored"""
+        if self.isVisible():
+            self._refresh_filter()
+
     def set_prefix(self, prefix):
         """Set the prefix for the completer."""
         self.__prefix = prefix.lower()
@@ -191,9 +203,8 @@ class LocatorWidget(QDialog):
         if len(filterOptions) == 0:
             self.tempLocations = self.locate_symbols.get_locations()
         elif len(filterOptions) == 1:
-            self.tempLocations = [
-                x for x in self.locate_symbols.get_locations()
-                if x.comparison.lower().find(filterOptions[0].lower()) > -1]
+            self.tempLocations = self._get_search_index().search(
+                filterOptions[0])
         else:
             index = 0
             if not self.tempLocations and (self.__pre_filters == filterOptions):
@@ -210,13 +221,19 @@ class LocatorWidget(QDialog):
                 self.__pre_results = self.tempLocations
         return self._create_list_items(self.tempLocations)
 
+    def _get_search_index(self):
+        """Return the fuzzy index, rebuilt when the locations change."""
+        locations = self.locate_symbols.get_locations()
+        if self._search_index is None or \
+                self._search_index.items is not locations:
+            self._search_index = search_index.SymbolsIndex(locations)
+        return self._search_index
+
     def _filter_generic(self, filterOptions, index):
         at_start = (index == 0)
         if at_start:
-            self.tempLocations = [
-                x for x in self.locate_symbols.get_locations()
-                if x.type == filterOptions[0] and
-                x.comparison.lower().find(filterOptions[1].lower()) > -1]
+            self.tempLocations = self._get_search_index().search(
+                filterOptions[1], symbol_type=filterOptions[0])
         else:
             currentItem = self._root.currentItem()
             if currentItem is not None:
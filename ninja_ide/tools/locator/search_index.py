@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Fuzzy search over the Locator symbols.
+
+The lowercased names are joined in a single string (one name per line)
+so the scans run inside str.find and re instead of a Python loop per
+symbol. The results are ranked in three tiers:
+
+    1. the name starts with the query
+    2. the name contains the query
+    3. the name contains the characters of the query in order
+
+and computed lazily, only what is needed to show a page of results."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import re
+import bisect
+import itertools
+
+
+def _is_subsequence(query, text):
+    position = 0
+    for char in query:
+        position = text.find(char, position)
+        if position == -1:
+            return False
+        position += 1
+    return True
+
+
+def fuzzy_pattern(query):
+    """Pattern matching a key with the chars of query in order."""
+    return re.compile(re.escape(query[0]) + ''.join(
+        '[^\n]*?' + re.escape(char) for char in query[1:]))
+
+
+class KeysIndex(object):
+    """Scans over a list of lowercased keys joined in a single string,
+    yielding the indexes of the matching keys."""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self._blob = ''.join('\n' + key for key in self.keys)
+        # Position of each key in the blob, plus one for the end
+        self._offsets = list(itertools.accumulate(
+            itertools.chain((1,), (len(key) + 1 for key in self.keys))))
+
+    def line_at(self, position):
+        """Return the index of the key in that position of the blob."""
+        return bisect.bisect_right(self._offsets, position) - 1
+
+    def scan_prefix(self, query):
+        blob, offsets = self._blob, self._offsets
+        needle = '\n' + query
+        position = blob.find(needle)
+        while position != -1:
+            index = self.line_at(position + 1)
+            yield index
+            position = blob.find(needle, offsets[index + 1] - 1)
+
+    def scan_equal(self, query):
+        blob, offsets = self._blob, self._offsets
+        needle = '\n' + query + '\n'
+        position = blob.find(needle)
+        while position != -1:
+            index = self.line_at(position + 1)
+            yield index
+            position = blob.find(needle, offsets[index + 1] - 1)
+        # The last key isn't followed by a newline
+        if self.keys and self.keys[-1] == query:
+            yield len(self.keys) - 1
+
+    def scan_contains(self, query):
+        blob, offsets = self._blob, self._offsets
+        position = blob.find(query)
+        while position != -1:
+            index = self.line_at(position)
+            yield index
+            position = blob.find(query, offsets[index + 1])
+
+    def scan_fuzzy(self, pattern):
+        blob, offsets = self._blob, self._offsets
+        match = pattern.search(blob)
+        while match is not None:
+            index = self.line_at(match.start())
+            yield index
+            match = pattern.search(blob, offsets[index + 1])
+
+
+class SymbolsIndex(KeysIndex):
+    """Search index for a list of ResultItem (the Locator locations)."""
+
+    def __init__(self, items):
+        super(SymbolsIndex, self).__init__(
+            [x.comparison.lower() for x in items])
+        self.items = items
+        self._last = None
+
+    def search(self, query, symbol_type=None):
+        """Return the SearchResults for query. If the query refines the
+        previous one only the previous results are scanned again."""
+        query = query.lower()
+        candidates = None
+        last = self._last
+        if last is not None and last.symbol_type == symbol_type and \
+                _is_subsequence(last.query, query):
+            candidates = last.narrow()
+        results = SearchResults(self, query, symbol_type, candidates)
+        self._last = results
+        return results
+
+
+class SearchResults(object):
+    """Lazy list of the ResultItem matching a query, ranked by tier."""
+
+    def __init__(self, index, query, symbol_type=None, candidates=None):
+        self.index = index
+        self.query = query
+        self.symbol_type = symbol_type
+        # Sorted indexes of the items that can match, None means all
+        self.candidates = candidates
+        self.complete = False
+        self._matches = []
+        self._generator = self._search()
+
+    def narrow(self):
+        """Candidates for a query refining this one."""
+        if self.complete:
+            return sorted(self._matches)
+        return self.candidates
+
+    def _search(self):
+        query = self.query
+        keys = self.index.keys
+        if self.candidates is None:
+            tiers = [self.index.scan_prefix(query)]
+            if query:
+                tiers.append(
+                    index for index in self.index.scan_contains(query)
+                    if not keys[index].startswith(query))
+            if len(query) > 1:
+                tiers.append(
+                    index for index in self.index.scan_fuzzy(
+                        fuzzy_pattern(query))
+                    if query not in keys[index])
+        else:
+            candidates = self.candidates
+            tiers = [(i for i in candidates if keys[i].startswith(query))]
+            if query:
+                tiers.append(
+                    i for i in candidates
+                    if query in keys[i] and not keys[i].startswith(query))
+            if len(query) > 1:
+                search = fuzzy_pattern(query).search
+                tiers.append(
+                    i for i in candidates
+                    if query not in keys[i] and search(keys[i]))
+        items = self.index.items
+        symbol_type = self.symbol_type
+        for index in itertools.chain(*tiers):
+            if symbol_type is None or items[index].type == symbol_type:
+                yield index
+
+    def _fill(self, amount=None):
+        """Evaluate the results until having amount of them (or all)."""
+        while not self.complete and \
+                (amount is None or len(self._matches) < amount):
+            try:
+                self._matches.append(next(self._generator))
+            except StopIteration:
+                self.complete = True
+
+    def __getitem__(self, key):
+        items = self.index.items
+        if isinstance(key, slice):
+            if key.stop is None or key.stop < 0 or \
+                    (key.start is not None and key.start < 0):
+                self._fill()
+            else:
+                self._fill(key.stop)
+            return [items[i] for i in self._matches[key]]
+        self._fill(None if key < 0 else key + 1)
+        return items[self._matches[key]]
+
+    def __iter__(self):
+        position = 0
+        while True:
+            self._fill(position + 1)
+            if position >= len(self._matches):
+                return
+            yield self.index.items[self._matches[position]]
+            position += 1
+
+    def __len__(self):
+        self._fill()
+        return len(self._matches)
+
+    def __bool__(self):
+        self._fill(1)
+        return len(self._matches) > 0
+
+    __nonzero__ = __bool__
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Compact format used to store the symbols of a file in locator.db.
+
+The symbols (type, name, lineno) are stored by columns:
+
+    header:  magic, symbols count, names count
+    types:   one byte per symbol (the FILTERS char)
+    linenos: int32 per symbol
+    names:   uint32 per symbol, index in the names table
+    table:   the distinct names encoded in utf-8 separated by NUL
+
+All the numbers are little endian."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import sys
+import struct
+from array import array
+
+MAGIC = b'NLS\x01'
+_HEADER = struct.Struct('<4sII')
+_SEPARATOR = '\0'
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+def _to_little_endian(column):
+    if _BIG_ENDIAN:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _from_little_endian(typecode, data):
+    column = array(typecode)
+    column.frombytes(data)
+    if _BIG_ENDIAN:
+        column.byteswap()
+    return column
+
+
+def dumps(symbols):
+    """Encode a list of (type, name, lineno) tuples."""
+
+    names = {}
+    types = bytearray()
+    linenos = array('i')
+    indexes = array('I')
+    for symbol_type, name, lineno in symbols:
+        if len(symbol_type) != 1:
+            raise ValueError("Invalid symbol type: %r" % symbol_type)
+        types += symbol_type.encode('ascii')
+        linenos.append(lineno)
+        indexes.append(names.setdefault(name, len(names)))
+    table = sorted(names, key=names.get)
+    return b''.join((
+        _HEADER.pack(MAGIC, len(types), len(table)),
+        bytes(types),
+        _to_little_endian(linenos),
+        _to_little_endian(indexes),
+        _SEPARATOR.join(table).encode('utf-8')))
+
+
+def loads(data):
+    """Decode the data created with dumps. The names are interned so the
+    ones repeated in different files (ie: __init__) are stored once."""
+
+    data = bytes(data)
+    if len(data) < _HEADER.size:
+        raise ValueError("Not a symbols table")
+    magic, count, names_count = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a symbols table")
+    offset = _HEADER.size
+    types = data[offset:offset + count].decode('ascii')
+    offset += count
+    linenos = _from_little_endian('i', data[offset:offset + count * 4])
+    offset += count * 4
+    indexes = _from_little_endian('I', data[offset:offset + count * 4])
+    offset += count * 4
+    table = []
+    if names_count:
+        table = [sys.intern(name)
+                 for name in data[offset:].decode('utf-8').split(_SEPARATOR)]
+    if len(table) != names_count:
+        raise ValueError("Corrupted symbols table")
+    return [(types[i], table[indexes[i]], linenos[i]) for i in range(count)]
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Parse the python sources once for all the tools that need their AST.
+
+The trees are kept in memory by the hash of the source and the version
+of Python (the grammar changes between versions), so the symbols of the
+editor, the analyzer and PyFlakes share one parse for each change of a
+file. The trees and summaries are shared: the callers must not modify
+them. The least recently used trees are dropped when their sources add
+up to more than MAX_SOURCE_SIZE (a tree takes memory in proportion to
+its source).
+
+The summaries built from the trees (ie: the symbols of a module) are
+also stored in a database when set_summaries_db is called, to be
+reused in the next sessions. The database is used only by the process
+that opened it. This module is imported by the worker processes, so it
+must not import anything from the GUI."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import ast
+import sys
+import pickle
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Characters (or bytes) of the sources of the trees kept in memory
+MAX_SOURCE_SIZE = 8 * 1024 * 1024
+# Summaries kept in memory and in the database
+MAX_SUMMARIES = 256
+MAX_STORED_SUMMARIES = 5000
+
+PYTHON_VERSION = '%d.%d' % sys.version_info[:2]
+
+_lock = threading.RLock()
+# {key: (tree, size)}
+_trees = OrderedDict()
+_trees_size = 0
+# {(kind, key): summary}
+_summaries = OrderedDict()
+_db_path = None
+_db_pid = None
+_connection = None
+
+
+def source_hash(source):
+    if not isinstance(source, bytes):
+        source = source.encode('utf-8', 'surrogatepass')
+    return hashlib.sha1(source).hexdigest()
+
+
+def source_key(source):
+    return '%s:%s' % (PYTHON_VERSION, source_hash(source))
+
+
+def parse(source, filename='<unknown>'):
+    """Return the AST of source, like ast.parse. The syntax errors are
+    raised each time (they are not cached)."""
+    global _trees_size
+
+    key = source_key(source)
+    with _lock:
+        entry = _trees.pop(key, None)
+        if entry is not None:
+            _trees[key] = entry
+            return entry[0]
+    tree = compile(source, filename, 'exec', ast.PyCF_ONLY_AST)
+    with _lock:
+        if key not in _trees:
+            _trees[key] = (tree, len(source))
+            _trees_size += len(source)
+        while _trees_size > MAX_SOURCE_SIZE and len(_trees) > 1:
+            _, (_, size) = _trees.popitem(last=False)
+            _trees_size -= size
+    return tree
+
+
+def summary(kind, source, build):
+    """Return the summary of source identified by kind (ie: the options
+    used to build it), calling build(source) only if it isn't cached."""
+
+    key = source_key(source)
+    with _lock:
+        result = _summaries.pop((kind, key), None)
+        if result is None:
+            result = _load_summary(kind, key)
+    if result is None:
+        result = build(source)
+        with _lock:
+            _store_summary(kind, key, result)
+    with _lock:
+        _summaries[(kind, key)] = result
+        while len(_summaries) > MAX_SUMMARIES:
+            _summaries.popitem(last=False)
+    return result
+
+
+def set_summaries_db(db_path):
+    """Store the summaries built by this process in db_path"""
+    global _db_path, _db_pid, _connection
+
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+        _db_path = db_path
+        _db_pid = os.getpid()
+        _connection = None
+
+
+def _get_connection():
+    global _connection
+
+    if _db_path is None or os.getpid() != _db_pid:
+        # Not set, or a worker forked from the process that set it
+        return None
+    if _connection is None:
+        try:
+            _connection = sqlite3.connect(_db_path, check_same_thread=False)
+            _connection.execute("PRAGMA journal_mode=WAL")
+            _connection.execute("PRAGMA synchronous=NORMAL")
+            with _connection:
+                _connection.execute(
+                    "create table if not exists summaries("
+                    "kind text, key text, data blob, "
+                    "PRIMARY KEY (kind, key))")
+                # The summaries replaced last have the highest rowid
+                _connection.execute(
+                    "DELETE FROM summaries WHERE rowid NOT IN (SELECT "
+                    "rowid FROM summaries ORDER BY rowid DESC LIMIT ?)",
+                    (MAX_STORED_SUMMARIES,))
+        except sqlite3.Error:
+            _connection = None
+    return _connection
+
+
+def _load_summary(kind, key):
+    connection = _get_connection()
+    if connection is None:
+        return None
+    try:
+        row = connection.execute(
+            "SELECT data FROM summaries WHERE kind=? AND key=?",
+            (kind, key)).fetchone()
+        if row is not None:
+            return pickle.loads(row[0])
+    except (sqlite3.Error, pickle.UnpicklingError, EOFError):
+        pass
+    return None
+
+
+def _store_summary(kind, key, result):
+    connection = _get_connection()
+    if connection is None:
+        return
+    try:
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO summaries values (?, ?, ?)",
+                (kind, key, sqlite3.Binary(pickle.dumps(result, 2))))
+    except (sqlite3.Error, pickle.PicklingError):
+        pass
+
+
+def clear():
+    """Drop the trees and summaries kept in memory"""
+    global _trees_size
+
+    with _lock:
+        _trees.clear()
+        _trees_size = 0
+        _summaries.clear()
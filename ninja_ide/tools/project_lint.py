@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Lint all the python files of a project in background.
+
+The files are checked with PyFlakes and pycodestyle in a pool of
+processes and the results are stored in a database with the mtime and
+size of each file, so only the files modified since the last run are
+checked again. Like file_search, the functions used by the workers must
+not import the GUI."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import os
+import sqlite3
+import hashlib
+import tokenize
+
+from ninja_ide.tools import file_search
+
+# Wildcards of the files linted
+FILTERS = ('*.py',)
+# Results stored in the database in each transaction
+BATCH_SIZE = 100
+
+PYFLAKES = 'pyflakes'
+PEP8 = 'pep8'
+
+
+def db_name(project_path):
+    """Name of the results database of a project (one per project)."""
+    digest = hashlib.sha1(project_path.encode('utf-8')).hexdigest()
+    return 'lint_%s.db' % digest[:16]
+
+
+def file_stat(file_path):
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_source(file_path):
+    """Return the text of a python file using its declared encoding."""
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(content).readline)
+    except SyntaxError:
+        encoding = 'utf-8'
+    try:
+        return content.decode(encoding, 'replace')
+    except LookupError:
+        return content.decode('utf-8', 'replace')
+
+
+def lint_file(file_path):
+    """Return (file_path, stat, errors), errors is a list of
+    (lineno, kind, message, column) with line numbers starting at 0."""
+    # Imported here, the GUI only needs them once a project is opened
+    from ninja_ide.tools import lint
+    from ninja_ide.tools import style_check
+    stat = file_stat(file_path)
+    source = read_source(file_path)
+    errors = []
+    for lineno, (messages, col) in lint.pyflakes_checks(
+            source, file_path).items():
+        if isinstance(messages, str):
+            messages = [messages]
+        for message in messages:
+            errors.append((lineno, PYFLAKES, message, col))
+    engine = style_check.StyleEngine(file_path)
+    for lineno, (message, col) in engine.check(source).items():
+        errors.append((lineno, PEP8, message, col))
+    errors.sort()
+    return file_path, stat, errors
+
+
+def lint_files(file_paths):
+    """Job executed by the workers"""
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append(lint_file(file_path))
+        except (IOError, OSError):
+            continue
+    return results
+
+
+class LintDatabase(object):
+    """Lint results of a project stored in a sqlite database.
+
+    It must be used from one thread at a time."""
+
+    def __init__(self, db_path):
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "create table if not exists files(path text PRIMARY KEY, "
+            "mtime integer, size integer)")
+        self._connection.execute(
+            "create table if not exists errors(path text, lineno integer, "
+            "kind text, message text, col integer)")
+        self._connection.execute(
+            "create index if not exists errors_path on errors(path)")
+        self._connection.commit()
+
+    def stale(self, file_paths):
+        """Return the files of file_paths not linted since they were
+        modified."""
+        files = {row[0]: tuple(row[1:]) for row in self._connection.execute(
+            "SELECT path, mtime, size FROM files")}
+        stale = []
+        for file_path in file_paths:
+            try:
+                stat = file_stat(file_path)
+            except OSError:
+                continue
+            if files.get(file_path) != stat:
+                stale.append(file_path)
+        return stale
+
+    def update(self, results):
+        """Store the (file_path, stat, errors) returned by lint_file."""
+        with self._connection:
+            for file_path, stat, errors in results:
+                self._remove(file_path)
+                self._connection.execute(
+                    "INSERT INTO files values (?, ?, ?)",
+                    (file_path, stat[0], stat[1]))
+                self._connection.executemany(
+                    "INSERT INTO errors values (?, ?, ?, ?, ?)",
+                    [(file_path,) + error for error in errors])
+
+    def _remove(self, file_path):
+        self._connection.execute(
+            "DELETE FROM files WHERE path=?", (file_path,))
+        self._connection.execute(
+            "DELETE FROM errors WHERE path=?", (file_path,))
+
+    def remove(self, file_paths):
+        with self._connection:
+            for file_path in file_paths:
+                self._remove(file_path)
+
+    def prune(self, seen_paths):
+        """Remove the files not in seen_paths, returns their paths."""
+        removed = [row[0] for row in self._connection.execute(
+            "SELECT path FROM files") if row[0] not in seen_paths]
+        self.remove(removed)
+        return removed
+
+    def errors(self):
+        """Return {file_path: errors} of all the files with errors."""
+        results = {}
+        cur = self._connection.execute(
+            "SELECT path, lineno, kind, message, col FROM errors "
+            "ORDER BY path, lineno")
+        for row in cur:
+            results.setdefault(row[0], []).append(tuple(row[1:]))
+        return results
+
+    def close(self):
+        self._connection.close()
+
+
+class ProjectLint(file_search.FileSearch):
+    """Lint the files of a project spreading the work across processes.
+
+    lint() is a generator returning (file_path, errors) for each file
+    checked (and each file removed, without errors). cancel() can be
+    called from another thread to stop it."""
+
+    def lint(self, root, database):
+        self._cancelled = False
+        file_paths = []
+        for file_path in file_search.iter_files(root, FILTERS):
+            if self._cancelled:
+                return
+            file_paths.append(file_path)
+        results = []
+        for result in self._run(lint_files, database.stale(file_paths)):
+            results.append(result)
+            if len(results) == BATCH_SIZE:
+                database.update(results)
+                results = []
+            yield result[0], result[2]
+        database.update(results)
+        if self._cancelled:
+            return
+        for file_path in database.prune(set(file_paths)):
+            yield file_path, []
+
+    def lint_files(self, file_paths, database):
+        """Check again file_paths (ie: after saving them)."""
+        existing = [path for path in file_paths if os.path.isfile(path)]
+        results = lint_files(existing)
+        database.update(results)
+        database.remove(set(file_paths) - set(existing))
+        checked = {file_path: errors for file_path, _, errors in results}
+        return [(file_path, checked.get(file_path, []))
+                for file_path in file_paths]
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of NINJA-IDE (http://ninja-ide.org).
+#
+# NINJA-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NINJA-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NINJA-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Incremental pycodestyle checks.
+
+The style guide options (and the checks registry) are built once. Each
+StyleEngine remembers the lines of its file, the errors found and the
+state of the checker at the start of each top level statement (the
+"safe points"). When the file changes the checker is restarted from the
+last safe point before the first modified line, and stops as soon as it
+reaches a safe point after the modified lines with the same state it had
+in the previous pass: from there on the old results are still valid."""
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import sys
+import tokenize
+
+from ninja_ide.dependencies import pycodestyle
+
+# Tokens that can't start a safe point (a multiline string would run the
+# physical checks of its lines before the state is saved)
+_NOT_STATEMENT = pycodestyle.SKIP_COMMENTS.union(
+    [tokenize.STRING, tokenize.ENDMARKER])
+
+_options = None
+
+
+def get_options():
+    """Options of the style guide, shared by all the engines."""
+    global _options
+    if _options is None:
+        _options = pycodestyle.StyleGuide(
+            parse_argv=False, config_file='').options
+    return _options
+
+
+class _Report(pycodestyle.BaseReport):
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.expected = ()
+        self.file_errors = 0
+        self.errors = []
+
+    def error(self, line_number, offset, text, check):
+        code = super().error(line_number, offset, text, check)
+        if code:
+            self.errors.append((line_number, offset + 1, code, text[5:]))
+        return code
+
+
+class _IncrementalChecker(pycodestyle.Checker):
+    """pycodestyle Checker able to start in a safe point of the file"""
+
+    def __init__(self, filename, lines, options):
+        super().__init__(filename, lines=lines, options=options,
+                         report=_Report(options))
+        self._row_offset = 0
+
+    def _state(self):
+        return (self.indent_char, self.indent_level,
+                self.previous_indent_level, self.previous_logical,
+                self.previous_unindented_logical_line, self.blank_lines,
+                self.blank_before,
+                {name: dict(state)
+                 for name, state in self._checker_states.items()})
+
+    def _restore(self, state):
+        (self.indent_char, self.indent_level, self.previous_indent_level,
+         self.previous_logical, self.previous_unindented_logical_line,
+         self.blank_lines, self.blank_before, checker_states) = state
+        self._checker_states = {name: dict(state)
+                                for name, state in checker_states.items()}
+
+    def report_invalid_syntax(self):
+        """Like the original one, with the row relative to the file."""
+        exc = sys.exc_info()[1]
+        if len(exc.args) > 1 and self._row_offset:
+            offset = exc.args[1]
+            if len(offset) > 2:
+                offset = offset[1:3]
+            exc.args = (exc.args[0], (offset[0] + self._row_offset,
+                                      offset[1]))
+        super().report_invalid_syntax()
+
+    def generate_tokens(self):
+        """Like the original one, with the rows relative to the file."""
+        offset = self._row_offset
+        tokengen = tokenize.generate_tokens(self.readline)
+        try:
+            for token in tokengen:
+                if offset:
+                    token = tokenize.TokenInfo(
+                        token[0], token[1],
+                        (token[2][0] + offset, token[2][1]),
+                        (token[3][0] + offset, token[3][1]), token[4])
+                if token[2][0] > self.total_lines:
+                    return
+                self.noqa = token[4] and pycodestyle.noqa(token[4])
+                self.maybe_check_physical(token)
+                yield token
+        except (SyntaxError, tokenize.TokenError):
+            self.report_invalid_syntax()
+
+    def run(self, start_row=1, state=None, stop=None):
+        """Check the lines from start_row (a safe point with that state)
+        until the end or until stop(row, state) returns True in a safe
+        point. Returns (stop_row or None, {row: state} of safe points)."""
+
+        self.total_lines = len(self.lines)
+        self.line_number = start_row - 1
+        self._row_offset = start_row - 1
+        if state is None:
+            self.indent_char = None
+            self.indent_level = self.previous_indent_level = 0
+            self.previous_logical = ''
+            self.previous_unindented_logical_line = ''
+            self.blank_lines = self.blank_before = 0
+        else:
+            self._restore(state)
+        self.tokens = []
+        safe_points = {}
+        parens = 0
+        for token in self.generate_tokens():
+            token_type, text = token[0:2]
+            if not parens and token[2][1] == 0 and \
+                    token_type not in _NOT_STATEMENT and \
+                    all(t[0] == tokenize.DEDENT for t in self.tokens):
+                row = token[2][0]
+                state = self._state()
+                if row > start_row and stop is not None and stop(row, state):
+                    return row, safe_points
+                safe_points[row] = state
+            # The same loop of Checker.check_all
+            self.tokens.append(token)
+            if token_type == tokenize.OP:
+                if text in '([{':
+                    parens += 1
+                elif text in '}])':
+                    parens -= 1
+            elif not parens:
+                if token_type in pycodestyle.NEWLINE:
+                    if token_type == tokenize.NEWLINE:
+                        self.check_logical()
+                        self.blank_before = 0
+                    elif len(self.tokens) == 1:
+                        # The physical line contains only this token.
+                        self.blank_lines += 1
+                        del self.tokens[0]
+                    else:
+                        self.check_logical()
+                elif pycodestyle.COMMENT_WITH_NL and \
+                        token_type == tokenize.COMMENT:
+                    if len(self.tokens) == 1:
+                        # The comment also ends a physical line
+                        token = list(token)
+                        token[1] = text.rstrip('\r\n')
+                        token[3] = (token[2][0], token[2][1] + len(token[1]))
+                        self.tokens = [tuple(token)]
+                        self.check_logical()
+        if self.tokens:
+            self.check_physical(self.lines[-1])
+            self.check_logical()
+        return None, safe_points
+
+
+class StyleEngine(object):
+    """Check the style of a file keeping the results between passes."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lines = None
+        # {row: [(col, code, text)]}, rows start at 1
+        self._errors = {}
+        self._safe_points = {}
+        # Rows checked in the last pass (first, last), for the stats
+        self.last_pass = None
+
+    def check(self, source):
+        """Return {lineno: (message, column)} for source, line numbers
+        start at 0 (like the checks of the editor)."""
+        lines = source.splitlines(True)
+        options = get_options()
+        if self._lines is None or options.ast_checks:
+            self._full_pass(lines)
+        elif lines != self._lines:
+            self._partial_pass(lines)
+        checks = {}
+        for row, errors in self._errors.items():
+            col, code, text = errors[-1]
+            checks[row - 1] = ('[PEP8] %s: %s' % (code, text), col)
+        return checks
+
+    def _checker(self, lines):
+        # The checker strips the BOM of the lines received
+        return _IncrementalChecker(self.filename, list(lines), get_options())
+
+    def _full_pass(self, lines):
+        checker = self._checker(lines)
+        _, self._safe_points = checker.run()
+        self._errors = self._group(checker.report.errors)
+        self._lines = lines
+        self.last_pass = (1, len(lines))
+
+    def _partial_pass(self, lines):
+        old_lines = self._lines
+        shift = len(lines) - len(old_lines)
+        limit = min(len(lines), len(old_lines))
+        prefix = 0
+        while prefix < limit and lines[prefix] == old_lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and \
+                lines[-1 - suffix] == old_lines[-1 - suffix]:
+            suffix += 1
+        # Rows (1-based) of the first line changed and the first one of
+        # the unchanged end of the new file
+        changed_end = len(lines) - suffix + 1
+        # The last line is always checked again (W391, W292)
+        first_changed = min(prefix + 1, len(lines))
+        # Before the first changed line: its indentation is compared with
+        # the lines above it by the tokenizer
+        start = max([row for row in self._safe_points
+                     if row < first_changed], default=None)
+        if start is None or self._tokenize_failed():
+            self._full_pass(lines)
+            return
+        old_safe_points = self._safe_points
+
+        def converged(row, state):
+            if row < changed_end:
+                return False
+            return old_safe_points.get(row - shift) == state
+
+        checker = self._checker(lines)
+        stop, safe_points = checker.run(start, old_safe_points[start],
+                                        converged)
+        errors = self._group(checker.report.errors)
+        for row, row_errors in self._errors.items():
+            if row < start:
+                errors[row] = row_errors
+            elif stop is not None and row + shift >= stop:
+                errors[row + shift] = row_errors
+        for row, state in old_safe_points.items():
+            if row < start:
+                safe_points[row] = state
+            elif stop is not None and row + shift >= stop:
+                safe_points[row + shift] = state
+        self._errors = errors
+        self._safe_points = safe_points
+        self._lines = lines
+        self.last_pass = (start, (stop - 1) if stop else len(lines))
+        if self._tokenize_failed():
+            # The tokenizer stops at the error, the rest isn't checked
+            self._full_pass(lines)
+
+    def _tokenize_failed(self):
+        return any(code in ('E901', 'E902')
+                   for row_errors in self._errors.values()
+                   for _, code, _ in row_errors)
+
+    @staticmethod
+    def _group(errors):
+        grouped = {}
+        for row, col, code, text in errors:
+            grouped.setdefault(row, []).append((col, code, text))
+        return grouped
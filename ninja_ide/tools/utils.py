@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import ctypes
 import sys
 import os
 from PyQt5.QtCore import (
@@ -33,6 +34,36 @@ def get_python():
         return found
 
 
+def get_rss():
+    """Return the resident memory of this process in bytes, None if it
+    can't be read on this platform"""
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def _load_malloc_trim():
+    # The symbols of the process, libc included: find_library('c') would
+    # run ldconfig in a subprocess
+    try:
+        return ctypes.CDLL(None).malloc_trim
+    except (OSError, AttributeError, TypeError):
+        return None
+
+
+_malloc_trim = _load_malloc_trim()
+
+
+def trim_memory():
+    """Give the heap memory already freed back to the system, the C
+    allocator keeps it otherwise. Does nothing without glibc"""
+    if _malloc_trim is not None:
+        _malloc_trim(0)
+
+
 class SignalFlowControl(QObject):
     def __init__(self):
         self.__stop = False
@@ -533,6 +533,17 @@ TR_PREFERENCES_GENERAL_EXTERNALLY_MOD = tr(
     "NINJA-IDE", "Externally Modification:")
 TR_PREFERENCES_GENERAL_EXTERNALLY_MOD_LABEL = tr(
     "NINJA-IDE", "When files are externally modified:")
+TR_PREFERENCES_GENERAL_MEMORY = tr("NINJA-IDE", "Memory:")
+TR_PREFERENCES_GENERAL_HIBERNATE_AFTER = tr(
+    "NINJA-IDE", "Hibernate the unmodified editors not used for:")
+TR_PREFERENCES_GENERAL_MEMORY_BUDGET = tr(
+    "NINJA-IDE", "Hibernate the least used editors above:")
+TR_PREFERENCES_GENERAL_NEVER = tr("NINJA-IDE", "Never")
+TR_PREFERENCES_GENERAL_NO_LIMIT = tr("NINJA-IDE", "No limit")
+TR_EDITORS_HIBERNATED = tr("NINJA-IDE", "%d hibernated, %s reclaimed")
+TR_EDITORS_HIBERNATED_TOOLTIP = tr(
+    "NINJA-IDE",
+    "Editors released to save memory, they are loaded again when shown")
 TR_PREFERENCES_GENERAL_SELECT_WORKSPACE = tr("NINJA-IDE", "Select Workspace")
 TR_PREFERENCES_GENERAL_SELECT_PYTHON_PATH = tr(
     "NINJA-IDE",
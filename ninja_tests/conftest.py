@@ -0,0 +1,12 @@
+import pytest
+
+from ninja_ide import resources
+from ninja_ide.tools import json_manager
+
+EDITOR_SCHEME = json_manager.load_editor_schemes()['Ninja Dark']
+
+
+@pytest.fixture(autouse=True)
+def color_scheme(monkeypatch):
+    """The colors of the editor, as loaded by the IDE on startup"""
+    monkeypatch.setattr(resources, 'COLOR_SCHEME', EDITOR_SCHEME)
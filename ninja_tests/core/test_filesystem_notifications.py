@@ -0,0 +1,172 @@
+import os
+
+import pytest
+
+from ninja_ide.core.file_handling.filesystem_notifications import base_watcher
+
+ADDED = base_watcher.ADDED
+DELETED = base_watcher.DELETED
+MODIFIED = base_watcher.MODIFIED
+
+
+def test_coalesce_events():
+    events = [
+        (ADDED, '/p/a.py'),
+        (MODIFIED, '/p/a.py'),
+        (MODIFIED, '/p/b.py'),
+        (ADDED, '/p/tmp'),
+        (MODIFIED, '/p/b.py'),
+        (DELETED, '/p/tmp'),
+        (DELETED, '/p/c.py'),
+        (ADDED, '/p/c.py'),
+    ]
+    assert base_watcher.coalesce_events(events) == [
+        (ADDED, '/p/a.py'), (MODIFIED, '/p/b.py'), (MODIFIED, '/p/c.py')]
+
+
+def test_ignore_rules():
+    rules = base_watcher.IgnoreRules('/p', [
+        '# comment', '*.pyc', 'build/', '/docs/_build', '*.log',
+        '!keep.log'])
+    assert rules.match('/p/.git/objects', True)
+    assert rules.match('/p/pkg/mod.pyc')
+    assert not rules.match('/p/pkg/mod.py')
+    assert rules.match('/p/build', True)
+    assert rules.match('/p/pkg/build/mod.py')
+    # Only folders
+    assert not rules.match('/p/build')
+    assert rules.match('/p/docs/_build/index.html')
+    assert not rules.match('/p/pkg/docs/_build/index.html')
+    assert rules.match('/p/error.log')
+    assert not rules.match('/p/keep.log')
+    assert not rules.match('/other/mod.pyc')
+
+
+def test_ignore_rules_for_project(tmpdir):
+    tmpdir.join('.gitignore').write('*.tmp\n')
+    rules = base_watcher.IgnoreRules.for_project(str(tmpdir))
+    assert rules.match(str(tmpdir.join('a.tmp')))
+    assert not rules.match(str(tmpdir.join('a.py')))
+
+
+def test_inotify_engine(qtbot, tmpdir):
+    pytest.importorskip('pyinotify')
+    from ninja_ide.core.file_handling.filesystem_notifications import linux
+    tmpdir.join('.gitignore').write('*.tmp\n')
+    root = str(tmpdir)
+    engine = linux.InotifyEngine()
+    batches = []
+    engine.eventsReady.connect(batches.append)
+    engine.start()
+    assert engine.watch(root, base_watcher.IgnoreRules.for_project(root))
+    try:
+        os.mkdir(os.path.join(root, 'pkg'))
+        for i in range(100):
+            tmpdir.join('pkg', 'mod%d.py' % i).write('x = %d\n' % i)
+        tmpdir.join('a.tmp').write('ignored')
+        qtbot.waitUntil(lambda: sum(len(b) for b in batches) >= 101)
+    finally:
+        engine.stop()
+    events = [event for batch in batches for event in batch]
+    assert len(batches) < 10
+    assert (ADDED, os.path.join(root, 'pkg', 'mod99.py')) in events
+    assert not any(path.endswith('.tmp') for _, path in events)
+
+
+def test_inotify_engine_skips_ignored_folders(tmpdir):
+    pytest.importorskip('pyinotify')
+    from ninja_ide.core.file_handling.filesystem_notifications import linux
+    tmpdir.join('.gitignore').write('build/\n')
+    tmpdir.ensure('.git', 'objects', 'ab', dir=True)
+    tmpdir.ensure('build', 'lib', dir=True)
+    tmpdir.ensure('pkg', 'sub', dir=True)
+    root = str(tmpdir)
+    engine = linux.InotifyEngine()
+    walked = []
+    add_watch = engine._watch_manager.add_watch
+    engine._watch_manager.add_watch = lambda path, *args, **kwargs: (
+        walked.append(path) or add_watch(path, *args, **kwargs))
+    try:
+        assert engine.watch(root, base_watcher.IgnoreRules.for_project(root))
+    finally:
+        engine.unwatch(root)
+    assert sorted(walked) == [root, str(tmpdir.join('pkg')),
+                              str(tmpdir.join('pkg', 'sub'))]
+
+
+def _touch(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_open_files_tracker(qtbot, tmpdir):
+    tracker = base_watcher.OpenFilesTracker()
+    path = str(tmpdir.join('mod.py'))
+    other = str(tmpdir.join('other.py'))
+    tmpdir.join('mod.py').write('x = 1\n')
+    tmpdir.join('other.py').write('y = 1\n')
+    calls = []
+    tracker.watch(path, lambda *args: calls.append(('first',) + args))
+    tracker.watch(path, lambda *args: calls.append(('second',) + args))
+    tracker.watch(other, lambda *args: calls.append(('other',) + args))
+    assert sorted(tracker._watcher.files()) == [path, other]
+    with qtbot.waitSignal(tracker.filesChanged) as blocker:
+        tmpdir.join('mod.py').write('x = 2\n')
+        _touch(path)
+        tmpdir.join('other.py').write('y = 2\n')
+        _touch(other)
+    assert blocker.args[0] == [(MODIFIED, path), (MODIFIED, other)]
+    assert sorted(calls) == [('first', MODIFIED, path),
+                             ('other', MODIFIED, other),
+                             ('second', MODIFIED, path)]
+    # Same content, only the mtime changed
+    with qtbot.assertNotEmitted(tracker.filesChanged, wait=500):
+        _touch(path)
+    # Saved by the IDE
+    with qtbot.assertNotEmitted(tracker.filesChanged, wait=500):
+        tmpdir.join('other.py').write('y = 3\n')
+        _touch(other)
+        tracker.update(other)
+    with qtbot.waitSignal(tracker.filesChanged) as blocker:
+        os.remove(other)
+    assert blocker.args[0] == [(DELETED, other)]
+
+
+def test_nfile_external_changes(qtbot, tmpdir):
+    from ninja_ide.core.file_handling.nfile import NFile
+    path = str(tmpdir.join('mod.py'))
+    tmpdir.join('mod.py').write('x = 1\n')
+    nfile = NFile(path)
+    clone = NFile(path)
+    nfile.start_watching()
+    clone.start_watching()
+    tracker = base_watcher.get_tracker()
+    assert tracker._watcher.files().count(path) == 1
+    with qtbot.assertNotEmitted(nfile.fileChanged, wait=500):
+        nfile.save('x = 2\n')
+    with qtbot.waitSignals([nfile.fileChanged, clone.fileChanged]):
+        tmpdir.join('mod.py').write('x = 3\n')
+        _touch(path)
+    nfile.remove_watcher()
+    clone.remove_watcher()
+    assert not tracker.is_watched(path)
+
+
+def test_nfile_watched_without_reading_again(qtbot, tmpdir, monkeypatch):
+    from ninja_ide.core.file_handling.nfile import NFile
+    path = str(tmpdir.join('mod.py'))
+    tmpdir.join('mod.py').write('x = 1\r\ny = 2\n')
+    read = []
+    file_digest = base_watcher.file_digest
+    monkeypatch.setattr(base_watcher, 'file_digest',
+                        lambda path: read.append(path) or file_digest(path))
+    nfile = NFile(path)
+    assert nfile.read() == 'x = 1\ny = 2\n'
+    nfile.start_watching()
+    nfile.save('x = 2\n')
+    assert read == []
+    # Only the mtime changed, the content is the one saved
+    with qtbot.assertNotEmitted(nfile.fileChanged, wait=500):
+        _touch(path)
+    assert read == [path]
+    nfile.remove_watcher()
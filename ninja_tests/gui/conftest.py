@@ -0,0 +1,37 @@
+import pytest
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QWidget
+
+from ninja_ide.extensions import handlers
+from ninja_ide.gui.editor import editor
+from ninja_ide.gui.ide import IDE
+from ninja_ide.utils import theme
+
+
+class MainContainer(QObject):
+
+    fileOpened = pyqtSignal('QString')
+
+    def __init__(self):
+        super().__init__()
+        self.splitter = QWidget()
+        self.created = []
+
+    def create_editor_from_editable(self, editable):
+        self.created.append(editable.file_path)
+        return editor.create_editor(editable)
+
+    def current_editor_changed(self, filename):
+        pass
+
+
+@pytest.fixture
+def main_container(qtbot, monkeypatch):
+    """A main container registered in the IDE services, it records the
+    files of the editors it creates"""
+    handlers.init_basic_handlers()
+    monkeypatch.setitem(theme.COLORS, 'IconBaseColor', '#ffffff')
+    container = MainContainer()
+    monkeypatch.setitem(IDE._IDE__IDESERVICES, 'main_container', container)
+    qtbot.addWidget(container.splitter)
+    return container
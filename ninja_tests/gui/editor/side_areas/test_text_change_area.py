@@ -0,0 +1,81 @@
+from PyQt5.QtGui import QTextCursor
+
+from ninja_ide.gui.editor.side_area import text_change_area
+from ninja_ide.gui.editor.side_area.text_change_area import (
+    LineChanges,
+    UNSAVED,
+    SAVED
+)
+from ninja_tests.gui.editor import create_editor
+
+
+def get_text_change_area(text):
+    editor = create_editor()
+    editor.text = text
+    area = text_change_area.TextChangeArea(editor)
+    return editor, area
+
+
+def insert_at(editor, lineno, text):
+    cursor = QTextCursor(editor.document().findBlockByNumber(lineno))
+    cursor.insertText(text)
+
+
+def test_line_changes_edit_and_revert():
+    changes = LineChanges(['a', 'b', 'c'])
+    changes.replace(1, 1, ['bx'])
+    assert changes.lines(UNSAVED) == [1]
+    changes.replace(1, 1, ['b'])
+    assert changes.lines(UNSAVED) == []
+
+
+def test_line_changes_insert_and_remove():
+    changes = LineChanges(['a', 'b', 'c'])
+    changes.replace(1, 1, ['b', 'new', 'other'])
+    assert len(changes) == 5
+    assert changes.lines(UNSAVED) == [2, 3]
+    changes.replace(1, 3, ['b'])
+    assert len(changes) == 3
+    assert changes.lines(UNSAVED) == []
+
+
+def test_line_changes_save():
+    changes = LineChanges(['a', 'b', 'c'])
+    changes.replace(0, 1, ['ax'])
+    changes.save(['ax', 'b', 'c'])
+    assert changes.lines(SAVED) == [0]
+    assert changes.lines(UNSAVED) == []
+    changes.replace(0, 1, ['a'])
+    assert changes.lines(UNSAVED) == [0]
+    assert changes.lines(SAVED) == []
+
+
+def test_area_tracks_edits(qtbot):
+    editor, area = get_text_change_area('one\ntwo\nthree\nfour')
+    insert_at(editor, 1, 'new line\n')
+    insert_at(editor, 3, 'x')
+    assert area.changes.lines(UNSAVED) == [1, 3]
+    editor.undo()
+    editor.undo()
+    assert area.changes.lines(UNSAVED) == []
+
+
+def test_area_tracks_multiline_removal(qtbot):
+    editor, area = get_text_change_area('one\ntwo\nthree\nfour')
+    cursor = QTextCursor(editor.document().findBlockByNumber(1))
+    cursor.movePosition(QTextCursor.Down, QTextCursor.KeepAnchor, 2)
+    cursor.removeSelectedText()
+    assert editor.text == 'one\nfour'
+    assert len(area.changes) == 2
+    assert area.changes.lines(UNSAVED) == []
+
+
+def test_area_saved_and_reloaded(qtbot):
+    editor, area = get_text_change_area('one\ntwo\nthree')
+    insert_at(editor, 2, 'x')
+    editor.neditable.fileSaved.emit(editor.neditable)
+    assert area.changes.lines(SAVED) == [2]
+    editor.text = 'other\ntext'
+    assert len(area.changes) == 2
+    assert area.changes.lines(SAVED) == []
+    assert area.changes.lines(UNSAVED) == []
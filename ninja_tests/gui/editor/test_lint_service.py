@@ -0,0 +1,92 @@
+from ninja_ide.core import settings
+from ninja_ide.gui.editor.checkers import errors_checker
+from ninja_ide.gui.editor.checkers import pep8_checker
+from ninja_ide.gui.editor.checkers import lint_service
+from ninja_ide.tools import lint
+
+
+class Editor(object):
+
+    file_path = 'a.py'
+    text = 'import os\n'
+
+
+class Document(object):
+
+    def __init__(self):
+        self.results = []
+
+    def callback(self, version, checks):
+        self.results.append((version, checks))
+
+
+def test_pyflakes_checks():
+    checks = lint.pyflakes_checks("import os\n\nx = y\n", "a.py")
+    assert sorted(checks) == [0, 2]
+    assert checks[2] == (["undefined name 'y'"], 4)
+    checks = lint.pyflakes_checks("def f(:\n", "a.py")
+    assert list(checks) == [0]
+
+
+def test_cached_and_stale_snapshots(qtbot):
+    service = lint_service.LintService()
+    document = Document()
+    service.check(document, lint.pyflakes_checks, "a.py", 1, "import os\n",
+                  document.callback)
+    # Newer snapshots while the first one is checked, only the last counts
+    service.check(document, lint.pyflakes_checks, "a.py", 2, "x = y\n",
+                  document.callback)
+    service.check(document, lint.pyflakes_checks, "a.py", 3, "import sys\n",
+                  document.callback)
+    qtbot.waitUntil(lambda: len(document.results) == 3, timeout=10000)
+    # Every snapshot is answered, the dropped one without being checked
+    assert [version for version, _ in document.results] == [2, 1, 3]
+    assert document.results[0][1] == {}
+    assert document.results[2][1][0][0] == ["'sys' imported but unused"]
+    # Same source, the cached results are returned right away
+    service.check(document, lint.pyflakes_checks, "a.py", 4, "import sys\n",
+                  document.callback)
+    assert document.results[-1] == (4, document.results[2][1])
+    service.shutdown()
+
+
+def test_finished_once_for_each_run(qtbot, monkeypatch):
+    monkeypatch.setitem(settings.SYNTAX, 'python', {'extension': ['py']})
+    monkeypatch.setattr(lint_service, '_service', lint_service.LintService())
+    editor = Editor()
+    checker = errors_checker.ErrorsChecker(editor)
+    finished = []
+    checker.finished.connect(lambda: finished.append(checker.checks))
+    # Checked together after CHECK_DELAY
+    checker.run_checks()
+    checker.run_checks()
+    assert len(finished) == 1
+    qtbot.waitUntil(lambda: len(finished) == 2, timeout=10000)
+    assert list(finished[1]) == [0]
+    # A snapshot replaced while the first one is checked
+    for text in ('import sys\n', 'x = y\n', 'x = 1\n'):
+        editor.text = text
+        checker._check()
+    qtbot.waitUntil(lambda: len(finished) == 5, timeout=10000)
+    assert checker.checks == {}
+    lint_service.get_service().shutdown()
+
+
+def test_style_checks_delayed(qtbot, monkeypatch):
+    monkeypatch.setitem(settings.SYNTAX, 'python', {'extension': ['py']})
+    monkeypatch.setattr(lint_service, '_service', lint_service.LintService())
+    monkeypatch.setattr(pep8_checker.Pep8Checker, 'CHECK_DELAY', 50)
+    editor = Editor()
+    checker = pep8_checker.Pep8Checker(editor)
+    finished = []
+    checker.finished.connect(lambda: finished.append(dict(checker.checks)))
+    # One snapshot for the calls made in CHECK_DELAY
+    for text in ('x=1\n', 'x=2\n', 'x = 3\n'):
+        editor.text = text
+        checker.run_checks()
+    assert len(finished) == 2
+    assert checker._version == 0
+    qtbot.waitUntil(lambda: len(finished) == 3, timeout=10000)
+    assert checker._version == 1
+    assert finished[2] == {}
+    lint_service.get_service().shutdown()
@@ -0,0 +1,70 @@
+from PyQt5.QtGui import QTextCursor, QTextDocument
+
+from ninja_ide.gui.editor.match_engine import MatchEngine
+from ninja_tests.gui.editor import create_editor
+
+
+def create_engine(text):
+    document = QTextDocument()
+    document.setPlainText(text)
+    # contentsChange is emitted only by documents with a layout
+    document.documentLayout()
+    return document, MatchEngine(document)
+
+
+def test_find_plain_text():
+    _, engine = create_engine('a(b) = A(b)\nfoo(b)')
+    assert engine.find('a(b)') == [(0, 4), (7, 11)]
+    assert engine.find('a(b)', case_sensitive=True) == [(0, 4)]
+    assert engine.find('') == []
+
+
+def test_find_whole_word():
+    _, engine = create_engine('name names _name name2 name.name')
+    assert engine.find('name', whole_word=True) == [
+        (0, 4), (23, 27), (28, 32)]
+
+
+def test_results_updated_on_change():
+    document, engine = create_engine('one two one')
+    assert len(engine.find('one')) == 2
+    QTextCursor(document).insertText('one ')
+    assert engine.find('one') == [(0, 3), (4, 7), (12, 15)]
+
+
+def test_index_and_range():
+    _, engine = create_engine('x\n' * 10)
+    results = engine.find('x')
+    assert engine.index(results, 0) == 0
+    assert engine.index(results, 3) == 2
+    assert engine.in_range(results, 1, 7) == [(2, 3), (4, 5), (6, 7)]
+    assert engine.in_range(results, 5, 6) == []
+
+
+def test_lines():
+    _, engine = create_engine('a a\nb\na\n\na')
+    assert engine.lines(engine.find('a')) == [0, 2, 4]
+
+
+def test_editor_find_matches(qtbot):
+    editor = create_editor()
+    editor.text = '\n'.join(['search this'] * 1000)
+    editor.resize(400, 200)
+    index, results = editor.find_matches('search')
+    assert index == 1
+    assert len(results) == 1000
+    selections = editor.extra_selections('searchs')
+    # Only the visible matches are highlighted
+    assert 0 < len(selections) < 100
+    editor.verticalScrollBar().setValue(500)
+    first = editor.extra_selections('searchs')[0]
+    assert first.cursor.blockNumber() >= 500
+    editor.clear_extra_selections('searchs')
+    editor.verticalScrollBar().setValue(0)
+    assert editor.extra_selections('searchs') == []
+
+
+def test_lines_grouped():
+    _, engine = create_engine('a\n' * 100)
+    results = engine.find('a')
+    assert engine.lines(results, 10) == list(range(0, 100, 10))
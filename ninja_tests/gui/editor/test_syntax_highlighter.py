@@ -0,0 +1,77 @@
+from ninja_ide.tools import json_manager
+from ninja_tests.gui.editor import create_editor
+
+json_manager.load_syntax()
+
+SOURCE = '''
+def function(argument):
+    """Docstring
+    of several lines"""
+    return argument + 1  # comment
+
+
+class Example(object):
+    value = 'string'
+'''
+
+
+def formats(editor):
+    result = []
+    block = editor.document().begin()
+    while block.isValid():
+        result.append([
+            (fmt.start, fmt.length, fmt.format.foreground().color().name())
+            for fmt in block.layout().formats()])
+        block = block.next()
+    return result
+
+
+def test_pending_blocks_formatted_in_idle_time(qtbot):
+    reference = create_editor('python')
+    reference.text = SOURCE * 50
+    editor = create_editor('python')
+    # Only the visible block is formatted when the text is set
+    editor._highlighter.SYNC_TIME = 0
+    editor.text = SOURCE * 50
+    assert editor._highlighter.has_pending_blocks()
+    assert formats(editor) != formats(reference)
+    qtbot.waitUntil(lambda: not editor._highlighter.has_pending_blocks())
+    assert formats(editor) == formats(reference)
+
+
+def test_visible_blocks_formatted_first(qtbot):
+    editor = create_editor('python')
+    editor._highlighter.SYNC_TIME = 0
+    editor._highlighter.IDLE_SLICE = 0
+    editor.text = SOURCE * 50
+    document = editor.document()
+    first = document.findBlockByNumber(300)
+    editor._highlighter.set_visible_blocks(
+        first, document.findBlockByNumber(310))
+    assert first.layout().formats()
+    assert not document.findBlockByNumber(200).layout().formats()
+
+
+def test_blocks_highlighted_again_with_the_same_state_not_scanned(qtbot):
+    reference = create_editor('python')
+    reference.text = SOURCE * 5
+    editor = create_editor('python')
+    editor._highlighter.SYNC_TIME = 10
+    editor.text = SOURCE * 5
+    cursor = editor.textCursor()
+    cursor.insertText("'''")
+    # The following blocks are inside a string now
+    assert formats(editor) != formats(reference)
+    scanned = []
+    scan_partitions = editor._highlighter.scan_partitions
+
+    def scan(state, text):
+        scanned.append(text)
+        return scan_partitions(state, text)
+
+    editor._highlighter.scan_partitions = scan
+    cursor.insertText("'''")
+    # Only the edited block is scanned, the others were already
+    # highlighted after the same states
+    assert scanned == ["''''''\n"]
+    assert formats(editor)[1:] == formats(reference)[1:]
@@ -0,0 +1,89 @@
+import os
+
+from ninja_ide.core.file_handling import nfile
+from ninja_ide.gui.editor import neditable
+from ninja_ide.gui.main_panel import combo_editor
+
+
+def restored_editable(path, cursor_position):
+    editable = neditable.NEditable(nfile.NFile(path))
+    # The checkers don't run for a file not modified since the session
+    editable.restore(cursor_position, os.path.getmtime(path))
+    return editable
+
+
+def test_restored_files_loaded_when_shown(qtbot, tmp_path, monkeypatch,
+                                          main_container):
+    monkeypatch.setattr(combo_editor.ComboEditor, 'PREFETCH_EDITORS', 1)
+    monkeypatch.setattr(combo_editor.ComboEditor, 'PREFETCH_DELAY', 0)
+    combo = combo_editor.ComboEditor(original=True)
+    qtbot.addWidget(combo)
+    editables = []
+    for number in range(4):
+        path = tmp_path / 'module{}.py'.format(number)
+        path.write_text('\n'.join('x{} = {}'.format(n, n) for n in range(50)))
+        editable = restored_editable(str(path), (number * 10, 2))
+        editables.append(editable)
+        combo.add_editor(editable, keep_index=True)
+    assert combo.count() == 4
+    assert main_container.created == []
+    assert all(editable.editor is None for editable in editables)
+    assert editables[2].cursor_position == (20, 2)
+
+    combo.set_current(editables[2])
+    assert main_container.created == [editables[2].file_path]
+    current = combo.current_editor()
+    assert current is editables[2].editor
+    assert combo.stacked.indexOf(current) == 2
+    assert current.cursor_position == (20, 2)
+    assert current.text.startswith('x0 = 0\n')
+    # The next file is loaded after a while
+    qtbot.waitUntil(lambda: editables[3].editor is not None)
+    assert combo.current_editor() is current
+    assert editables[0].editor is None and editables[1].editor is None
+
+    # The first file is the current one in the combo, but not loaded
+    combo.set_current(editables[0])
+    assert combo.current_editor() is editables[0].editor
+    assert combo.current_editor().cursor_position == (0, 2)
+    assert combo.bar.get_editables() == editables
+
+    # Closed without being loaded
+    editables[1].nfile.close()
+    assert combo.count() == 3
+    assert combo.bar.get_editables() == [editables[i] for i in (0, 2, 3)]
+
+
+def test_restored_file_missing_when_shown(qtbot, tmp_path, main_container):
+    combo = combo_editor.ComboEditor(original=True)
+    qtbot.addWidget(combo)
+    editables = []
+    for number in range(2):
+        path = tmp_path / 'module{}.py'.format(number)
+        path.write_text('x = 1\n')
+        editable = restored_editable(str(path), (0, 0))
+        editables.append(editable)
+        combo.add_editor(editable, keep_index=True)
+    (tmp_path / 'module1.py').unlink()
+    combo.set_current(editables[1])
+    # Closed, like the missing files when the session is restored
+    assert combo.count() == 1
+    assert combo.bar.get_editables() == [editables[0]]
+    assert editables[1].editor is None
+    assert main_container.created == [editables[0].file_path]
+
+
+def test_restored_file_without_mtime_checked(qtbot, tmp_path, monkeypatch,
+                                             main_container):
+    checked = []
+    monkeypatch.setattr(neditable.NEditable, 'run_checkers',
+                        lambda self, content: checked.append(content))
+    path = tmp_path / 'module.py'
+    path.write_text('x = 1\n')
+    editable = restored_editable(str(path), (0, 0))
+
+    def getmtime(path):
+        raise OSError(path)
+    monkeypatch.setattr(neditable.os.path, 'getmtime', getmtime)
+    main_container.create_editor_from_editable(editable)
+    assert checked == ['x = 1\n']
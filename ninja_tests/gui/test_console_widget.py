@@ -0,0 +1,50 @@
+from PyQt5.QtCore import Qt
+
+from ninja_ide.gui.tools_dock import console_widget
+from ninja_ide.utils import theme
+
+
+def write(qtbot, widget, command):
+    qtbot.keyClicks(widget, command)
+    qtbot.keyClick(widget, Qt.Key_Return)
+    qtbot.waitUntil(lambda: not widget._console.busy, timeout=10000)
+
+
+def test_output_written_below_the_command(qtbot, monkeypatch):
+    monkeypatch.setitem(theme.COLORS, 'IconBaseColor', '#ffffff')
+    widget = console_widget.ConsoleWidget()
+    qtbot.addWidget(widget)
+    try:
+        write(qtbot, widget, 'print(6 * 7)')
+        lines = widget.toPlainText().splitlines()
+        assert lines == ['❭ print(6 * 7)', '42', '❭ ']
+        write(qtbot, widget, 'name_in_console = 1')
+        qtbot.keyClicks(widget, 'name_in_con')
+        qtbot.keyClick(widget, Qt.Key_Tab)
+        qtbot.waitUntil(
+            lambda: widget.document().lastBlock().text().endswith('sole'),
+            timeout=10000)
+        assert widget.document().lastBlock().text() == '❭ name_in_console'
+    finally:
+        widget._console.shutdown()
+
+
+def test_completions_keep_the_continuation_prompt(qtbot, monkeypatch):
+    monkeypatch.setitem(theme.COLORS, 'IconBaseColor', '#ffffff')
+    widget = console_widget.ConsoleWidget()
+    qtbot.addWidget(widget)
+    try:
+        write(qtbot, widget, 'import os')
+        write(qtbot, widget, 'if True:')
+        assert widget.document().lastBlock().text() == '... '
+        qtbot.keyClicks(widget, '    os.pa')
+        qtbot.keyClick(widget, Qt.Key_Tab)
+        qtbot.waitUntil(
+            lambda: widget.document().blockCount() == 5, timeout=10000)
+        # The options, then the line of the command being written
+        lines = widget.toPlainText().splitlines()
+        assert 'path' in lines[-2].split()
+        assert lines[-1] == '...     os.pa'
+        assert widget._incomplete
+    finally:
+        widget._console.shutdown()
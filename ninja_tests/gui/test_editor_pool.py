@@ -0,0 +1,92 @@
+from ninja_ide.core import settings
+from ninja_ide.core.file_handling import nfile
+from ninja_ide.gui.editor import neditable
+from ninja_ide.gui.main_panel import combo_editor
+from ninja_ide.gui.main_panel import editor_pool
+
+
+def opened_editable(main_container, path):
+    editable = neditable.NEditable(nfile.NFile(path))
+    main_container.create_editor_from_editable(editable)
+    return editable
+
+
+def test_idle_editors_hibernated(qtbot, tmp_path, monkeypatch,
+                                 main_container):
+    monkeypatch.setattr(neditable.NEditable, 'run_checkers',
+                        lambda *args: None)
+    monkeypatch.setattr(settings, 'HIBERNATE_EDITORS_AFTER', 1)
+    monkeypatch.setattr(settings, 'EDITORS_MEMORY_BUDGET', 0)
+    monkeypatch.setattr(combo_editor.ComboEditor, 'PREFETCH_EDITORS', 0)
+    combo = combo_editor.ComboEditor(original=True)
+    combo.setParent(main_container.splitter)
+    combo.resize(600, 400)
+    main_container.splitter.show()
+    editables = []
+    for number in range(3):
+        path = tmp_path / 'module{}.py'.format(number)
+        path.write_text('\n'.join('x{} = {}'.format(n, n) for n in range(300)))
+        editable = opened_editable(main_container, str(path))
+        combo.add_editor(editable)
+        editables.append(editable)
+    combo.set_current(editables[1])
+    editables[1].editor.go_to_line(250, 3)
+    scroll = editables[1].editor.verticalScrollBar().value()
+    assert scroll > 0
+    combo.set_current(editables[0])
+    # Modified files are never hibernated
+    editables[2].editor.insertPlainText('y = 1\n')
+
+    pool = editor_pool.EditorPool(main_container)
+    hibernated = []
+    pool.editorsHibernated.connect(
+        lambda count, reclaimed: hibernated.append(count))
+    pool.check()
+    assert hibernated == []
+    assert all(editable.editor is not None for editable in editables)
+
+    now = editor_pool.time.monotonic()
+    monkeypatch.setattr(editor_pool.time, 'monotonic', lambda: now + 61)
+    pool.check()
+    assert hibernated == [1]
+    assert pool.hibernated == 1
+    assert editables[1].editor is None
+    assert editables[1].cursor_position == (250, 3)
+    assert isinstance(combo.stacked.widget(1), combo_editor.EditorPlaceholder)
+    assert editables[0].editor is combo.current_editor()
+    assert editables[2].editor is not None
+
+    # Created again when shown, where it was left
+    combo.set_current(editables[1])
+    current = combo.current_editor()
+    assert current is editables[1].editor
+    assert combo.stacked.indexOf(current) == 1
+    assert current.cursor_position == (250, 3)
+    assert current.verticalScrollBar().value() == scroll
+    assert current.text.startswith('x0 = 0\n')
+    assert pool.hibernated == 0
+
+
+def test_editors_hibernated_over_budget(qtbot, tmp_path, monkeypatch,
+                                        main_container):
+    monkeypatch.setattr(neditable.NEditable, 'run_checkers',
+                        lambda *args: None)
+    monkeypatch.setattr(settings, 'HIBERNATE_EDITORS_AFTER', 0)
+    monkeypatch.setattr(settings, 'EDITORS_MEMORY_BUDGET', 1)
+    monkeypatch.setattr(editor_pool.utils, 'get_rss', lambda: 2 * 1024 ** 2)
+    combo = combo_editor.ComboEditor(original=True)
+    combo.setParent(main_container.splitter)
+    editables = []
+    for number in range(3):
+        path = tmp_path / 'module{}.py'.format(number)
+        path.write_text('x = 1\n')
+        editable = opened_editable(main_container, str(path))
+        combo.add_editor(editable)
+        editables.append(editable)
+
+    pool = editor_pool.EditorPool(main_container)
+    pool.check()
+    # All but the current one, the memory doesn't go under the budget
+    assert [editable.editor is None for editable in editables] == [
+        True, True, False]
+    assert pool.hibernated == 2
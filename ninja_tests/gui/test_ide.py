@@ -0,0 +1,32 @@
+import sys
+
+from ninja_ide.gui.ide import IDE
+
+SERVICE_MODULE = """
+from ninja_ide.gui.ide import IDE
+
+SERVICE = object()
+IDE.register_service('lazy_example', SERVICE)
+"""
+
+
+def test_lazy_service_imported_on_first_request(tmp_path, monkeypatch):
+    (tmp_path / 'lazy_example.py').write_text(SERVICE_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    try:
+        IDE.register_lazy_service('lazy_example', 'lazy_example')
+        assert 'lazy_example' not in sys.modules
+        service = IDE.get_service('lazy_example')
+        assert service is sys.modules['lazy_example'].SERVICE
+        # Already registered, the module isn't imported again
+        IDE.register_lazy_service('lazy_example', 'missing_module')
+        assert IDE.get_service('lazy_example') is service
+    finally:
+        sys.modules.pop('lazy_example', None)
+
+
+def test_checkers_imported_on_first_request():
+    from ninja_ide.gui.editor import checkers
+    checkers.get_checkers_for('python')
+    for module_name in checkers.CHECKER_MODULES:
+        assert module_name in sys.modules
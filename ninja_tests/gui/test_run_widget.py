@@ -0,0 +1,66 @@
+import sys
+
+from ninja_ide.gui.tools_dock import run_widget
+
+
+SCRIPT = r"""
+import sys
+import time
+
+out = sys.stdout.buffer
+# A character split between two reads
+out.write(b'\xc3')
+out.flush()
+time.sleep(0.2)
+out.write(b'\xb1and\xc3\xba\n')
+out.flush()
+sys.stderr.write('line 1\nline 2\n')
+"""
+
+
+def test_output_decoded_across_reads(qtbot, tmp_path):
+    script = tmp_path / 'script.py'
+    script.write_text(SCRIPT)
+    process = run_widget.RunProcess()
+    output = []
+    errors = []
+    process.stdoutAvailable.connect(output.append)
+    process.errorAvailable.connect(errors.append)
+    with qtbot.waitSignal(process.processFinished, timeout=10000):
+        process.start_process(str(script), sys.executable, '', '', '')
+    assert ''.join(output) == '\xf1and\xfa\n'
+    # The lines of a read are sent together
+    assert ''.join(errors) == 'line 1\nline 2\n'
+    assert len(errors) <= 2
+
+
+def test_output_appended_in_frames(qtbot):
+    output = run_widget.OutputWidget(None)
+    qtbot.addWidget(output)
+    output.append_output('partial ')
+    output.append_output('line\n')
+    output.append_text('Finished', text_format='error')
+    # Nothing is appended until the next frame
+    assert output.toPlainText() == ''
+    qtbot.waitUntil(lambda: output.toPlainText() != '')
+    assert output.toPlainText() == 'partial line\nFinished\n'
+    output.append_output('no newline')
+    output.append_text('Message')
+    output.flush()
+    assert output.toPlainText().endswith('no newline\nMessage\n')
+
+
+def test_output_keeps_the_last_lines(qtbot, monkeypatch):
+    monkeypatch.setattr(run_widget.OutputWidget, 'MAX_LINES', 100)
+    output = run_widget.OutputWidget(None)
+    qtbot.addWidget(output)
+    for number in range(500):
+        output.append_output('%d\n' % number,
+                             text_format=('plain', 'error')[number % 2])
+    assert output._pending_lines == 100
+    output.append_output(''.join('%d\n' % n for n in range(500, 1000)))
+    assert output._pending_lines == 100
+    output.flush()
+    lines = output.toPlainText().splitlines()
+    assert lines[-1] == '999'
+    assert len(lines) < 101
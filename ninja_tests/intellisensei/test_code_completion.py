@@ -0,0 +1,85 @@
+from ninja_ide.intellisensei.completion import code_completion
+
+
+SOURCE = "import os\n\n\ndef function():\n    pass\n\nfunc"
+
+
+def _collect(cc, signal):
+    results = []
+    signal.connect(lambda *args: results.append(args))
+    return results
+
+
+def test_only_last_request_answered():
+    cc = code_completion.CodeCompletion()
+    results = _collect(cc, cc.completionsReady)
+    first = cc.request()
+    last = cc.request()
+    # The first one was queued before the last, it's skipped
+    cc.collect_completions(first, SOURCE, 6, 4, '')
+    assert results == []
+    cc.collect_completions(last, SOURCE, 6, 4, '')
+    request_id, proposals = results[0]
+    assert request_id == last
+    assert {'type': 'function', 'name': 'function', 'index': 0} in proposals
+
+
+def test_cancelled_request():
+    cc = code_completion.CodeCompletion()
+    results = _collect(cc, cc.completionsReady)
+    request_id = cc.request()
+    cc.cancel()
+    cc.collect_completions(request_id, SOURCE, 6, 4, '')
+    assert results == []
+
+
+def test_cancel_keeps_newer_request():
+    cc = code_completion.CodeCompletion()
+    results = _collect(cc, cc.completionsReady)
+    first = cc.request()
+    # Another editor requested completions, the first one hides
+    last = cc.request()
+    cc.cancel(first)
+    cc.collect_completions(last, SOURCE, 6, 4, '')
+    assert [request_id for request_id, _ in results] == [last]
+    cc.cancel(last)
+    cc.collect_completions(last, SOURCE, 6, 4, '')
+    assert len(results) == 1
+
+
+def test_lazy_docstring():
+    cc = code_completion.CodeCompletion()
+    results = _collect(cc, cc.docstringReady)
+    request_id = cc.request()
+    cc.collect_completions(request_id, SOURCE, 6, 4, '')
+    index = [p['index'] for p in cc.proposals if p['name'] == 'function'][0]
+    assert cc._docstrings == {}
+    cc.collect_docstring(request_id, index)
+    assert results == [(request_id, index, 'function()')]
+    assert list(cc._docstrings) == [index]
+
+
+def test_visible_files_analyzed_first(qtbot):
+    cc = code_completion.CodeCompletion()
+    analyzed = []
+    cc.analyze = analyzed.append
+    cc.schedule('opened.py', code_completion.OPENED)
+    cc.schedule('visible.py', code_completion.VISIBLE)
+    # Already waiting with a higher priority
+    cc.schedule('visible.py', code_completion.OPENED)
+    cc.schedule('opened.py', code_completion.VISIBLE)
+    cc.schedule('other.py', code_completion.OPENED)
+    qtbot.waitUntil(lambda: len(analyzed) == 3)
+    assert analyzed == ['visible.py', 'opened.py', 'other.py']
+    assert not cc._jobs
+
+
+def test_unmodified_file_not_analyzed_again(tmpdir):
+    cc = code_completion.CodeCompletion()
+    module = tmpdir.join('module.py')
+    module.write('import os\n')
+    assert cc.analyze(str(module))
+    assert not cc.analyze(str(module))
+    module.write('import os\nimport sys\n')
+    assert cc.analyze(str(module))
+    assert not cc.analyze(str(tmpdir.join('missing.py')))
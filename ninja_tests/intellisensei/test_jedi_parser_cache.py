@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..',
+                                'ninja_ide', 'intellisensei'))
+# The modules of the bundled jedi import it as jedi
+from jedi import settings  # noqa: E402
+from jedi.parser import cache  # noqa: E402
+from jedi.parser.python import load_grammar, parse  # noqa: E402
+sys.path.pop(0)
+
+
+@pytest.fixture
+def modules(tmpdir, monkeypatch):
+    monkeypatch.setattr(settings, 'cache_directory', str(tmpdir.join('c')))
+    monkeypatch.setattr(cache, 'parser_cache', cache._ParserCache())
+    paths = []
+    for i in range(4):
+        module = tmpdir.join('module%d.py' % i)
+        module.write('x = %d\n' % i)
+        paths.append(str(module))
+    return paths
+
+
+def _parse(path):
+    return parse(path=path, grammar=load_grammar(), cache=True)
+
+
+def test_least_recently_used_modules_dropped(modules, monkeypatch):
+    monkeypatch.setattr(settings, 'parser_cache_size', 2)
+    parser_cache = cache.parser_cache
+    _parse(modules[0])
+    _parse(modules[1])
+    assert parser_cache[modules[0]]
+    _parse(modules[2])
+    assert list(parser_cache) == [modules[0], modules[2]]
+    assert parser_cache.chars == len('x = 0\n') * 2
+    stats = cache.get_statistics()
+    assert stats['evictions'] == 1
+    assert stats['modules'] == 2
+    assert stats['disk_files'] == 3
+
+
+def test_old_pickled_modules_removed(modules, monkeypatch):
+    for path in modules:
+        _parse(path)
+    pickled = sorted(cache._pickled_modules())
+    assert len(pickled) == 4
+    # The oldest one is too old, the next one doesn't fit
+    old = time.time() - settings.cache_max_age - 10
+    os.utime(pickled[0][2], (old, old))
+    monkeypatch.setattr(settings, 'cache_max_size',
+                        sum(size for _, size, _ in pickled[2:]))
+    cache.remove_old_modules()
+    assert sorted(path for _, _, path in cache._pickled_modules()) == \
+        sorted(path for _, _, path in pickled[2:])
+
+
+def test_loaded_pickled_modules_kept(modules):
+    _parse(modules[0])
+    (_, _, pickled), = cache._pickled_modules()
+    # Saved long ago, after the source was modified
+    old = time.time() - settings.cache_max_age - 10
+    os.utime(modules[0], (old - 10, old - 10))
+    os.utime(pickled, (old, old))
+    cache.parser_cache.clear()
+    disk_loads = cache.get_statistics()['disk_loads']
+    _parse(modules[0])
+    assert cache.get_statistics()['disk_loads'] == disk_loads + 1
+    cache.remove_old_modules()
+    assert [path for _, _, path in cache._pickled_modules()] == [pickled]
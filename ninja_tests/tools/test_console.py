@@ -0,0 +1,104 @@
+from ninja_ide.tools import console
+
+
+class Recorder(object):
+
+    def __init__(self, console_process):
+        self.output = []
+        self.executed = []
+        self.completions = []
+        console_process.outputAvailable.connect(
+            lambda text, stream: self.output.append((stream, text)))
+        console_process.executed.connect(self.executed.append)
+        console_process.completionsFound.connect(
+            lambda text, matches: self.completions.append((text, matches)))
+
+    def text(self, stream):
+        return ''.join(text for kind, text in self.output if kind == stream)
+
+
+def execute(qtbot, console_process, *lines):
+    for line in lines:
+        console_process.execute(line)
+    qtbot.waitUntil(lambda: not console_process.busy, timeout=10000)
+
+
+def test_execute_in_another_process(qtbot):
+    console_process = console.ConsoleProcess()
+    recorder = Recorder(console_process)
+    try:
+        execute(qtbot, console_process, 'import os', 'x = 21 * 2',
+                'print(x, os.getpid())')
+        assert recorder.executed == [False, False, False]
+        value, pid = recorder.text('stdout').split()
+        assert value == '42'
+        assert int(pid) == console_process._process.processId()
+        # A block waits for more lines
+        execute(qtbot, console_process, 'def f():')
+        assert recorder.executed[-1] is True
+        execute(qtbot, console_process, '    return 1 / 0', '', 'f()')
+        assert 'ZeroDivisionError' in recorder.text('stderr')
+        console_process.complete('x.bit_')
+        qtbot.waitUntil(lambda: len(recorder.completions) == 1,
+                        timeout=10000)
+        assert recorder.completions == [('x.bit_', ['x.bit_length('])]
+    finally:
+        console_process.shutdown()
+
+
+def test_output_sent_in_chunks(qtbot):
+    console_process = console.ConsoleProcess()
+    recorder = Recorder(console_process)
+    try:
+        execute(qtbot, console_process,
+                'for i in range(20000): print(i)', '')
+        lines = recorder.text('stdout').splitlines()
+        assert lines == [str(i) for i in range(20000)]
+        assert len(recorder.output) < 200
+    finally:
+        console_process.shutdown()
+
+
+def test_interrupt_and_restart(qtbot):
+    console_process = console.ConsoleProcess()
+    recorder = Recorder(console_process)
+    try:
+        execute(qtbot, console_process, 'x = 1')
+        console_process.execute('while True: pass')
+        console_process.execute('')
+        qtbot.wait(300)
+        assert console_process.busy
+        console_process.interrupt()
+        qtbot.waitUntil(lambda: not console_process.busy, timeout=10000)
+        assert recorder.text('stderr').endswith('KeyboardInterrupt\n')
+        assert 'console_kernel' not in recorder.text('stderr')
+        # The namespace is kept after an interrupt
+        execute(qtbot, console_process, 'print(x)')
+        assert recorder.text('stdout') == '1\n'
+        with qtbot.waitSignal(console_process.restarted):
+            console_process.restart()
+        execute(qtbot, console_process, 'x')
+        assert 'NameError' in recorder.text('stderr')
+        # exit() finishes the process, the next line starts it again
+        with qtbot.waitSignal(console_process.restarted, timeout=10000):
+            execute(qtbot, console_process, 'exit()')
+        assert not console_process.is_running()
+        execute(qtbot, console_process, 'print(2)')
+        assert recorder.text('stdout') == '1\n2\n'
+    finally:
+        console_process.shutdown()
+
+
+def test_output_sent_while_executing(qtbot):
+    console_process = console.ConsoleProcess()
+    recorder = Recorder(console_process)
+    try:
+        execute(qtbot, console_process, 'import time')
+        console_process.execute("print('start'); time.sleep(3)")
+        # Sent without waiting for more output or the end of the line
+        qtbot.waitUntil(lambda: recorder.text('stdout') == 'start\n',
+                        timeout=1000)
+        assert console_process.busy
+        qtbot.waitUntil(lambda: not console_process.busy, timeout=10000)
+    finally:
+        console_process.shutdown()
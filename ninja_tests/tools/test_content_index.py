@@ -0,0 +1,104 @@
+import os
+import re
+
+from ninja_ide.tools import content_index
+from ninja_ide.tools import file_search
+
+
+def _trigrams(text):
+    return set(content_index.trigrams(text.encode('utf-8')))
+
+
+def test_trigrams():
+    assert len(_trigrams('abcabc')) == 3
+    assert _trigrams('ABC') == _trigrams('abc')
+    assert _trigrams('\u212aey') == _trigrams('key')
+    assert _trigrams('ab') == set()
+
+
+def test_pattern_trigrams():
+    assert content_index.pattern_trigrams(re.compile('Def m')) == \
+        _trigrams('def m')
+    assert content_index.pattern_trigrams(
+        re.compile(r'^class \w+Wid')) == \
+        _trigrams('class ') | _trigrams('wid')
+    assert content_index.pattern_trigrams(
+        re.compile('ñandú bar')) == _trigrams('and') | _trigrams(' bar')
+    assert content_index.pattern_trigrams(re.compile('abc|def')) == set()
+    assert content_index.pattern_trigrams(re.compile('ab?cd')) == set()
+
+
+def test_search_with_index(tmpdir):
+    tmpdir.join("a.py").write("import os\n")
+    tmpdir.join("b.py").write("import sys\n")
+    index = content_index.ContentIndex(str(tmpdir.join("index.db")))
+    search = file_search.FileSearch()
+    pattern = re.compile('import sys')
+    paths = [str(tmpdir.join(name)) for name in ("a.py", "b.py")]
+    # Nothing indexed yet, all the files are searched
+    assert index.candidates(paths, pattern) == (paths, paths)
+    results = list(search.search(str(tmpdir), pattern, index=index))
+    assert [r[0] for r in results] == [paths[1]]
+    assert index.candidates(paths, pattern) == ([paths[1]], [])
+    # Modified files are searched until indexed again
+    tmpdir.join("a.py").write("import sys, os\n")
+    os.utime(paths[0], (0, 0))
+    assert index.candidates(paths, pattern) == (paths, [paths[0]])
+    index.update(content_index.index_files([paths[0]]))
+    assert index.candidates(paths, re.compile('SYS, O')) == (
+        [paths[0]], [])
+    index.close()
+
+
+def test_compact(tmpdir):
+    tmpdir.join("a.py").write("import os\n")
+    path = str(tmpdir.join("a.py"))
+    index = content_index.ContentIndex(str(tmpdir.join("index.db")))
+    pattern = re.compile('import')
+    for i in range(3):
+        index.update(content_index.index_files([path]))
+    assert index.candidates([path], pattern) == ([path], [])
+    # The ids of the previous versions were dropped
+    assert len(index._files_with(content_index.pattern_trigrams(pattern))) == 1
+    index.remove([path])
+    assert index._files_with(content_index.pattern_trigrams(pattern)) == set()
+    index.close()
+
+
+def test_postings_appended_in_chunks(tmpdir, monkeypatch):
+    monkeypatch.setattr(content_index, 'MAX_PENDING_IDS', 10)
+    monkeypatch.setattr(content_index, 'MAX_CHUNKS', 3)
+    paths = []
+    for i in range(4):
+        tmpdir.join("%d.py" % i).write("import os  # %d\n" % i)
+        paths.append(str(tmpdir.join("%d.py" % i)))
+    index = content_index.ContentIndex(str(tmpdir.join("index.db")))
+    pattern = re.compile('import os')
+    # The results are consumed without building a list
+    index.update(content_index.index_file(path) for path in paths[:3])
+    assert index.candidates(paths, pattern) == (paths, [paths[3]])
+    chunks = index._connection.execute(
+        "SELECT count(*) FROM chunks").fetchone()[0]
+    index.update(content_index.index_files(paths[3:]))
+    # Merged after more than MAX_CHUNKS updates
+    merged = index._connection.execute(
+        "SELECT count(*), count(DISTINCT trigram) FROM chunks").fetchone()
+    assert merged[0] == merged[1] < chunks
+    assert index.candidates(paths, pattern) == (paths, [])
+    assert index.candidates(paths, re.compile('# 2')) == ([paths[2]], [])
+    index.close()
+
+
+def test_old_postings_indexed_again(tmpdir):
+    tmpdir.join("a.py").write("import os\n")
+    path = str(tmpdir.join("a.py"))
+    db_path = str(tmpdir.join("index.db"))
+    index = content_index.ContentIndex(db_path)
+    index.update(content_index.index_files([path]))
+    index._connection.execute(
+        "create table postings(trigram INTEGER PRIMARY KEY, ids blob)")
+    index._connection.commit()
+    index.close()
+    index = content_index.ContentIndex(db_path)
+    assert index.candidates([path], re.compile('import')) == ([path], [path])
+    index.close()
@@ -0,0 +1,51 @@
+import re
+
+from ninja_ide.tools import file_search
+
+
+def _make_tree(tmpdir):
+    tmpdir.join("main.py").write("import os\n\ndef main():\n    os.getcwd()\n")
+    tmpdir.join("notes.md").write("# OS notes\r\nnothing here\r\n")
+    tmpdir.join("data.py").write_binary(b"os\0binary")
+    tmpdir.mkdir(".git").join("config.py").write("os")
+    tmpdir.mkdir("package").join("module.py").write("x = 1\nimport os")
+
+
+def test_iter_files(tmpdir):
+    _make_tree(tmpdir)
+    files = [p[len(str(tmpdir)) + 1:]
+             for p in file_search.iter_files(str(tmpdir), ['*.py'])]
+    assert files == ['data.py', 'main.py', 'package/module.py']
+    files = list(file_search.iter_files(str(tmpdir), recursive=False))
+    assert len(files) == 3
+
+
+def test_grep_file(tmpdir):
+    _make_tree(tmpdir)
+    pattern = re.compile('os', re.IGNORECASE)
+    assert file_search.grep_file(str(tmpdir.join("main.py")), pattern) == [
+        (0, 'import os'), (3, '    os.getcwd()')]
+    assert file_search.grep_file(str(tmpdir.join("notes.md")), pattern) == [
+        (0, '# OS notes')]
+    assert file_search.grep_file(str(tmpdir.join("data.py")), pattern) == []
+    pattern = re.compile('^import', re.MULTILINE)
+    assert file_search.grep_file(
+        str(tmpdir.join("package", "module.py")), pattern) == [
+            (1, 'import os')]
+
+
+def test_search(tmpdir):
+    _make_tree(tmpdir)
+    search = file_search.FileSearch()
+    results = dict(search.search(str(tmpdir), re.compile('os')))
+    assert sorted(results) == [str(tmpdir.join("main.py")),
+                               str(tmpdir.join("package", "module.py"))]
+
+
+def test_search_in_workers(tmpdir):
+    for i in range(file_search.PARALLEL_THRESHOLD + 5):
+        tmpdir.join("module_%d.py" % i).write("a\nb = %d\n" % i)
+    search = file_search.FileSearch(max_workers=2)
+    results = list(search.search(str(tmpdir), re.compile('b = 1')))
+    search.shutdown()
+    assert sorted(lines[0][0] for _, lines in results) == [1] * 11
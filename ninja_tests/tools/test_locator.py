@@ -0,0 +1,87 @@
+import collections
+import os
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from ninja_ide.core import settings
+from ninja_ide.extensions import handlers
+from ninja_ide.gui.ide import IDE
+from ninja_ide.tools.locator import knowledge_db
+from ninja_ide.tools.locator import locator
+
+handlers.init_basic_handlers()
+
+Project = collections.namedtuple('Project', 'path extensions')
+
+
+class Filesystem(QObject):
+
+    filesChanged = pyqtSignal('PyQt_PyObject')
+
+    def __init__(self, *projects):
+        super().__init__()
+        self.projects = {project.path: project for project in projects}
+
+    def get_projects(self):
+        return self.projects
+
+
+class Ide(object):
+
+    def __init__(self, filesystem):
+        self.filesystem = filesystem
+
+
+def _locator_thread(monkeypatch, tmp_path, *projects):
+    db_path = str(tmp_path / 'locator.db')
+    knowledge_db.initialize_db(db_path)
+    monkeypatch.setattr(locator, 'db_path', db_path)
+    monkeypatch.setitem(settings.SYNTAX, 'python', {'extension': ['py']})
+    monkeypatch.setattr(locator, 'mapping_symbols', {})
+    monkeypatch.setattr(locator, 'files_mtime', {})
+    monkeypatch.setattr(locator, 'files_paths',
+                        locator.files_index.FilesIndex())
+    filesystem = Filesystem(*projects)
+    monkeypatch.setitem(IDE._IDE__IDESERVICES, 'ide', Ide(filesystem))
+    thread = locator.LocateSymbolsThread()
+    filesystem.filesChanged.connect(thread.files_changed)
+    return thread, filesystem
+
+
+def test_changed_file_in_project_with_same_prefix(qtbot, tmp_path,
+                                                  monkeypatch):
+    foo = tmp_path / 'foo'
+    foo_bar = tmp_path / 'foo_bar'
+    foo.mkdir()
+    foo_bar.mkdir()
+    thread, _ = _locator_thread(
+        monkeypatch, tmp_path, Project(str(foo), ['.py']),
+        Project(str(foo_bar), ['.txt']))
+    module = foo_bar / 'module.py'
+    module.write_text('def function():\n    pass\n')
+    with qtbot.waitSignal(thread.finished, timeout=10000):
+        thread.files_changed([str(module)])
+    # foo_bar doesn't index the .py files
+    assert str(module) not in locator.mapping_symbols
+    assert str(module) not in locator.files_paths
+
+
+def test_files_changed_outside_the_ide(qtbot, tmp_path, monkeypatch):
+    project = tmp_path / 'project'
+    project.mkdir()
+    thread, filesystem = _locator_thread(
+        monkeypatch, tmp_path, Project(str(project), ['.py']))
+    created = project / 'created_module.py'
+    created.write_text('def created_function():\n    pass\n')
+    with qtbot.waitSignal(thread.finished, timeout=10000):
+        filesystem.filesChanged.emit([str(created)])
+    assert locator.files_paths.search('created') == [
+        ('project/created_module.py'.replace('/', os.sep), str(project))]
+    names = [item.name for item in locator.mapping_symbols[str(created)]]
+    assert 'created_function()' in names
+
+    created.unlink()
+    with qtbot.waitSignal(thread.finished, timeout=10000):
+        filesystem.filesChanged.emit([str(created)])
+    assert str(created) not in locator.mapping_symbols
+    assert locator.files_paths.search('created') == []
@@ -0,0 +1,61 @@
+import os
+
+from ninja_ide.tools.locator import files_index
+
+PROJECT = os.path.join(os.sep, 'home', 'user', 'ninja')
+FILES = [os.path.join(PROJECT, *parts) for parts in (
+    ('setup.py',), ('ninja_ide', 'gui', 'editor', 'editor.py'),
+    ('ninja_ide', 'gui', 'editor', 'neditable.py'),
+    ('ninja_ide', 'gui', 'main_panel', 'combo_editor.py'),
+    ('ninja_ide', 'tools', 'editor_utils.py'),
+    ('ninja_ide', 'gui', 'explorer', 'tree.py'))]
+
+
+def _shown(results):
+    return [path.replace(os.sep, '/') for path, _ in results]
+
+
+def _index():
+    index = files_index.FilesIndex()
+    index.set_project_files(PROJECT, FILES)
+    return index
+
+
+def test_ranking():
+    results = _index().search('editor')
+    assert _shown(results) == [
+        'ninja/ninja_ide/gui/editor/editor.py',
+        'ninja/ninja_ide/tools/editor_utils.py',
+        'ninja/ninja_ide/gui/main_panel/combo_editor.py',
+        'ninja/ninja_ide/gui/editor/neditable.py']
+    assert results[0][1] == PROJECT
+    # The words in order first, then the chars in order
+    assert _shown(_index().search('gui tree')) == [
+        'ninja/ninja_ide/gui/explorer/tree.py',
+        'ninja/ninja_ide/gui/editor/neditable.py']
+    assert _shown(_index().search('SETUP.PY')) == ['ninja/setup.py']
+    assert _index().search('zz') == []
+
+
+def test_limit():
+    index = _index()
+    assert len(index.search('', limit=2)) == 2
+    assert len(index.search('')) == len(FILES)
+    assert _shown(index.search('py', limit=1)) == ['ninja/setup.py']
+
+
+def test_updated_from_events():
+    index = _index()
+    new_file = os.path.join(PROJECT, 'ninja_ide', 'editor_new.py')
+    index.add(PROJECT, new_file)
+    index.add(PROJECT, new_file)
+    assert new_file in index
+    assert len(index) == len(FILES) + 1
+    assert 'ninja/ninja_ide/editor_new.py' in _shown(index.search('edn'))
+    index.remove(FILES[1])
+    assert FILES[1] not in index
+    assert 'ninja/ninja_ide/gui/editor/editor.py' not in _shown(
+        index.search('editor'))
+    index.remove_project(PROJECT)
+    assert index.projects() == []
+    assert index.search('') == []
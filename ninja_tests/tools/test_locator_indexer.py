@@ -0,0 +1,62 @@
+import os
+
+from ninja_ide.tools import introspection
+from ninja_ide.tools.locator import indexer
+
+SOURCE = """
+CONSTANT = 1
+
+
+class Foo(object):
+
+    def bar(self):
+        pass
+
+
+def function(a, b=2):
+    pass
+"""
+
+
+def _write_files(tmpdir, amount):
+    paths = []
+    for i in range(amount):
+        path = tmpdir.join("module_%d.py" % i)
+        path.write(SOURCE)
+        paths.append(str(path))
+    return paths
+
+
+def test_flatten_symbols():
+    symbols = introspection.obtain_symbols(SOURCE)
+    flat = indexer.flatten_symbols(symbols)
+    assert ('<', 'Foo(object)', 4) in flat
+    assert ('>', 'bar()', 6) in flat
+    assert ('-', 'CONSTANT', 1) in flat
+    assert [lineno for _, name, lineno in flat
+            if name.startswith('function(')] == [10]
+
+
+def test_parse_inline(tmpdir):
+    paths = _write_files(tmpdir, 3)
+    symbols_indexer = indexer.SymbolsIndexer()
+    results = list(symbols_indexer.parse(
+        [(path, introspection) for path in paths]))
+    symbols_indexer.shutdown()
+    assert sorted(r[0] for r in results) == sorted(paths)
+    for path, mtime, symbols, error in results:
+        assert error is None
+        assert mtime == int(os.stat(path).st_mtime)
+        assert len(symbols) == 4
+
+
+def test_parse_in_workers(tmpdir):
+    paths = _write_files(tmpdir, indexer.PARALLEL_THRESHOLD + 10)
+    paths.append(str(tmpdir.join("missing.py")))
+    symbols_indexer = indexer.SymbolsIndexer(max_workers=2)
+    results = list(symbols_indexer.parse(
+        [(path, introspection) for path in paths]))
+    symbols_indexer.shutdown()
+    assert len(results) == len(paths)
+    errors = [r[0] for r in results if r[3] is not None]
+    assert errors == [str(tmpdir.join("missing.py"))]
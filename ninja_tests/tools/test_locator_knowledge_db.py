@@ -0,0 +1,34 @@
+import os
+
+from ninja_ide.tools.locator import knowledge_db
+
+
+def test_batched_save(tmpdir):
+    db_path = str(tmpdir.join("locator.db"))
+    knowledge = knowledge_db.KnowledgeDB(db_path, batch_size=2)
+    knowledge.save("/p/a.py", 1, b"a")
+    # Still in the batch
+    assert knowledge_db.KnowledgeDB(db_path).load_stats() == {}
+    knowledge.save("/p/b.py", 2, b"b")
+    assert knowledge_db.KnowledgeDB(db_path).load_stats() == {
+        "/p/a.py": 1, "/p/b.py": 2}
+    knowledge.save("/p/c.py", 3, b"c")
+    knowledge.close()
+    knowledge = knowledge_db.KnowledgeDB(db_path)
+    data = knowledge.get_data_many(["/p/a.py", "/p/c.py", "/p/x.py"])
+    assert data == {"/p/a.py": b"a", "/p/c.py": b"c"}
+    knowledge.close()
+
+
+def test_prune_deleted_paths(tmpdir):
+    db_path = str(tmpdir.join("locator.db"))
+    knowledge = knowledge_db.KnowledgeDB(db_path)
+    for path in ("/p/a.py", "/p/b.py", "/p2/c.py"):
+        knowledge.save(path, 1, b"")
+    knowledge.flush()
+    removed = knowledge.prune("/p", {"/p/a.py"})
+    assert removed == ["/p/b.py"]
+    assert sorted(knowledge.load_stats()) == ["/p/a.py", "/p2/c.py"]
+    knowledge.close()
+    knowledge_db.remove_db(db_path)
+    assert not os.listdir(str(tmpdir))
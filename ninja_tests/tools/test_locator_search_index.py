@@ -0,0 +1,59 @@
+from collections import namedtuple
+
+from ninja_ide.tools.locator import search_index
+
+Item = namedtuple('Item', 'type name comparison')
+
+ITEMS = [Item(symbol_type, name, name) for symbol_type, name in (
+    ('>', 'add_editor'), ('<', 'Editor'), ('>', 'editor_focus'),
+    ('>', 'get_editor'), ('-', 'editor_margin'), ('>', 'export_data'),
+    ('>', 'open_file'))]
+
+
+def _names(results):
+    return [x.name for x in results]
+
+
+def test_ranking():
+    index = search_index.SymbolsIndex(ITEMS)
+    results = index.search('edito')
+    assert _names(results) == ['Editor', 'editor_focus', 'editor_margin',
+                               'add_editor', 'get_editor']
+    assert _names(index.search('edm')) == ['editor_margin']
+
+
+def test_symbol_type():
+    index = search_index.SymbolsIndex(ITEMS)
+    assert _names(index.search('ed', symbol_type='>')) == [
+        'editor_focus', 'add_editor', 'get_editor', 'export_data']
+    assert len(index.search('', symbol_type='<')) == 1
+
+
+def test_lazy_pages():
+    index = search_index.SymbolsIndex(ITEMS)
+    results = index.search('e')
+    assert _names(results[0:2]) == ['Editor', 'editor_focus']
+    assert not results.complete
+    assert len(results) == 7
+    assert not index.search('zz')
+
+
+def test_refined_query():
+    index = search_index.SymbolsIndex(ITEMS)
+    assert len(index.search('ed')) == 6
+    results = index.search('edf')
+    assert results.candidates is not None
+    assert _names(results) == ['editor_focus']
+
+
+def test_empty_index():
+    index = search_index.SymbolsIndex([])
+    assert len(index.search('')) == 0
+    assert len(index.search('a')) == 0
+
+
+def test_scan_equal():
+    index = search_index.KeysIndex(['editor', 'editor_focus', 'editor'])
+    assert list(index.scan_equal('editor')) == [0, 2]
+    assert list(index.scan_equal('editor_focus')) == [1]
+    assert list(index.scan_equal('edit')) == []
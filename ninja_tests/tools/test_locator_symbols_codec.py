@@ -0,0 +1,26 @@
+import pickle
+
+import pytest
+
+from ninja_ide.tools.locator import symbols_codec
+
+
+def test_round_trip():
+    symbols = [('<', 'Foo(object)', 3), ('>', '__init__(self)', 4),
+               ('-', 'ñandú', 10), ('>', '__init__(self)', 20)]
+    assert symbols_codec.loads(symbols_codec.dumps(symbols)) == symbols
+
+
+def test_empty():
+    assert symbols_codec.loads(symbols_codec.dumps([])) == []
+
+
+def test_names_are_shared():
+    first = symbols_codec.loads(symbols_codec.dumps([('>', 'run()', 1)]))
+    second = symbols_codec.loads(symbols_codec.dumps([('>', 'run()', 9)]))
+    assert first[0][1] is second[0][1]
+
+
+def test_old_pickled_data():
+    with pytest.raises(ValueError):
+        symbols_codec.loads(pickle.dumps([('>', 'run()', 1)]))
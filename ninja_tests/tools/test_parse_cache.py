@@ -0,0 +1,59 @@
+import pytest
+
+from ninja_ide.tools import introspection
+from ninja_ide.tools import parse_cache
+
+
+SOURCE = ("import os\n\n\nclass Example(object):\n"
+          "    def method(self):\n        pass\n")
+
+
+@pytest.fixture(autouse=True)
+def clean_cache(monkeypatch):
+    monkeypatch.setattr(parse_cache, '_db_path', None)
+    monkeypatch.setattr(parse_cache, '_connection', None)
+    parse_cache.clear()
+    yield
+    parse_cache.clear()
+
+
+def test_one_parse_for_each_source():
+    tree = parse_cache.parse(SOURCE)
+    assert parse_cache.parse(SOURCE) is tree
+    assert parse_cache.parse(SOURCE + "x = 1\n") is not tree
+    with pytest.raises(SyntaxError):
+        parse_cache.parse("def (:\n")
+
+
+def test_least_recently_used_trees_dropped(monkeypatch):
+    monkeypatch.setattr(parse_cache, 'MAX_SOURCE_SIZE', len(SOURCE) * 2 + 5)
+    first = parse_cache.parse(SOURCE)
+    second = parse_cache.parse(SOURCE + "\n")
+    parse_cache.parse(SOURCE)
+    parse_cache.parse(SOURCE + "\n\n")
+    assert parse_cache.parse(SOURCE) is first
+    assert parse_cache.parse(SOURCE + "\n") is not second
+
+
+def test_symbols_shared_by_the_callers():
+    symbols = introspection.obtain_symbols(SOURCE, simple=True)
+    assert 'Example(object)' in symbols[0]['classes']
+    assert introspection.obtain_symbols(SOURCE, simple=True) is symbols
+    assert introspection.obtain_symbols(SOURCE) is not symbols
+
+
+def test_summaries_stored_between_sessions(tmpdir):
+    parse_cache.set_summaries_db(str(tmpdir.join('summaries.db')))
+    built = []
+
+    def build(source):
+        built.append(source)
+        return {'lines': source.count('\n')}
+
+    assert parse_cache.summary('lines', SOURCE, build) == {'lines': 6}
+    # A new session, nothing in memory
+    parse_cache.clear()
+    parse_cache.set_summaries_db(str(tmpdir.join('summaries.db')))
+    assert parse_cache.summary('lines', SOURCE, build) == {'lines': 6}
+    assert built == [SOURCE]
+    parse_cache.set_summaries_db(None)
@@ -0,0 +1,59 @@
+import os
+
+from ninja_ide.tools import project_lint
+
+
+def _write(path, content):
+    with open(path, 'w') as f:
+        f.write(content)
+    # Change the mtime even in filesystems with low resolution
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_lint_file(tmpdir):
+    path = str(tmpdir.join('module.py'))
+    _write(path, 'import os\nx=1\n')
+    file_path, _, errors = project_lint.lint_file(path)
+    assert file_path == path
+    assert errors == [
+        (0, project_lint.PYFLAKES, "'os' imported but unused", 0),
+        (1, project_lint.PEP8,
+         '[PEP8] E225: missing whitespace around operator', 2)]
+
+
+def test_lint_project(tmpdir):
+    good = str(tmpdir.join('good.py'))
+    bad = str(tmpdir.join('bad.py'))
+    _write(good, 'x = 1\n')
+    _write(bad, 'import os\n')
+    _write(str(tmpdir.join('notes.txt')), 'import os\n')
+    database = project_lint.LintDatabase(str(tmpdir.join('lint.db')))
+    linter = project_lint.ProjectLint()
+    results = dict(linter.lint(str(tmpdir), database))
+    assert sorted(results) == [bad, good]
+    assert results[good] == []
+    assert list(database.errors()) == [bad]
+    # Nothing changed, nothing is checked again
+    assert list(linter.lint(str(tmpdir), database)) == []
+    _write(bad, 'import os\nos.getcwd()\n')
+    os.remove(good)
+    assert list(linter.lint(str(tmpdir), database)) == [(bad, []),
+                                                        (good, [])]
+    assert database.errors() == {}
+    database.close()
+
+
+def test_lint_files(tmpdir):
+    path = str(tmpdir.join('module.py'))
+    _write(path, 'x = 1\n')
+    database = project_lint.LintDatabase(str(tmpdir.join('lint.db')))
+    linter = project_lint.ProjectLint()
+    list(linter.lint(str(tmpdir), database))
+    _write(path, 'x = y\n')
+    results = linter.lint_files([path], database)
+    assert results == [(path, [(0, project_lint.PYFLAKES,
+                                "undefined name 'y'", 4)])]
+    assert database.stale([path]) == []
+    assert database.errors() == dict(results)
+    database.close()
@@ -0,0 +1,81 @@
+from ninja_ide.tools import style_check
+
+
+def _source(functions):
+    return ''.join(
+        'def function%d(a, b):\n    return a+b\n\n\n' % i
+        for i in range(functions))
+
+
+def _full_check(source):
+    return style_check.StyleEngine('test.py').check(source)
+
+
+def test_check():
+    checks = _full_check('import os,sys\nx=1\n')
+    # The last error of each line is kept
+    assert checks[0] == ("[PEP8] E231: missing whitespace after ','", 10)
+    assert checks[1][0].startswith('[PEP8] E225')
+
+
+def test_incremental_check_same_results():
+    source = _source(200)
+    engine = style_check.StyleEngine('test.py')
+    engine.check(source)
+    lines = source.splitlines(True)
+    lines[401] = '    return a +b\n'
+    lines.insert(200, 'x=1\n')
+    del lines[600:604]
+    source = ''.join(lines)
+    assert engine.check(source) == _full_check(source)
+    source = source.rstrip('\n')
+    assert engine.check(source) == _full_check(source)
+
+
+def test_incremental_check_bounded():
+    source = _source(500)
+    engine = style_check.StyleEngine('test.py')
+    engine.check(source)
+    assert engine.last_pass == (1, 2000)
+    lines = source.splitlines(True)
+    lines[1001] = '    return  a+b\n'
+    source = ''.join(lines)
+    checks = engine.check(source)
+    first, last = engine.last_pass
+    assert first <= 1002 <= last
+    assert last - first < 10
+    assert checks[1001][0].startswith('[PEP8] E271')
+    assert checks == _full_check(source)
+
+
+def test_syntax_error_row():
+    source = _source(50)
+    engine = style_check.StyleEngine('test.py')
+    engine.check(source)
+    lines = source.splitlines(True)
+    lines[101] = '    return (a+b\n'
+    source = ''.join(lines)
+    checks = engine.check(source)
+    assert checks == _full_check(source)
+    assert any(message.startswith('[PEP8] E901')
+               for message, _ in checks.values())
+
+
+def test_indentation_error_same_results():
+    source = _source(50)
+    engine = style_check.StyleEngine('test.py')
+    engine.check(source)
+    lines = source.splitlines(True)
+    # Doesn't match the indentation of the function above
+    lines[100] = '  ' + lines[100]
+    source = ''.join(lines)
+    checks = engine.check(source)
+    assert checks == _full_check(source)
+    assert checks[100][0].startswith('[PEP8] E901')
+    # Fixed again, the lines after the error are checked
+    lines[100] = lines[100][2:]
+    lines[121] = '    return  a+b\n'
+    source = ''.join(lines)
+    checks = engine.check(source)
+    assert checks == _full_check(source)
+    assert checks[121][0].startswith('[PEP8] E271')